@@ -17,24 +17,10 @@ import os
 import math
 from robodk import *
 
-# Detect Python version and post processor
-print("Using Python version: " + str(sys.version_info))
-path_file = os.path.dirname(__file__).replace(os.sep, "/")
-print("RoboDK Post Processor: " + path_file)
+# Load the post processor (compiled version for the Python version in use)
+BasePost = LoadCompiledPost(__file__, "ABB_RAPID_IRC5")
 
-# Check if the post is compatible with the Python version
-version_str = str(sys.version_info[0]) + str(sys.version_info[1])
-path_library = path_file + '/v' + version_str
-if not os.path.isdir(path_library):
-    msg = "Invalid Python version or post processor not found. Make sure you are using a supported Python version: " + path_library
-    msg += "\nSelect Tools-Options-Python and select a supported Python version"
-    print(msg)
-    raise Exception(msg)
-
-# Load the post processor
-exec("from v" + version_str + ".ABB_RAPID_IRC5 import RobotPost as BasePost")
-
-class RobotPost(BasePost):
+class RobotPost(BasePost, RobotPostBatch):
 
     # ------------------------ Customize your RoboDK post processor using the following variables ------------------------
 
@@ -111,6 +97,6 @@ class RobotPost(BasePost):
     pass
 
 if __name__== "__main__":
-    exec("from v" + version_str + ".ABB_RAPID_IRC5 import test_post")
+    test_post = LoadCompiledPost(__file__, "ABB_RAPID_IRC5", "test_post")
     test_post()
 
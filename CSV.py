@@ -74,9 +74,215 @@ def joints_2_str(joints):
     str = str[:-1]
     return str
 
+def moves_2_str(instruction, poses, joints, tname=''):
+    """Prints a batch of movements (same as instruction,pose_2_str(pose),joints_2_str(joints) for each target)"""
+    try:
+        import numpy
+        J = numpy.asarray(joints, dtype=numpy.float64)
+    except (ImportError, ValueError, TypeError):
+        # NumPy not available or joint targets with a different number of joints
+        J = None
+    if J is None or J.ndim != 2 or (isinstance(poses, list) and any([pose is None for pose in poses])):
+        return ['%s,%s,%s%s' % (instruction, pose_2_str(pose), joints_2_str(jnts), tname) for pose, jnts in zip(poses, joints)]
+        
+    fmt = instruction + ',%.3f,%.3f,%.3f,%.3f,%.3f,%.3f,' + ','.join(['%.6f'] * J.shape[1]) + tname.replace('%', '%%')
+    targets = Poses_2_Staubli(poses, 3).tolist()
+    return [fmt % tuple(xyzwpr + jnts) for xyzwpr, jnts in zip(targets, J.tolist())]
+
+# ----------------------------------------------------
+# Columnar binary output (see ProgColumns)
+PROG_COLUMNS_MAGIC = b'RDKCOL01'
+
+# Instruction kinds (first column of the CSV file)
+INSTRUCTIONS = ('Program Start', 'Program Finish', 'Move Joints', 'Move Linear', 'Move Circular (1)', 'Move Circular (2)',
+                'Set Reference', 'Set Tool', 'Stop', 'Pause (ms)', 'Set Speed (mm/s)', 'Set Acceleration (mm/s2)',
+                'Set Joint Speed (deg/s)', 'Set Joint Acceleration (deg/s2)', 'Set Rounding', 'Set DO', 'Wait DI',
+                'Run Program', 'Code', 'Comment', 'Show Message')
+
+class ProgColumns(object):
+    """ProgColumns holds the program in columns, one row per instruction:
+    kind (index in kinds), xyzrpw (X,Y,Z in mm and Rx,Ry,Rz in deg, same as the CSV file), joints (deg), value (speed, time, rounding, timeout...)
+    and text/text2 (index in strings for names, codes and messages).
+    Values that do not apply to an instruction are NaN (or -1 for text and text2).
+
+    Save writes a binary file (little endian) that LoadProgColumns maps in memory: the columns are returned as NumPy arrays that read the file on demand."""
+
+    def __init__(self, kinds=INSTRUCTIONS):
+        from array import array
+        self.kinds = list(kinds)
+        self.strings = []
+        self.kind = array('H')
+        self.xyzrpw = array('d')
+        self.joints = array('d')
+        self.njoints = array('H')   # number of joints of each row (the joints column is padded with NaN when saved)
+        self.value = array('d')
+        self.text = array('i')
+        self.text2 = array('i')
+        self._kind_ids = dict([(k, i) for i, k in enumerate(self.kinds)])
+        self._string_ids = {}
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.kind)
+
+    def _kind_id(self, kind):
+        kid = self._kind_ids.get(kind)
+        if kid is None:
+            kid = len(self.kinds)
+            self.kinds.append(kind)
+            self._kind_ids[kind] = kid
+        return kid
+
+    def _string_id(self, text):
+        if text is None:
+            return -1
+        sid = self._string_ids.get(text)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(text)
+            self._string_ids[text] = sid
+        return sid
+
+    def add(self, kind, pose=None, joints=None, value=None, text=None, text2=None):
+        """Add one instruction"""
+        nan = float('nan')
+        self.kind.append(self._kind_id(kind))
+        if pose is None:
+            self.xyzrpw.extend([nan] * 6)
+        else:
+            self.xyzrpw.extend(Pose_2_Staubli(pose))
+        if joints is None:
+            self.njoints.append(0)
+        else:
+            self.joints.extend([float(j) for j in joints])
+            self.njoints.append(len(joints))
+        self.value.append(nan if value is None else value)
+        self.text.append(self._string_id(text))
+        self.text2.append(self._string_id(text2))
+
+    def add_moves(self, kind, poses, joints, text=None):
+        """Add a batch of movements (same as calling add for each target)"""
+        if isinstance(poses, list) and any([pose is None for pose in poses]):
+            for pose, jnts in zip(poses, joints):
+                self.add(kind, pose if pose is None or isinstance(pose, Mat) else Mat(pose.tolist()), jnts, text=text)
+            return
+
+        targets = Poses_2_Staubli(poses)
+        if hasattr(targets, 'ravel'):
+            self.xyzrpw.extend(targets.ravel().tolist())
+        else:
+            for xyzrpw in targets:
+                self.xyzrpw.extend(xyzrpw)
+        for jnts in joints:
+            jnts = jnts.tolist() if hasattr(jnts, 'tolist') else jnts
+            self.joints.extend(jnts)
+            self.njoints.append(len(jnts))
+        n = len(targets)
+        self.kind.extend([self._kind_id(kind)] * n)
+        self.value.extend([float('nan')] * n)
+        self.text.extend([self._string_id(text)] * n)
+        self.text2.extend([-1] * n)
+
+    def Kind(self, row):
+        """Returns the instruction kind (str) of a row"""
+        return self.kinds[int(self.kind[row])]
+
+    def Text(self, row, column=1):
+        """Returns the text (column=1) or text2 (column=2) of a row, or None"""
+        sid = int((self.text if column == 1 else self.text2)[row])
+        return None if sid < 0 else self.strings[sid]
+
+    def Save(self, filename):
+        """Save the columns to a binary file (little endian) that can be read with LoadProgColumns.
+        Layout: magic, header (number of rows, joints, kinds and strings), xyzrpw (Nx6 doubles), joints (NxJ doubles), value (doubles), text and text2 (int32), kind (uint16) and the lengths and UTF-8 bytes of the kinds and strings."""
+        import struct
+        from array import array
+        nrows = len(self.kind)
+        ncols = max(self.njoints) if nrows > 0 else 0
+        joints = self.joints
+        if any([n != ncols for n in self.njoints]):
+            # Pad the joints of each row to the same number of joints
+            nan = float('nan')
+            joints = array('d')
+            i = 0
+            for n in self.njoints:
+                joints.extend(self.joints[i:i + n])
+                joints.extend([nan] * (ncols - n))
+                i += n
+
+        texts = [t.encode('utf-8') for t in self.kinds + self.strings]
+        lengths = array('i', [len(t) for t in texts])
+        with open(filename, 'wb') as fid:
+            fid.write(PROG_COLUMNS_MAGIC)
+            fid.write(struct.pack('<6i', nrows, ncols, len(self.kinds), len(self.strings), 0, 0))  # 2 reserved values
+            for column in [self.xyzrpw, joints, self.value, self.text, self.text2, self.kind, lengths]:
+                if sys.byteorder == 'big':
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(fid)
+            fid.write(b''.join(texts))
+
+    def Load(self, filename):
+        """Load the columns of a file saved with Save by mapping the file in memory. Returns the columns.
+        The xyzrpw and joints columns are Nx6 and NxJ NumPy arrays (read only). If NumPy is not available, the columns are copied to arrays (array module)."""
+        import mmap
+        import struct
+        from array import array
+        with open(filename, 'rb') as fid:
+            mm = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(PROG_COLUMNS_MAGIC)] != PROG_COLUMNS_MAGIC:
+            mm.close()
+            raise Exception('Invalid columns file: %s' % filename)
+
+        offset = len(PROG_COLUMNS_MAGIC)
+        nrows, ncols, nkinds, nstrings = struct.unpack('<6i', mm[offset:offset + 24])[:4]
+        offset += 24
+        layout = [('xyzrpw', 'd', nrows * 6), ('joints', 'd', nrows * ncols), ('value', 'd', nrows), ('text', 'i', nrows), ('text2', 'i', nrows), ('kind', 'H', nrows), ('lengths', 'i', nkinds + nstrings)]
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        columns = {}
+        for name, typecode, n in layout:
+            size = n * array(typecode).itemsize
+            if numpy is not None and name != 'lengths':
+                column = numpy.frombuffer(mm, dtype=numpy.dtype(typecode).newbyteorder('<'), count=n, offset=offset)
+            else:
+                column = array(typecode)
+                if hasattr(column, 'frombytes'):
+                    column.frombytes(mm[offset:offset + size])
+                else:
+                    column.fromstring(mm[offset:offset + size])
+                if sys.byteorder == 'big':
+                    column.byteswap()
+            columns[name] = column
+            offset += size
+
+        texts = []
+        for n in columns.pop('lengths'):
+            texts.append(mm[offset:offset + n].decode('utf-8'))
+            offset += n
+        if numpy is not None:
+            columns['xyzrpw'] = columns['xyzrpw'].reshape((nrows, 6))
+            columns['joints'] = columns['joints'].reshape((nrows, ncols))
+            self._mmap = mm
+        else:
+            mm.close()
+        self.__dict__.update(columns)
+        self.njoints = array('H', [ncols] * nrows)
+        self.kinds = texts[:nkinds]
+        self.strings = texts[nkinds:]
+        self._kind_ids = dict([(k, i) for i, k in enumerate(self.kinds)])
+        self._string_ids = dict([(s, i) for i, s in enumerate(self.strings)])
+        return self
+
+def LoadProgColumns(filename):
+    """Load a program saved as a columnar binary file (see ProgColumns)"""
+    return ProgColumns().Load(filename)
+
 # ----------------------------------------------------    
 # Object class that handles the robot instructions/syntax
-class RobotPost(object):
+class RobotPost(RobotPostBatch):
 
     PROG_EXT = 'csv'        # set the program extension
     
@@ -90,6 +296,11 @@ class RobotPost(object):
     
     SPEED_MMS = 100
     PROG = []
+    STREAM_PROG = False # Keep the program lines in a temporary file instead of memory (see ProgStream)
+    PROG_CSV = True     # Save the program as a CSV file
+    PROG_COLUMNS = False    # Save the program as a columnar binary file (see ProgColumns and LoadProgColumns)
+    PROG_EXT_COLUMNS = 'rdkcol'     # set the columnar binary file extension
+    COLS = None
     LOG = ''
     nAxes = 6
     REF_FRAME = eye(4)
@@ -103,8 +314,12 @@ class RobotPost(object):
     def __init__(self, robotpost=None, robotname=None, robot_axes = 6, **kwargs):
         self.ROBOT_POST = robotpost
         self.ROBOT_NAME = robotname
-        self.PROG = []
-        self.LOG = ''
+        self.STREAM_PROG = kwargs.get('stream_prog', self.STREAM_PROG)
+        self.PROG = ProgStream() if self.STREAM_PROG else []
+        self.PROG_CSV = kwargs.get('prog_csv', self.PROG_CSV)
+        self.PROG_COLUMNS = kwargs.get('prog_columns', self.PROG_COLUMNS)
+        self.COLS = ProgColumns() if self.PROG_COLUMNS else None
+        self.LOG = ProgLog()
         self.nAxes = robot_axes
         for k,v in kwargs.items():
             if k == 'lines_x_prog':
@@ -116,9 +331,11 @@ class RobotPost(object):
             str_axes += ',J%i (deg)' % (i+1)
         self.addline('Instruction,X (mm),Y (mm),Z (mm),Rx (deg),Ry (deg),Rz (deg)' + str_axes)
         self.addline('Program Start,' + progname)
+        self.addrow('Program Start', text=progname)
         
     def ProgFinish(self, progname):
         self.addline('Program Finish,' + progname)
+        self.addrow('Program Finish', text=progname)
         
     def ProgSave(self, folder, progname, ask_user=False, show_result=False):
         progname = progname + '.' + self.PROG_EXT
@@ -130,15 +347,29 @@ class RobotPost(object):
                 return
         else:
             filesave = folder + '/' + progname
-        fid = open(filesave, "w")
-        for line in self.PROG:
-            fid.write(line + '\n')
-        fid.close()
-        print('SAVED: %s\n' % filesave)
-        self.PROG_FILES = filesave
+        if self.COLS is not None:
+            import os
+            filecols = os.path.splitext(filesave)[0] + '.' + self.PROG_EXT_COLUMNS
+            self.COLS.Save(filecols)
+            print('SAVED: %s\n' % filecols)
+            self.PROG_FILES = filecols
+        if self.PROG_CSV:
+            fid = open(filesave, "w")
+            for line in self.PROG:
+                fid.write(line + '\n')
+            fid.close()
+            print('SAVED: %s\n' % filesave)
+            self.PROG_FILES = filesave
+        elif self.COLS is not None:
+            # Only the columnar binary file is saved
+            filesave = filecols
+        else:
+            filesave = None
         #---------------------- show result
         if show_result:
-            if type(show_result) is str:
+            if filesave is None:
+                pass
+            elif type(show_result) is str:
                 # Open file with provided application
                 import subprocess
                 p = subprocess.Popen([show_result, filesave])   
@@ -151,7 +382,7 @@ class RobotPost(object):
                 os.startfile(filesave)  
             
             if len(self.LOG) > 0:
-                mbox('Program generation LOG:\n\n' + self.LOG)
+                mbox(self.LOG.Summary())
     
     def ProgSendRobot(self, robot_ip, remote_path, ftp_user, ftp_pass):
         """Send a program to the robot using the provided parameters. This method is executed right after ProgSave if we selected the option "Send Program to Robot".
@@ -165,7 +396,9 @@ class RobotPost(object):
             # Enable exporting target names in: Tools-Options-Program-Export Target Names
             tname = "," + self._TargetName
             
-        self.addline('Move Joints,%s,%s%s' % (pose_2_str(pose), joints_2_str(joints), tname))
+        self.addrow('Move Joints', pose, joints, text=self._TargetName)
+        if self.PROG_CSV:
+            self.addline('Move Joints,%s,%s%s' % (pose_2_str(pose), joints_2_str(joints), tname))
         
     def MoveL(self, pose, joints, conf_RLF=None):
         """Add a linear movement"""
@@ -174,7 +407,31 @@ class RobotPost(object):
             # Enable exporting target names in: Tools-Options-Program-Export Target Names
             tname = "," + self._TargetName
             
-        self.addline('Move Linear,%s,%s%s' % (pose_2_str(pose), joints_2_str(joints), tname))
+        self.addrow('Move Linear', pose, joints, text=self._TargetName)
+        if self.PROG_CSV:
+            self.addline('Move Linear,%s,%s%s' % (pose_2_str(pose), joints_2_str(joints), tname))
+        
+    def MoveJ_Batch(self, poses, joints, confs=None):
+        """Add a batch of joint movements (same as calling MoveJ for each target)"""
+        tname = ""
+        if self._TargetName is not None:
+            tname = "," + self._TargetName
+            
+        if self.COLS is not None:
+            self.COLS.add_moves('Move Joints', poses, joints, self._TargetName)
+        if self.PROG_CSV:
+            self.PROG.extend(moves_2_str('Move Joints', poses, joints, tname))
+        
+    def MoveL_Batch(self, poses, joints, confs=None):
+        """Add a batch of linear movements (same as calling MoveL for each target)"""
+        tname = ""
+        if self._TargetName is not None:
+            tname = "," + self._TargetName
+            
+        if self.COLS is not None:
+            self.COLS.add_moves('Move Linear', poses, joints, self._TargetName)
+        if self.PROG_CSV:
+            self.PROG.extend(moves_2_str('Move Linear', poses, joints, tname))
         
     def MoveC(self, pose1, joints1, pose2, joints2, conf_RLF_1=None, conf_RLF_2=None):
         """Add a circular movement"""    
@@ -189,43 +446,54 @@ class RobotPost(object):
             
         self.addline('Move Circular (1),%s,%s%s' % (pose_2_str(pose1), joints_2_str(joints1),tname1))
         self.addline('Move Circular (2),%s,%s%s' % (pose_2_str(pose2), joints_2_str(joints2),tname2))
+        self.addrow('Move Circular (1)', pose1, joints1, text=tname1[1:] or None)
+        self.addrow('Move Circular (2)', pose2, joints2, text=tname2[1:] or None)
         
     def setFrame(self, pose, frame_id=None, frame_name=None):
         """Change the robot reference frame"""
         self.REF_FRAME = pose
         self.addline('Set Reference,' + pose_2_str(pose))
+        self.addrow('Set Reference', pose)
         
     def setTool(self, pose, tool_id=None, tool_name=None):
         """Change the robot TCP"""
         self.addline('Set Tool,' + pose_2_str(pose))
+        self.addrow('Set Tool', pose)
         
     def Pause(self, time_ms):
         """Pause the robot program"""
         if time_ms < 0:
             self.addline('Stop')
+            self.addrow('Stop')
         else:
             self.addline('Pause (ms),%.3f' % time_ms)
+            self.addrow('Pause (ms)', value=time_ms)
     
     def setSpeed(self, speed_mms):
         """Changes the robot speed (in mm/s)"""
         self.addline('Set Speed (mm/s),%.3f' % speed_mms)
+        self.addrow('Set Speed (mm/s)', value=speed_mms)
         #self.addline('F%.3f' % (speed_mms*60))
     
     def setAcceleration(self, accel_mmss):
         """Changes the robot acceleration (in mm/s2)"""
         self.addline('Set Acceleration (mm/s2),%.3f' % accel_mmss)
+        self.addrow('Set Acceleration (mm/s2)', value=accel_mmss)
     
     def setSpeedJoints(self, speed_degs):
         """Changes the robot joint speed (in deg/s)"""
         self.addline('Set Joint Speed (deg/s),%.3f' % speed_degs)
+        self.addrow('Set Joint Speed (deg/s)', value=speed_degs)
     
     def setAccelerationJoints(self, accel_degss):
         """Changes the robot joint acceleration (in deg/s2)"""
         self.addline('Set Joint Acceleration (deg/s2),%.3f' % accel_degss)
+        self.addrow('Set Joint Acceleration (deg/s2)', value=accel_degss)
         
     def setZoneData(self, zone_mm):
         """Changes the rounding radius (aka CNT, APO or zone data) to make the movement smoother"""
         self.addline('Set Rounding,%.3f' % zone_mm)
+        self.addrow('Set Rounding', value=zone_mm)
 
     def setDO(self, io_var, io_value):
         """Sets a variable (digital output) to a given value"""
@@ -239,6 +507,7 @@ class RobotPost(object):
 
         # at this point, io_var and io_value must be string values
         self.addline('Set DO,%s,%s' % (io_var, io_value))
+        self.addrow('Set DO', text=io_var, text2=io_value)
 
     def setAO(self, io_var, io_value):
         """Set an Analog Output"""
@@ -257,32 +526,48 @@ class RobotPost(object):
         # at this point, io_var and io_value must be string values
         if timeout_ms < 0:
             self.addline('Wait DI,%s,%s' % (io_var, io_value))
+            self.addrow('Wait DI', text=io_var, text2=io_value)
         else:
             self.addline('Wait DI,%s,%s,%.1f' % (io_var, io_value, timeout_ms))
+            self.addrow('Wait DI', value=timeout_ms, text=io_var, text2=io_value)
         
     def RunCode(self, code, is_function_call = False):
         """Adds code or a function call"""
         if is_function_call:
             code = code.replace(' ','_')
             self.addline("Run Program," + code)
+            self.addrow('Run Program', text=code)
         else:
             self.addline(code)
+            self.addrow('Code', text=code)
         
     def RunMessage(self, message, iscomment = False):
         """Display a message in the robot controller screen (teach pendant)"""
         if iscomment:
             self.addline('Comment,' + message)
+            self.addrow('Comment', text=message)
         else:
             self.addline('Show Message,%s' % message)
+            self.addrow('Show Message', text=message)
         
 # ------------------ private ----------------------                
     def addline(self, newline):
         """Add a program line"""
-        self.PROG.append(newline)
+        if self.PROG_CSV:
+            self.PROG.append(newline)
         
-    def addlog(self, newline):
+    def addrow(self, kind, pose=None, joints=None, value=None, text=None, text2=None):
+        """Add an instruction to the columnar binary program"""
+        if self.COLS is not None:
+            self.COLS.add(kind, pose, joints, value, text, text2)
+        
+    def addlog(self, newline, severity=LOG_WARNING):
         """Add a log message"""
-        self.LOG = self.LOG + newline + '\n'
+        if not self.PROG_CSV and self.COLS is not None:
+            # Row of the columnar binary program
+            self.LOG.add(newline, severity, len(self.COLS))
+        else:
+            self.LOG.add(newline, severity, len(self.PROG))
 
 # -------------------------------------------------
 # ------------ For testing purposes ---------------   
@@ -329,7 +614,7 @@ def test_post():
     for line in robot.PROG:
         print(line)
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
 
     input("Press Enter to close...")
 
@@ -58,7 +58,7 @@ from KUKA_KRC2 import RobotPost as BasePost
 # ----------------------------------------------------    
 # Object class that handles the robot instructions/syntax
 
-class RobotPost(BasePost):
+class RobotPost(BasePost, RobotPostBatch):
     # Maximum number of lines per program. It will then generate multiple "pages (files)" if the program is too long
     # This is the default value. You can change this value in RoboDK:
     # Tools-Options-Program-Limit the maximum number of lines per program
@@ -299,11 +299,145 @@ WAIT SEC 1
 ;ENDFOLD
 '''
 
+# ----------------------------------------------------
+# Formatting of KRL targets
+class TargetFormatter(object):
+    """Formats KRL targets ({X,Y,Z,A,B,C, external axes, S, T}) for a post configuration.
+    The format strings are built once for each number of joints, so a complete movement line takes a single % operation.
+    Batches of targets (MoveL_Batch, benchmarks) are converted in one pass with NumPy if it is available."""
+
+    def __init__(self, axes_data, add_config_turn=True, pose_decimals=3, axes_decimals=5):
+        self.AXES_DATA = list(axes_data)
+        self.ADD_CONFIG_TURN = add_config_turn
+        self.POSE_DECIMALS = pose_decimals
+        self.POSE = ','.join(['%s %%.%if' % (name, pose_decimals) for name in 'XYZABC'])
+        self.AXIS = ' %%.%if' % axes_decimals
+        self.CONFIG = ", S %s, T %s"
+        # Configuration strings given the 3 configuration bits (see conf_2_str)
+        self.CONFS = {}
+        for b1 in (False, True):
+            for b2 in (False, True):
+                for b3 in (False, True):
+                    self.CONFS[(b1, b2, b3)] = "'B%i%i%i'" % (b1, b2, b3)
+        self._axes = {}
+        self._moves = {}
+
+    def axes_format(self, first, last):
+        """Returns the format of the axes first to last-1 (for example: 'E1 %.5f,E2 %.5f')"""
+        key = (first, last)
+        fmt = self._axes.get(key)
+        if fmt is None:
+            fmt = ','.join([self.AXES_DATA[i] + self.AXIS for i in range(first, last)])
+            self._axes[key] = fmt
+        return fmt
+
+    def move_format(self, command, njoints, suffix, ext_axes=True):
+        """Returns the format of a movement line. The values are X,Y,Z,A,B,C, the external axes (if ext_axes is True) and the S and T strings (if ADD_CONFIG_TURN is True)."""
+        key = (command, njoints, suffix, ext_axes)
+        fmt = self._moves.get(key)
+        if fmt is None:
+            fmt = command + ' {' + self.POSE
+            if ext_axes and njoints > 6:
+                fmt += ',' + self.axes_format(6, njoints)
+            if self.ADD_CONFIG_TURN:
+                fmt += self.CONFIG
+            fmt += '}' + suffix.replace('%', '%%')
+            self._moves[key] = fmt
+        return fmt
+
+    def pose_values(self, pose):
+        """Returns the X,Y,Z,A,B,C values of a pose"""
+        if pose is None:
+            raise Exception("Unable to create a Linear movement (LIN) using a Joint Target. Use a Cartesian target instead.")
+        [x,y,z,r,p,w] = pose_2_xyzrpw(pose)
+        return (x,y,z,w,p,r)
+
+    def pose_2_str(self, pose):
+        return self.POSE % self.pose_values(pose)
+
+    def pose_2_str_ext(self, pose, joints):
+        njoints = len(joints)
+        if njoints <= 6:
+            return self.pose_2_str(pose)
+        return (self.POSE + ',' + self.axes_format(6, njoints)) % (self.pose_values(pose) + tuple(joints[6:]))
+
+    def angles_2_str(self, angles):
+        return self.axes_format(0, len(angles)) % tuple(angles)
+
+    def conf_2_str(self, confRLF):
+        if confRLF is None:
+            return "'B010'"
+        return self.CONFS[(confRLF[2] > 0, confRLF[1] == 0, confRLF[0] > 0)]
+
+    def joints_2_turn_str(self, joints):
+        if joints is None:
+            return "'B000000'"
+        return "'B" + ''.join(['1' if j < 0 else '0' for j in reversed(joints)]) + "'"
+
+    def move_2_str(self, command, pose, joints, conf_RLF, suffix, ext_axes=True):
+        """Returns a complete movement line, for example: LIN {X 1.000,...,C 180.000, S 'B010', T 'B000000'} C_DIS"""
+        njoints = len(joints) if joints is not None else 0
+        values = self.pose_values(pose)
+        if ext_axes and njoints > 6:
+            values += tuple(joints[6:])
+        if self.ADD_CONFIG_TURN:
+            values += (self.conf_2_str(conf_RLF), self.joints_2_turn_str(joints))
+        return self.move_format(command, njoints, suffix, ext_axes) % values
+
+    def moves_2_str(self, command, poses, joints, confs=None, suffix='', ext_axes=True, append=()):
+        """Returns the movement lines of a batch of targets (same result as calling move_2_str for each target).
+
+        :param poses: list of poses or Nx4x4 array
+        :param joints: list of joints or NxJ array
+        :param confs: list of configurations [R,F,L] or Nx3 array (optional)
+        :param append: values added to the joints of every target (for example, the extruder axis)
+        """
+        n = len(joints)
+        if n == 0:
+            return []
+        try:
+            import numpy as np
+            J = np.asarray(joints, dtype=np.float64)
+        except (ImportError, ValueError):
+            # NumPy not available or targets with a different number of joints
+            J = None
+        if J is not None and isinstance(poses, list) and any([p is None for p in poses]):
+            # Joint targets raise the same error as move_2_str
+            J = None
+        if J is None or J.ndim != 2:
+            confs = confs if confs is not None else [None] * n
+            append = list(append)
+            return [self.move_2_str(command, p, list(j) + append, c, suffix, ext_axes) for p, j, c in zip(poses, joints, confs)]
+
+        if len(append) > 0:
+            J = np.column_stack((J, np.tile(np.asarray(append, dtype=np.float64), (n, 1))))
+        xyzabc = Poses_2_KUKA(poses, self.POSE_DECIMALS).tolist()
+        njoints = J.shape[1]
+        fmt = self.move_format(command, njoints, suffix, ext_axes)
+        if ext_axes and njoints > 6:
+            values = [tuple(p) + tuple(e) for p, e in zip(xyzabc, J[:, 6:].tolist())]
+        else:
+            values = [tuple(p) for p in xyzabc]
+        if not self.ADD_CONFIG_TURN:
+            return [fmt % v for v in values]
+
+        # Turn bits: one bit per joint, the first joint is the last bit
+        turns = {}
+        turn_bits = (J < 0).astype(np.int64).dot(np.left_shift(1, np.arange(njoints, dtype=np.int64))).tolist()
+        for bits in set(turn_bits):
+            turns[bits] = "'B" + (format(bits, '0%ib' % njoints) if njoints > 0 else '') + "'"
+        if confs is None:
+            conf_strs = ["'B010'"] * n
+        else:
+            conf_strs = [self.conf_2_str(c) for c in (confs.tolist() if hasattr(confs, 'tolist') else confs)]
+        return [fmt % (v + (c, turns[t])) for v, c, t in zip(values, conf_strs, turn_bits)]
+
+
     
 # ----------------------------------------------------    
 # Object class that handles the robot instructions/syntax
 # Important: This is the default KUKA KRC2 Post used as a reference for all other posts
-class RobotPost(object):
+class RobotPost(RobotPostBatch):
     """Robot post object"""  
 
     current_program_name = ""
@@ -394,69 +528,30 @@ class RobotPost(object):
     def filtername_len(self, name):
         return FilterName(name[:self.PROG_NAME_LEN], 'P')
         
+    def target_formatter(self):
+        """Returns the target formatter for the current configuration (AXES_DATA and ADD_CONFIG_TURN)"""
+        if self.FORMATTER is None:
+            self.FORMATTER = TargetFormatter(self.AXES_DATA, self.ADD_CONFIG_TURN)
+        return self.FORMATTER
+
     def pose_2_str(self, pose):
         """Converts a pose target to a string"""
-        if pose is None:
-            raise Exception("Unable to create a Linear movement (LIN) using a Joint Target. Use a Cartesian target instead.")
         #[x,y,z,w,p,r] = Pose_2_KUKA(pose)
         #return ('X %.3f, Y %.3f, Z %.3f, A %.3f, B %.3f, C %.3f' % (x,y,z,w,p,r)) # old version had to be switched
-        [x,y,z,r,p,w] = pose_2_xyzrpw(pose)
-        return ('X %.3f,Y %.3f,Z %.3f,A %.3f,B %.3f,C %.3f' % (x,y,z,w,p,r))
+        return self.target_formatter().pose_2_str(pose)
 
     def pose_2_str_ext(self,pose,joints):
-        njoints = len(joints)
-        if njoints <= 6:
-            return self.pose_2_str(pose)
-        else:     
-            extaxes = ''
-            for i in range(njoints-6):
-                extaxes = extaxes + (',%s %.5f' % (self.AXES_DATA[i+6], joints[i+6]))
-            return self.pose_2_str(pose) + extaxes
+        return self.target_formatter().pose_2_str_ext(pose, joints)
         
     def angles_2_str(self,angles):
         """Prints a joint target"""
-        str = ''
-        #if self.KRC_VERSION >= 4:
-        #    str = 'AXIS: '       
-        
-        for i in range(len(angles)):
-            str = str + ('%s %.5f,' % (self.AXES_DATA[i], angles[i]))
-        str = str[:-1]
-        return str
+        return self.target_formatter().angles_2_str(angles)
 
-          
     def conf_2_str(self,confRLF):
-        if confRLF is None:
-            return "'B010'"
-        strconf = ""
-        if confRLF[2] > 0:
-            strconf = strconf + '1'
-        else:
-            strconf = strconf + '0'
-            
-        if confRLF[1] == 0:
-            strconf = strconf + '1'
-        else:
-            strconf = strconf + '0'
-            
-        if confRLF[0] > 0:
-            strconf = strconf + '1'
-        else:
-            strconf = strconf + '0'
-        
-        return "'B%s'" % strconf    
+        return self.target_formatter().conf_2_str(confRLF)
         
     def joints_2_turn_str(self,joints):
-        if joints is None:
-            return "'B000000'"
-            
-        strturn = ""
-        for i in range(len(joints)):
-            if joints[i] < 0:
-                strturn = '1' + strturn
-            else:
-                strturn = '0' + strturn
-        return "'B%s'" % strturn  
+        return self.target_formatter().joints_2_turn_str(joints)
     
     #------------------------------------------------
     #------------------------------------------------
@@ -477,6 +572,8 @@ class RobotPost(object):
     AutoCreateMain = True
     
     PROG = []
+    FORMATTER = None # Target formatter, built from the configuration when the program starts
+    STREAM_PROG = False # Keep the program lines in a temporary file instead of memory (see ProgStream)
     LOG = ''
     nAxes = 6
     APO_VALUE = 1
@@ -501,8 +598,9 @@ class RobotPost(object):
     def __init__(self, robotpost=None, robotname=None, robot_axes = 6, **kwargs):
         self.ROBOT_POST = robotpost
         self.ROBOT_NAME = robotname
-        self.PROG = []
-        self.LOG = ''
+        self.STREAM_PROG = kwargs.get('stream_prog', self.STREAM_PROG)
+        self.PROG = ProgStream() if self.STREAM_PROG else []
+        self.LOG = ProgLog()
         self.nAxes = robot_axes
         for k,v in kwargs.items():
             if k == 'lines_x_prog':
@@ -558,6 +656,8 @@ class RobotPost(object):
             # txt = self.part_name+progname_i
             # self.addline('DEF %s ( )' % txt)
         if not new_page:
+            # Build the target formatter again in case the configuration changed
+            self.FORMATTER = None
             if self.KRC_VERSION < 4:
                 # KRC2 needs this EXT declaration
                 self.PROG.append('EXT BAS (BAS_COMMAND :IN,REAL :IN )');
@@ -590,7 +690,7 @@ class RobotPost(object):
             self.PROG.append("END")
             self.PROG_LIST.append(self.PROG)
             self.PROG_CALLS_LIST.append(self.PROG_CALLS)
-            self.PROG = []
+            self.PROG = ProgStream() if self.STREAM_PROG else []
             self.PROG_CALLS = []
             self.nLines = 0
         else:
@@ -697,7 +797,7 @@ class RobotPost(object):
                 import os
                 os.startfile(filesave)
             if len(self.LOG) > 0:
-                mbox('Program generation LOG:\n\n' + self.LOG)    
+                mbox(self.LOG.Summary())    
     
     def ProgSendRobot(self, robot_ip, remote_path, ftp_user, ftp_pass):
         """Send a program to the robot using the provided parameters. This method is executed right after ProgSave if we selected the option "Send Program to Robot".
@@ -792,11 +892,7 @@ class RobotPost(object):
             joints.append(self.PRINT_E_NEW_MOTOR)
             
         # self.addline('PTP {' + self.angles_2_str(joints) + '}' + self.C_PTP)
-        str_config = ''
-        if self.ADD_CONFIG_TURN:
-            str_config = ', S %s, T %s' % (self.conf_2_str(conf_RLF), self.joints_2_turn_str(joints))
-            
-        self.addline('PTP {' + self.pose_2_str(pose) + str_config +'}' + self.C_PTP)
+        self.addline(self.target_formatter().move_2_str('PTP', pose, joints, conf_RLF, self.C_PTP, False))
         
     def MoveL(self, pose, joints, conf_RLF=None):
         if self.base_frame_should_be_called == True:
@@ -817,13 +913,22 @@ class RobotPost(object):
         if self.EXTAXIS_EXTRUDER:
             joints.append(self.PRINT_E_NEW_MOTOR)
         
-        # Optionally, add configuration data
-        str_config = ''
-        if self.ADD_CONFIG_TURN:
-            str_config = ', S %s, T %s' % (self.conf_2_str(conf_RLF), self.joints_2_turn_str(joints))
-            
-        self.addline('LIN {' + self.pose_2_str_ext(pose,joints) + str_config + '}' + self.C_DIS)
+        # Optionally, add configuration data (ADD_CONFIG_TURN)
+        self.addline(self.target_formatter().move_2_str('LIN', pose, joints, conf_RLF, self.C_DIS))
         
+    def MoveJ_Batch(self, poses, joints, confs=None):
+        """Add a batch of joint movements (same program as calling MoveJ for each target)"""
+        self.addmoves(self.MoveJ, 'PTP', self.C_PTP, False, poses, joints, confs)
+
+    def MoveL_Batch(self, poses, joints, confs=None):
+        """Add a batch of linear movements (same program as calling MoveL for each target)"""
+        if not (self.WELD_EXTRUDER or self.EXTAXIS_EXTRUDER) and self.PRINT_E_NEW is not None:
+            # 3D printing with a custom extruder depends on each movement (new_move)
+            RobotPostBatch.MoveL_Batch(self, poses, joints, confs)
+            return
+
+        self.addmoves(self.MoveL, 'LIN', self.C_DIS, True, poses, joints, confs)
+
     def MoveC(self, pose1, joints1, pose2, joints2, conf_RLF_1=None, conf_RLF_2=None):
         if self.base_frame_should_be_called == True:
             self.base_frame_should_be_called = False
@@ -1101,13 +1206,34 @@ class RobotPost(object):
 
         self.PROG.append(newline)
         self.nLines = self.nLines + 1
+
+    def addmoves(self, move, command, suffix, ext_axes, poses, joints, confs):
+        """Add a batch of movements (same lines as calling move for each target).
+        The lines are formatted in chunks that end when addline starts a new page: the first movement of each page is added with move to add the tool definition."""
+        append = [self.PRINT_E_NEW_MOTOR] if self.EXTAXIS_EXTRUDER else []
+        formatter = self.target_formatter()
+        addline = self.addline
+        n = len(joints)
+        start = 0
+        while start < n:
+            if self.base_frame_should_be_called:
+                move(*BatchTarget(poses, joints, confs, start))
+                start += 1
+                continue
+
+            # addline starts a new page when nLines > lines_x_prog (the line that starts a page is the last one of a chunk)
+            end = min(n, start + max(1, self.lines_x_prog + 1 - self.nLines))
+            chunk_confs = confs[start:end] if confs is not None else None
+            for line in formatter.moves_2_str(command, poses[start:end], joints[start:end], chunk_confs, suffix, ext_axes, append):
+                addline(line)
+            start = end
         
-    def addlog(self, newline):
+    def addlog(self, newline, severity=LOG_WARNING):
         """Add a log message"""
         if self.nProgs > 1 and not self.INCLUDE_SUB_PROGRAMS:
             return
             
-        self.LOG = self.LOG + newline + '\n'
+        self.LOG.add(newline, severity, len(self.PROG))
 
 # -------------------------------------------------
 # ------------ For testing purposes ---------------   
@@ -1154,7 +1280,7 @@ def test_post():
         print(line)
         
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
 
     input("Press Enter to close...")
 
@@ -296,6 +296,7 @@ def joints_2_str(joints):
     str = str[:-1]
     return str
 
+
 # Parent: make sure the parent matches
 def PoseDistance(pose1, pose2):
     """0.000001"""
@@ -307,7 +308,7 @@ def PoseDistance(pose1, pose2):
 
 # ----------------------------------------------------    
 # Object class that handles the robot instructions/syntax
-class RobotPost(object):
+class RobotPost(RobotPostBatch):
 
     #Code generation mode
     # 1 = simulate
@@ -336,6 +337,7 @@ class RobotPost(object):
     PROG_FILES = []
     
     PROG = []
+    STREAM_PROG = False # Keep the program lines in a temporary file instead of memory (see ProgStream)
     LOG = ''
     nAxes = 6
     REF_FRAME = eye(4)
@@ -344,8 +346,9 @@ class RobotPost(object):
     def __init__(self, robotpost=None, robotname=None, robot_axes = 6, ip_com=r"""127.0.0.1""", **kwargs):
         self.ROBOT_POST = robotpost
         self.ROBOT_NAME = robotname
-        self.PROG = []
-        self.LOG = ''
+        self.STREAM_PROG = kwargs.get('stream_prog', self.STREAM_PROG)
+        self.PROG = ProgStream() if self.STREAM_PROG else []
+        self.LOG = ProgLog()
         self.nAxes = robot_axes
 
         self.addline('import sys')
@@ -444,7 +447,7 @@ class RobotPost(object):
                 os.startfile(filesave)  
             
             if len(self.LOG) > 0:
-                mbox('Program generation LOG:\n\n' + self.LOG)
+                mbox(self.LOG.Summary())
     
     def ProgSendRobot(self, robot_ip, remote_path, ftp_user, ftp_pass):
         """Send a program to the robot using the provided parameters. This method is executed right after ProgSave if we selected the option "Send Program to Robot".
@@ -466,6 +469,14 @@ class RobotPost(object):
         pose_abs = self.REF_FRAME * pose
         self.addline('    %s.MoveL([%s])' % (FilterName(self.ROBOT_NAME).replace('.',''), joints_2_str(joints) + ',' + mat_2_str(pose) ) )
         
+    def MoveJ_Batch(self, poses, joints, confs=None):
+        """Add a batch of joint movements (same as calling MoveJ for each target)"""
+        self.addlines_batch(self.MoveJ, '    %s.MoveJ([%%(joints)s])' % FilterName(self.ROBOT_NAME).replace('.', ''), poses, joints, confs)
+
+    def MoveL_Batch(self, poses, joints, confs=None):
+        """Add a batch of linear movements (same as calling MoveL for each target)"""
+        self.addlines_batch(self.MoveL, '    %s.MoveL([%%(joints)s,%%(pose)s])' % FilterName(self.ROBOT_NAME).replace('.', ''), poses, joints, confs)
+
     def MoveC(self, pose1, joints1, pose2, joints2, conf_RLF_1=None, conf_RLF_2=None):
         """Add a circular movement"""    
         if pose1 is None or pose2 is None:
@@ -565,9 +576,9 @@ class RobotPost(object):
         """Add a program line"""
         self.PROG.append(newline)
         
-    def addlog(self, newline):
+    def addlog(self, newline, severity=LOG_WARNING):
         """Add a log message"""
-        self.LOG = self.LOG + newline + '\n'
+        self.LOG.add(newline, severity, len(self.PROG))
 
 # -------------------------------------------------
 # ------------ For testing purposes ---------------   
@@ -629,14 +640,14 @@ def test_post():
     for line in robot.PROG:
         print(line)
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
     #input("Press Enter to close...")
     #return
     robot.ProgSave(".","Program",True)
     for line in robot.PROG:
         print(line)
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
 
     input("Press Enter to close...")
 
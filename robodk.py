@@ -33,9 +33,10 @@
 import math
 import operator
 import sys
-import unittest
 import time
 
+_ROBODK_IMPORT_START = time.time()
+
 #----------------------------------------------------
 #--------      Generic file usage     ---------------
 
@@ -201,7 +202,7 @@ def rotx(rx):
     """
     ct = math.cos(rx)
     st = math.sin(rx)
-    return Mat([[1, 0, 0, 0], [0, ct, -st, 0], [0, st, ct, 0], [0, 0, 0, 1]])
+    return _pose4(1, 0, 0, 0, 0, ct, -st, 0, 0, st, ct, 0)
 
 
 def roty(ry):
@@ -221,7 +222,7 @@ def roty(ry):
     """
     ct = math.cos(ry)
     st = math.sin(ry)
-    return Mat([[ct, 0, st, 0], [0, 1, 0, 0], [-st, 0, ct, 0], [0, 0, 0, 1]])
+    return _pose4(ct, 0, st, 0, 0, 1, 0, 0, -st, 0, ct, 0)
 
 
 def rotz(rz):
@@ -241,7 +242,7 @@ def rotz(rz):
     """
     ct = math.cos(rz)
     st = math.sin(rz)
-    return Mat([[ct, -st, 0, 0], [st, ct, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    return _pose4(ct, -st, 0, 0, st, ct, 0, 0, 0, 0, 1, 0)
 
 
 def transl(tx, ty=None, tz=None):
@@ -269,7 +270,7 @@ def transl(tx, ty=None, tz=None):
         xx = tx
         yy = ty
         zz = tz
-    return Mat([[1, 0, 0, xx], [0, 1, 0, yy], [0, 0, 1, zz], [0, 0, 0, 1]])
+    return _pose4(1, 0, 0, xx, 0, 1, 0, yy, 0, 0, 1, zz)
 
 
 def RelTool(target_pose, x, y, z, rx=0, ry=0, rz=0):
@@ -285,7 +286,7 @@ def RelTool(target_pose, x, y, z, rx=0, ry=0, rz=0):
 
     .. seealso:: :func:`~robodk.Offset`, :func:`~robodk.transl`, :func:`~robodk.rotx`, :func:`~robodk.roty`, :func:`~robodk.rotz`
     """
-    if type(target_pose) != Mat:
+    if not isinstance(target_pose, Mat):
         target_pose = target_pose.Pose()
     new_target = target_pose * transl(x, y, z) * rotx(rx * pi / 180) * roty(ry * pi / 180) * rotz(rz * pi / 180)
     return new_target
@@ -304,7 +305,7 @@ def Offset(target_pose, x, y, z, rx=0, ry=0, rz=0):
 
     .. seealso:: :func:`~robodk.RelTool`, :func:`~robodk.transl`, :func:`~robodk.rotx`, :func:`~robodk.roty`, :func:`~robodk.rotz`
     """
-    if type(target_pose) != Mat:
+    if not isinstance(target_pose, Mat):
         # item object assumed:
         target_pose = target_pose.Pose()
     if not target_pose.isHomogeneous():
@@ -412,10 +413,193 @@ def toc():
         return -1
 
 
+def _csv_decimal(value):
+    """Returns the value of a CSV cell as a float if possible, otherwise as a string"""
+    try:
+        return float(value)
+    except:
+        return value
+
+
+def _csv_numeric_columns(rows):
+    """Sniffs the column types of a sample of CSV rows. Returns a list of booleans (True if the column is numeric) for the most common row length."""
+    if len(rows) == 0:
+        return []
+    lengths = [len(row) for row in rows]
+    ncols = max(set(lengths), key=lengths.count)
+    numeric = []
+    for j in range(ncols):
+        nnum = 0
+        ntxt = 0
+        for row in rows:
+            if len(row) > j:
+                if isinstance(_csv_decimal(row[j]), float):
+                    nnum += 1
+                else:
+                    ntxt += 1
+        numeric.append(nnum > ntxt)
+    return numeric
+
+
+def IterList(strfile, separator=',', codec='utf-8', sniff_rows=100):
+    """Iterates over the rows of a CSV file or a TXT file. Each row is a list of numbers (or strings if a value is not a number), the same rows LoadList returns.
+    The column types are sniffed once with the first rows (sniff_rows) so that numeric rows are converted without checking each value.
+
+    .. seealso:: :func:`~robodk.LoadList`, :func:`~robodk.IterArrays`, :func:`~robodk.LoadArray`
+
+    Example:
+
+        .. code-block:: python
+
+            for row in IterList(strfile, ','):
+                print(row)
+
+    """
+    import csv
+    import io
+    import itertools
+    with io.open(strfile, 'r', encoding=codec, newline='') as csvfile:
+        csvread = csv.reader(csvfile, delimiter=separator, quotechar='|')
+        sample = list(itertools.islice(csvread, sniff_rows))
+        numeric = _csv_numeric_columns(sample)
+        ncols = len(numeric)
+        all_numeric = all(numeric)
+        for row in itertools.chain(sample, csvread):
+            if len(row) == ncols:
+                try:
+                    if all_numeric:
+                        yield list(map(float, row))
+                    else:
+                        yield [float(value) if num else _csv_decimal(value) for value, num in zip(row, numeric)]
+                    continue
+                except ValueError:
+                    pass
+            yield [_csv_decimal(value) for value in row]
+
+
+def IterArrays(strfile, separator=',', chunk_rows=65536, skip_rows=0, codec='utf-8'):
+    """Iterates over a numeric CSV file or TXT file in chunks of rows. Each chunk is a float64 NumPy array with up to chunk_rows rows.
+    The number of columns is given by the first row (after skip_rows). Values that are not numbers are NaN, short rows are filled with NaN and empty rows and trailing separators are ignored.
+
+    .. seealso:: :func:`~robodk.LoadArray`, :func:`~robodk.IterList`
+    """
+    import numpy as np
+    import itertools
+    ncols = None
+    chunk = []
+    for row in itertools.islice(IterList(strfile, separator, codec), skip_rows, None):
+        while len(row) > 0 and row[-1] == '':
+            row = row[:-1]
+        if len(row) == 0:
+            continue
+        if ncols is None:
+            ncols = len(row)
+        elif len(row) != ncols:
+            if len(row) > ncols:
+                raise Exception('Invalid row length: %i values found, %i expected (%s)' % (len(row), ncols, strfile))
+            row = row + [float('nan')] * (ncols - len(row))
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield _csv_chunk_2_array(np, chunk, ncols)
+            chunk = []
+    if len(chunk) > 0:
+        yield _csv_chunk_2_array(np, chunk, ncols)
+
+
+def _csv_chunk_2_array(np, chunk, ncols):
+    """Returns a float64 array given a list of rows (strings are set to NaN)"""
+    try:
+        return np.array(chunk, dtype=np.float64)
+    except (ValueError, TypeError):
+        nan = float('nan')
+        return np.array([[value if isinstance(value, float) else nan for value in row] for row in chunk], dtype=np.float64).reshape((-1, ncols))
+
+
+def LoadArray(strfile, separator=',', skip_rows=0, codec='utf-8', block_size=4194304):
+    """Load a numeric CSV file or TXT file to a float64 NumPy array (NxM), same as concatenating the chunks of IterArrays.
+    The file is read in blocks of about block_size characters and the rows are copied to one array that grows in place, so the memory used is about the size of the returned array.
+    Files with numbers only (such as the files saved with SaveList or SaveMat) are parsed block by block without creating lists. Returns a list of lists of numbers if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.IterArrays`, :func:`~robodk.LoadList`, :func:`~robodk.SaveList`
+    """
+    np = _numpy_or_none()
+    if np is None:
+        return LoadList(strfile, separator, codec)[skip_rows:]
+
+    import io
+    file_size = os.path.getsize(strfile)
+    rows = _RowBuffer(np)
+    if separator.strip() != '':
+        with io.open(strfile, 'r', encoding=codec, newline='') as fid:
+            for i in range(skip_rows):
+                fid.readline()
+            while True:
+                text = ''.join(fid.readlines(block_size))
+                if text == '':
+                    return rows.array()
+                block = _csv_block_2_array(np, text, separator)
+                if block is None or not rows.add(block, int(1.02 * file_size * len(block) / len(text)) + 1):
+                    # The file requires the generic parser (IterArrays)
+                    break
+
+    rows = _RowBuffer(np)
+    for chunk in IterArrays(strfile, separator, skip_rows=skip_rows, codec=codec):
+        rows.add(chunk)
+    return rows.array()
+
+
+def _csv_block_2_array(np, text, separator):
+    """Returns the float64 array of a block of lines with one number per cell (no quotes and no empty cells other than trailing separators), or None if the block requires the generic parser"""
+    if '|' in text or separator * 2 in text or '\n' + separator in '\n' + text:
+        return None
+    text = text.replace(separator, ' ')
+    ncols = set([len(line.split()) for line in text.splitlines()])
+    ncols.discard(0)
+    if len(ncols) == 0:
+        return np.zeros((0, 0))
+    if len(ncols) != 1:
+        return None
+    try:
+        return np.array(text.split(), dtype=np.float64).reshape((-1, ncols.pop()))
+    except ValueError:
+        return None
+
+
+class _RowBuffer(object):
+    """Float64 array of rows that grows in place (see LoadArray)"""
+
+    def __init__(self, np):
+        self.np = np
+        self.arr = None
+        self.nrows = 0
+
+    def add(self, block, rows_hint=0):
+        """Append the rows of a block. Returns False if the number of columns is different. rows_hint is the estimated number of rows of the file."""
+        if len(block) == 0:
+            return True
+        n = self.nrows + len(block)
+        if self.arr is None:
+            self.arr = self.np.empty((max(n, rows_hint), block.shape[1]))
+        elif block.shape[1] != self.arr.shape[1]:
+            return False
+        elif n > len(self.arr):
+            self.arr.resize((max(n, len(self.arr) * 3 // 2), self.arr.shape[1]), refcheck=False)
+        self.arr[self.nrows:n] = block
+        self.nrows = n
+        return True
+
+    def array(self):
+        """Returns the rows as an array (the unused rows are released)"""
+        if self.arr is None:
+            return self.np.zeros((0, 0))
+        self.arr.resize((self.nrows, self.arr.shape[1]), refcheck=False)
+        return self.arr
+
+
 def LoadList(strfile, separator=',', codec='utf-8'):
     """Load data from a CSV file or a TXT file to a Python list (list of list of numbers)
 
-    .. seealso:: :func:`~robodk.SaveList`, :func:`~robodk.LoadMat`
+    .. seealso:: :func:`~robodk.SaveList`, :func:`~robodk.LoadMat`, :func:`~robodk.IterList`, :func:`~robodk.LoadArray`
 
     Example:
 
@@ -431,31 +615,43 @@ def LoadList(strfile, separator=',', codec='utf-8'):
             # SaveList(csvdata, strfile, ',')
 
     """
-    def todecimal(value):
-        try:
-            return float(value)
-        except:
-            return value
+    return list(IterList(strfile, separator, codec))
 
-    import csv
-    import codecs
-    # Read all CSV data:
-    csvdata = []
-    #with open(strfile) as csvfile:
-    with codecs.open(strfile, "r", codec) as csvfile:
-        csvread = csv.reader(csvfile, delimiter=separator, quotechar='|')
-        for row in csvread:
-            row_nums = [todecimal(i) for i in row]
-            csvdata.append(row_nums)
-    return csvdata
+
+def _save_rows(rows, strfile, separator=','):
+    """Save rows of numbers to a CSV or TXT file: each value is written as %.6f followed by the separator"""
+    sep = separator.replace('%', '%%')
+    formats = {}
+    lines = []
+    with open(strfile, 'w') as fid:
+        for row in rows:
+            n = len(row)
+            fmt = formats.get(n)
+            if fmt is None:
+                fmt = ('%.6f' + sep) * n + '\n'
+                formats[n] = fmt
+            lines.append(fmt % tuple(row))
+            if len(lines) >= 4096:
+                fid.write(''.join(lines))
+                lines = []
+        fid.write(''.join(lines))
 
 
 def SaveList(list_variable, strfile, separator=','):
     """Save a list or a list of lists as a CSV or TXT file.
 
     .. seealso:: :func:`~robodk.LoadList`, :func:`~robodk.LoadMat`"""
-
-    Mat(list_variable).tr().SaveMat(strfile, separator)
+    rows = list_variable
+    if hasattr(rows, 'tolist'):
+        rows = rows.tolist()
+    if len(rows) > 0 and not isinstance(rows[0], (list, tuple)):
+        # List of values: one value per line
+        rows = [[value] for value in rows]
+    else:
+        # Fill short rows with zeros (same as Mat)
+        n = max([len(row) for row in rows]) if len(rows) > 0 else 0
+        rows = [row if len(row) == n else list(row) + [0] * (n - len(row)) for row in rows]
+    _save_rows(rows, strfile, separator)
 
 
 def LoadMat(strfile, separator=','):
@@ -483,7 +679,7 @@ def PosePP(x,y,z,r,p,w):
     sb = math.sin(b)
     cc = math.cos(c)
     sc = math.sin(c)
-    return Mat([[cb*ca,ca*sc*sb-cc*sa,sc*sa+cc*ca*sb,x],[cb*sa,cc*ca+sc*sb*sa,cc*sb*sa-ca*sc,y],[-sb,cb*sc,cc*cb,z],[0.0,0.0,0.0,1.0]])
+    return _pose4(cb*ca,ca*sc*sb-cc*sa,sc*sa+cc*ca*sb,x,cb*sa,cc*ca+sc*sb*sa,cc*sb*sa-ca*sc,y,-sb,cb*sc,cc*cb,z)
     
 def pose_2_xyzrpw(H):
     """Calculates the equivalent position (mm) and Euler angles (deg) as an [x,y,z,r,p,w] array, given a pose.
@@ -496,21 +692,19 @@ def pose_2_xyzrpw(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if (H[2, 0] > (1.0 - 1e-10)):
+    h00, h01, h02, x, h10, h11, h12, y, h20, h21, h22, z = _pose_2_12(H)
+    if (h20 > (1.0 - 1e-10)):
         p = -pi / 2
         r = 0
-        w = math.atan2(-H[1, 2], H[1, 1])
-    elif H[2, 0] < -1.0 + 1e-10:
+        w = math.atan2(-h12, h11)
+    elif h20 < -1.0 + 1e-10:
         p = pi / 2
         r = 0
-        w = math.atan2(H[1, 2], H[1, 1])
+        w = math.atan2(h12, h11)
     else:
-        p = math.atan2(-H[2, 0], sqrt(H[0, 0] * H[0, 0] + H[1, 0] * H[1, 0]))
-        w = math.atan2(H[1, 0], H[0, 0])
-        r = math.atan2(H[2, 1], H[2, 2])
+        p = math.atan2(-h20, sqrt(h00 * h00 + h10 * h10))
+        w = math.atan2(h10, h00)
+        r = math.atan2(h21, h22)
     return [x, y, z, r * 180 / pi, p * 180 / pi, w * 180 / pi]
 
 
@@ -530,7 +724,7 @@ def xyzrpw_2_pose(xyzrpw):
     sb = math.sin(b)
     cc = math.cos(c)
     sc = math.sin(c)
-    H = Mat([[cb * cc, cc * sa * sb - ca * sc, sa * sc + ca * cc * sb, x], [cb * sc, ca * cc + sa * sb * sc, ca * sb * sc - cc * sa, y], [-sb, cb * sa, ca * cb, z], [0, 0, 0, 1]])
+    H = _pose4(cb * cc, cc * sa * sb - ca * sc, sa * sc + ca * cc * sb, x, cb * sc, ca * cc + sa * sb * sc, ca * sb * sc - cc * sa, y, -sb, cb * sa, ca * cb, z)
     return H
 
 
@@ -557,7 +751,7 @@ def Pose(x, y, z, rxd, ryd, rzd):
     cry = math.cos(ry)
     srz = math.sin(rz)
     crz = math.cos(rz)
-    return Mat([[cry * crz, -cry * srz, sry, x], [crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y], [srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z], [0, 0, 0, 1]])
+    return _pose4(cry * crz, -cry * srz, sry, x, crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y, srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z)
 
 def TxyzRxyz_2_Pose(xyzrpw):
     """Returns the pose given the position (mm) and Euler angles (rad) as an array [x,y,z,rx,ry,rz].
@@ -575,7 +769,7 @@ def TxyzRxyz_2_Pose(xyzrpw):
     cry = math.cos(ry)
     srz = math.sin(rz)
     crz = math.cos(rz)
-    H = Mat([[cry * crz, -cry * srz, sry, x], [crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y], [srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z], [0, 0, 0, 1]])
+    H = _pose4(cry * crz, -cry * srz, sry, x, crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y, srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z)
     return H
 
 
@@ -589,22 +783,15 @@ def Pose_2_TxyzRxyz(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    a = H[0, 0]
-    b = H[0, 1]
-    c = H[0, 2]
-    d = H[1, 2]
-    e = H[2, 2]
+    a, b, c, x, h10, h11, d, y, h20, h21, e, z = _pose_2_12(H)
     if c > (1.0 - 1e-10):
         ry1 = pi / 2
         rx1 = 0
-        rz1 = atan2(H[1, 0], H[1, 1])
+        rz1 = atan2(h10, h11)
     elif c < (-1.0 + 1e-10):
         ry1 = -pi / 2
         rx1 = 0
-        rz1 = atan2(H[1, 0], H[1, 1])
+        rz1 = atan2(h10, h11)
     else:
         sy = c
         cy1 = +sqrt(1 - sy * sy)
@@ -701,21 +888,19 @@ def Pose_2_KUKA(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if (H[2, 0]) > (1.0 - 1e-10):
+    h00, h01, h02, x, h10, h11, h12, y, h20, h21, h22, z = _pose_2_12(H)
+    if h20 > (1.0 - 1e-10):
         p = -pi / 2
         r = 0
-        w = atan2(-H[1, 2], H[1, 1])
-    elif (H[2, 0]) < (-1.0 + 1e-10):
+        w = atan2(-h12, h11)
+    elif h20 < (-1.0 + 1e-10):
         p = pi / 2
         r = 0
-        w = atan2(H[1, 2], H[1, 1])
+        w = atan2(h12, h11)
     else:
-        p = atan2(-H[2, 0], sqrt(H[0, 0] * H[0, 0] + H[1, 0] * H[1, 0]))
-        w = atan2(H[1, 0], H[0, 0])
-        r = atan2(H[2, 1], H[2, 2])
+        p = atan2(-h20, sqrt(h00 * h00 + h10 * h10))
+        w = atan2(h10, h00)
+        r = atan2(h21, h22)
     return [x, y, z, w * 180 / pi, p * 180 / pi, r * 180 / pi]
 
 
@@ -734,7 +919,7 @@ def KUKA_2_Pose(xyzrpw):
     sb = math.sin(b)
     cc = math.cos(c)
     sc = math.sin(c)
-    return Mat([[cb * ca, ca * sc * sb - cc * sa, sc * sa + cc * ca * sb, x], [cb * sa, cc * ca + sc * sb * sa, cc * sb * sa - ca * sc, y], [-sb, cb * sc, cc * cb, z], [0.0, 0.0, 0.0, 1.0]])
+    return _pose4(cb * ca, ca * sc * sb - cc * sa, sc * sa + cc * ca * sb, x, cb * sa, cc * ca + sc * sb * sa, cc * sb * sa - ca * sc, y, -sb, cb * sc, cc * cb, z)
 
 
 def Adept_2_Pose(xyzrpw):
@@ -752,7 +937,7 @@ def Adept_2_Pose(xyzrpw):
     sb = math.sin(b)
     cc = math.cos(c)
     sc = math.sin(c)
-    return Mat([[ca * cb * cc - sa * sc, -cc * sa - ca * cb * sc, ca * sb, x], [ca * sc + cb * cc * sa, ca * cc - cb * sa * sc, sa * sb, y], [-cc * sb, sb * sc, cb, z], [0.0, 0.0, 0.0, 1.0]])
+    return _pose4(ca * cb * cc - sa * sc, -cc * sa - ca * cb * sc, ca * sb, x, ca * sc + cb * cc * sa, ca * cc - cb * sa * sc, sa * sb, y, -cc * sb, sb * sc, cb, z)
 
 
 def Pose_2_Adept(H):
@@ -763,24 +948,22 @@ def Pose_2_Adept(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if H[2, 2] > (1.0 - 1e-10):
+    h00, h01, h02, x, h10, h11, h12, y, h20, h21, h22, z = _pose_2_12(H)
+    if h22 > (1.0 - 1e-10):
         r = 0
         p = 0
-        w = atan2(H[1, 0], H[0, 0])
-    elif H[2, 2] < (-1.0 + 1e-10):
+        w = atan2(h10, h00)
+    elif h22 < (-1.0 + 1e-10):
         r = 0
         p = pi
-        w = atan2(H[1, 0], H[1, 1])
+        w = atan2(h10, h11)
     else:
-        cb = H[2, 2]
+        cb = h22
         sb = +sqrt(1 - cb * cb)
-        sc = H[2, 1] / sb
-        cc = -H[2, 0] / sb
-        sa = H[1, 2] / sb
-        ca = H[0, 2] / sb
+        sc = h21 / sb
+        cc = -h20 / sb
+        sa = h12 / sb
+        ca = h02 / sb
         r = atan2(sa, ca)
         p = atan2(sb, cb)
         w = atan2(sc, cc)
@@ -833,22 +1016,28 @@ def pose_2_quaternion(Ti):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    a = (Ti[0, 0])
-    b = (Ti[1, 1])
-    c = (Ti[2, 2])
-    sign2 = 1
-    sign3 = 1
-    sign4 = 1
-    if (Ti[2, 1] - Ti[1, 2]) < 0:
-        sign2 = -1
-    if (Ti[0, 2] - Ti[2, 0]) < 0:
-        sign3 = -1
-    if (Ti[1, 0] - Ti[0, 1]) < 0:
-        sign4 = -1
-    q1 = sqrt(max(a + b + c + 1, 0)) / 2
-    q2 = sign2 * sqrt(max(a - b - c + 1, 0)) / 2
-    q3 = sign3 * sqrt(max(-a + b - c + 1, 0)) / 2
-    q4 = sign4 * sqrt(max(-a - b + c + 1, 0)) / 2
+    h00, h01, h02, x, h10, h11, h12, y, h20, h21, h22, z = _pose_2_12(Ti)
+    return _rot_2_quaternion(h00, h01, h02, h10, h11, h12, h20, h21, h22)
+
+
+def _rot_2_quaternion(h00, h01, h02, h10, h11, h12, h20, h21, h22):
+    """Returns the quaternion [q1,q2,q3,q4] (q1 >= 0) of a rotation matrix given row by row.
+    The largest component is calculated first (Shepperd's method) so that the result is accurate for any rotation, including rotations of 180 deg."""
+    trace = h00 + h11 + h22
+    if trace >= h00 and trace >= h11 and trace >= h22:
+        s = 2.0 * sqrt(1.0 + trace)
+        q1, q2, q3, q4 = 0.25 * s, (h21 - h12) / s, (h02 - h20) / s, (h10 - h01) / s
+    elif h00 >= h11 and h00 >= h22:
+        s = 2.0 * sqrt(max(1.0 + h00 - h11 - h22, 0.0))
+        q1, q2, q3, q4 = (h21 - h12) / s, 0.25 * s, (h01 + h10) / s, (h02 + h20) / s
+    elif h11 >= h22:
+        s = 2.0 * sqrt(max(1.0 + h11 - h00 - h22, 0.0))
+        q1, q2, q3, q4 = (h02 - h20) / s, (h01 + h10) / s, 0.25 * s, (h12 + h21) / s
+    else:
+        s = 2.0 * sqrt(max(1.0 + h22 - h00 - h11, 0.0))
+        q1, q2, q3, q4 = (h10 - h01) / s, (h02 + h20) / s, (h12 + h21) / s, 0.25 * s
+    if q1 < 0:
+        return [-q1, -q2, -q3, -q4]
     return [q1, q2, q3, q4]
 
 
@@ -865,6 +1054,11 @@ def Pose_Split(pose1, pose2, delta_mm=1.0):
 
     steps = max(1, int(distance / delta_mm))
 
+    np = _numpy_or_none()
+    if np is not None:
+        poses = _kernel_pose_slerp(np, pose1, pose2, np.arange(1, steps) / float(steps), [w, p, r])
+        return [_pose4(*row) for row in poses[:, 0:3, :].reshape(-1, 12).tolist()]
+
     xd = x / steps
     yd = y / steps
     zd = z / steps
@@ -885,17 +1079,13 @@ def quaternion_2_pose(qin):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    qnorm = sqrt(qin[0] * qin[0] + qin[1] * qin[1] + qin[2] * qin[2] + qin[3] * qin[3])
-    q = qin
-    q[0] = q[0] / qnorm
-    q[1] = q[1] / qnorm
-    q[2] = q[2] / qnorm
-    q[3] = q[3] / qnorm
-    pose = Mat([[1 - 2*q[2]*q[2] - 2*q[3]*q[3], 2*q[1]*q[2] - 2*q[3]*q[0],     2*q[1]*q[3] + 2*q[2]*q[0],     0],
-                [2*q[1]*q[2] + 2*q[3]*q[0],     1 - 2*q[1]*q[1] - 2*q[3]*q[3], 2*q[2]*q[3] - 2*q[1]*q[0],     0],
-                [2*q[1]*q[3] - 2*q[2]*q[0],     2*q[2]*q[3] + 2*q[1]*q[0],     1 - 2*q[1]*q[1] - 2*q[2]*q[2], 0],
-                [0,                             0,                             0,                             1]])
-    return pose
+    q0, q1, q2, q3 = qin[0], qin[1], qin[2], qin[3]
+    # scaling by 2/|q|^2 normalizes the quaternion without a square root (qin is not modified)
+    s = 2.0 / (q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    q0s, q1s, q2s, q3s = q0 * s, q1 * s, q2 * s, q3 * s
+    return _pose4(1 - q2 * q2s - q3 * q3s, q1 * q2s - q3 * q0s,     q1 * q3s + q2 * q0s,     0,
+                  q1 * q2s + q3 * q0s,     1 - q1 * q1s - q3 * q3s, q2 * q3s - q1 * q0s,     0,
+                  q1 * q3s - q2 * q0s,     q2 * q3s + q1 * q0s,     1 - q1 * q1s - q2 * q2s, 0)
 
 
 def Pose_2_ABB(H):
@@ -906,8 +1096,9 @@ def Pose_2_ABB(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.TxyzRxyz_2_Pose`, :func:`~robodk.Pose_2_TxyzRxyz`, :func:`~robodk.Pose_2_ABB`, :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Pose_2_UR`, :func:`~robodk.quaternion_2_pose`
     """
-    q = pose_2_quaternion(H)
-    return [H[0, 3], H[1, 3], H[2, 3], q[0], q[1], q[2], q[3]]
+    h00, h01, h02, x, h10, h11, h12, y, h20, h21, h22, z = _pose_2_12(H)
+    q = _rot_2_quaternion(h00, h01, h02, h10, h11, h12, h20, h21, h22)
+    return [x, y, z, q[0], q[1], q[2], q[3]]
 
 
 def print_pose_ABB(pose):
@@ -978,6 +1169,573 @@ def UR_2_Pose(xyzwpr):
     return pose
 
 
+#----------------------------------------------------
+#-------- BATCH POSE CONVERSIONS --------------------
+# The Poses_2_* functions take a list of poses or an Nx4x4 array and return an array with one target per row.
+# The *_2_Poses functions take an array (or list) of targets and return an Nx4x4 array of poses.
+# NumPy is used when available, otherwise the scalar functions are called in a loop and lists are returned.
+
+
+def _numpy_or_none():
+    """Returns the numpy module or None if NumPy is not available"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _poses_2_array(np, poses):
+    """Returns an Nx3x4 float64 array given a list of poses or an Nx4x4 (or Nx3x4) array"""
+    if not isinstance(poses, np.ndarray) and len(poses) > 0 and isinstance(poses[0], Mat):
+        return np.array([_pose_2_12(pose) for pose in poses], dtype=np.float64).reshape(-1, 3, 4)
+    arr = np.asarray(poses, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 3, 4)
+    if arr.ndim != 3 or arr.shape[1] not in (3, 4) or arr.shape[2] != 4:
+        raise Exception(MatrixError, "Expected a list of poses or an Nx4x4 array")
+    return arr[:, 0:3, :]
+
+
+def _targets_2_array(np, targets, ncols):
+    """Returns an Nxncols float64 array given a list or array of targets"""
+    arr = np.asarray(targets, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, ncols)
+    if arr.ndim != 2 or arr.shape[1] != ncols:
+        raise Exception(MatrixError, "Expected an Nx%i array of targets" % ncols)
+    return arr
+
+
+def _array_2_poses(np, rot, x, y, z):
+    """Returns an Nx4x4 array given the 9 rotation terms (row major) and the position of each pose"""
+    poses = np.zeros((len(x), 4, 4))
+    for k in range(9):
+        poses[:, k // 3, k % 3] = rot[k]
+    poses[:, 0, 3] = x
+    poses[:, 1, 3] = y
+    poses[:, 2, 3] = z
+    poses[:, 3, 3] = 1.0
+    return poses
+
+
+def _batch_pose_2(poses, kernel, scalar, decimals=None):
+    """Runs a batch conversion of poses to targets (kernel) or loops over the scalar conversion if NumPy is not available.
+    The targets with an angle close to +/-180 deg are calculated with the scalar conversion: the sign of the half turn depends on the sign of zeros in the input.
+    If decimals is provided, the targets with values that could print differently with that number of decimals are also calculated with the scalar conversion."""
+    np = _numpy_or_none()
+    if np is None:
+        return [scalar(pose if isinstance(pose, Mat) else Mat(pose)) for pose in poses]
+    M = _poses_2_array(np, poses)
+    targets = kernel(np, M)
+    if len(targets) > 0:
+        # The sign of a zero depends on the input (a Mat with integer zeros gives +0.0 where floats give -0.0): the scalar conversion uses the original pose.
+        check = np.abs(np.abs(targets) - 180.0) < 1e-6
+        if decimals is not None:
+            # Vectorized and scalar trigonometry can differ in the last bit: check values close to a rounding limit or to 0 (sign)
+            scaled = np.abs(targets) * 10.0**decimals
+            check |= (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | ((scaled < 0.5 + 1e-6) & ((targets != 0) | np.signbit(targets)))
+        for i in np.nonzero(check.any(axis=1))[0].tolist():
+            pose = poses[i] if isinstance(poses, list) and isinstance(poses[i], Mat) else Mat(M[i].tolist() + [[0.0, 0.0, 0.0, 1.0]])
+            targets[i] = scalar(pose)
+    return targets
+
+
+def _batch_2_poses(targets, ncols, kernel, scalar):
+    """Runs a batch conversion of targets to poses (kernel) or loops over the scalar conversion if NumPy is not available"""
+    np = _numpy_or_none()
+    if np is None:
+        return [scalar(list(target)) for target in targets]
+    return kernel(np, _targets_2_array(np, targets, ncols))
+
+
+def _kernel_pose_2_xyzrpw(np, M):
+    """Returns x, y, z, r, p, w (rad) for an Nx3x4 array, same as pose_2_xyzrpw"""
+    h00, h10, h20 = M[:, 0, 0], M[:, 1, 0], M[:, 2, 0]
+    h11, h12, h21, h22 = M[:, 1, 1], M[:, 1, 2], M[:, 2, 1], M[:, 2, 2]
+    p = np.arctan2(-h20, np.sqrt(h00 * h00 + h10 * h10))
+    w = np.arctan2(h10, h00)
+    r = np.arctan2(h21, h22)
+    up = h20 > (1.0 - 1e-10)
+    down = h20 < (-1.0 + 1e-10)
+    if up.any() or down.any():
+        p = np.where(up, -pi / 2, np.where(down, pi / 2, p))
+        r = np.where(up | down, 0.0, r)
+        w = np.where(up, np.arctan2(-h12, h11), np.where(down, np.arctan2(h12, h11), w))
+    return M[:, 0, 3], M[:, 1, 3], M[:, 2, 3], r, p, w
+
+
+def _kernel_xyzrpw_2_pose(np, T):
+    """Returns an Nx4x4 array for an Nx6 array of [x,y,z,r,p,w] (deg), same as xyzrpw_2_pose"""
+    a = T[:, 3] * pi / 180
+    b = T[:, 4] * pi / 180
+    c = T[:, 5] * pi / 180
+    ca, sa, cb, sb, cc, sc = np.cos(a), np.sin(a), np.cos(b), np.sin(b), np.cos(c), np.sin(c)
+    rot = [cb * cc, cc * sa * sb - ca * sc, sa * sc + ca * cc * sb,
+           cb * sc, ca * cc + sa * sb * sc, ca * sb * sc - cc * sa,
+           -sb, cb * sa, ca * cb]
+    return _array_2_poses(np, rot, T[:, 0], T[:, 1], T[:, 2])
+
+
+def _kernel_pose_2_txyzrxyz(np, M):
+    """Returns x, y, z, rx, ry, rz (rad) for an Nx3x4 array, same as Pose_2_TxyzRxyz"""
+    a, b, c = M[:, 0, 0], M[:, 0, 1], M[:, 0, 2]
+    d, e = M[:, 1, 2], M[:, 2, 2]
+    cy1 = np.sqrt(np.maximum(1 - c * c, 0))
+    rx1 = np.arctan2(-d, e)
+    ry1 = np.arctan2(c, cy1)
+    rz1 = np.arctan2(-b, a)
+    sing = (c > (1.0 - 1e-10)) | (c < (-1.0 + 1e-10))
+    if sing.any():
+        ry1 = np.where(c > (1.0 - 1e-10), pi / 2, np.where(c < (-1.0 + 1e-10), -pi / 2, ry1))
+        rx1 = np.where(sing, 0.0, rx1)
+        rz1 = np.where(sing, np.arctan2(M[:, 1, 0], M[:, 1, 1]), rz1)
+    return M[:, 0, 3], M[:, 1, 3], M[:, 2, 3], rx1, ry1, rz1
+
+
+def _kernel_pose_2_adept(np, M):
+    """Returns an Nx6 array of Adept targets (deg) for an Nx3x4 array, same as Pose_2_Adept"""
+    h00, h02, h10, h11, h12 = M[:, 0, 0], M[:, 0, 2], M[:, 1, 0], M[:, 1, 1], M[:, 1, 2]
+    h20, h21, h22 = M[:, 2, 0], M[:, 2, 1], M[:, 2, 2]
+    # atan2 is invariant to a positive scale: dividing by sin(b) is not required
+    r = np.arctan2(h12, h02)
+    p = np.arctan2(np.sqrt(np.maximum(1 - h22 * h22, 0)), h22)
+    w = np.arctan2(h21, -h20)
+    up = h22 > (1.0 - 1e-10)
+    down = h22 < (-1.0 + 1e-10)
+    if up.any() or down.any():
+        r = np.where(up | down, 0.0, r)
+        p = np.where(up, 0.0, np.where(down, pi, p))
+        w = np.where(up, np.arctan2(h10, h00), np.where(down, np.arctan2(h10, h11), w))
+    return np.column_stack((M[:, 0, 3], M[:, 1, 3], M[:, 2, 3], r * 180 / pi, p * 180 / pi, w * 180 / pi))
+
+
+def _kernel_adept_2_pose(np, T):
+    """Returns an Nx4x4 array for an Nx6 array of Adept targets (deg), same as Adept_2_Pose"""
+    a = T[:, 3] * pi / 180
+    b = T[:, 4] * pi / 180
+    c = T[:, 5] * pi / 180
+    ca, sa, cb, sb, cc, sc = np.cos(a), np.sin(a), np.cos(b), np.sin(b), np.cos(c), np.sin(c)
+    rot = [ca * cb * cc - sa * sc, -cc * sa - ca * cb * sc, ca * sb,
+           ca * sc + cb * cc * sa, ca * cc - cb * sa * sc, sa * sb,
+           -cc * sb, sb * sc, cb]
+    return _array_2_poses(np, rot, T[:, 0], T[:, 1], T[:, 2])
+
+
+def _kernel_pose_2_quaternion(np, M):
+    """Returns the Nx4 quaternions of an Nx3x4 array, same as pose_2_quaternion"""
+    h00, h01, h02 = M[:, 0, 0], M[:, 0, 1], M[:, 0, 2]
+    h10, h11, h12 = M[:, 1, 0], M[:, 1, 1], M[:, 1, 2]
+    h20, h21, h22 = M[:, 2, 0], M[:, 2, 1], M[:, 2, 2]
+    trace = h00 + h11 + h22
+    # each row starts from its largest component, same as _rot_2_quaternion
+    largest = np.argmax(np.column_stack((trace, h00, h11, h22)), axis=1)
+    q = np.empty((len(trace), 4))
+    r = largest == 0
+    s = 2.0 * np.sqrt(1.0 + trace[r])
+    q[r] = np.column_stack((0.25 * s, (h21[r] - h12[r]) / s, (h02[r] - h20[r]) / s, (h10[r] - h01[r]) / s))
+    r = largest == 1
+    s = 2.0 * np.sqrt(np.maximum(1.0 + h00[r] - h11[r] - h22[r], 0.0))
+    q[r] = np.column_stack(((h21[r] - h12[r]) / s, 0.25 * s, (h01[r] + h10[r]) / s, (h02[r] + h20[r]) / s))
+    r = largest == 2
+    s = 2.0 * np.sqrt(np.maximum(1.0 + h11[r] - h00[r] - h22[r], 0.0))
+    q[r] = np.column_stack(((h02[r] - h20[r]) / s, (h01[r] + h10[r]) / s, 0.25 * s, (h12[r] + h21[r]) / s))
+    r = largest == 3
+    s = 2.0 * np.sqrt(np.maximum(1.0 + h22[r] - h00[r] - h11[r], 0.0))
+    q[r] = np.column_stack(((h10[r] - h01[r]) / s, (h02[r] + h20[r]) / s, (h12[r] + h21[r]) / s, 0.25 * s))
+    q[q[:, 0] < 0] *= -1
+    return q
+
+
+def _kernel_quaternion_continuity(np, q):
+    """Flips the sign of the quaternions (Nx4 array, in place) so that consecutive quaternions are in the same hemisphere"""
+    if len(q) > 1:
+        flips = ((q[1:] * q[:-1]).sum(axis=1) < 0).astype(np.int64)
+        q[1:][np.cumsum(flips) % 2 == 1] *= -1
+    return q
+
+
+def _kernel_quaternion_2_rot(np, q):
+    """Returns the 9 rotation terms (row major) of an Nx4 array of quaternions, same as quaternion_2_pose"""
+    q0, q1, q2, q3 = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    s = 2.0 / (q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    q0s, q1s, q2s, q3s = q0 * s, q1 * s, q2 * s, q3 * s
+    return [1 - q2 * q2s - q3 * q3s, q1 * q2s - q3 * q0s,     q1 * q3s + q2 * q0s,
+            q1 * q2s + q3 * q0s,     1 - q1 * q1s - q3 * q3s, q2 * q3s - q1 * q0s,
+            q1 * q3s - q2 * q0s,     q2 * q3s + q1 * q0s,     1 - q1 * q1s - q2 * q2s]
+
+
+def _kernel_quaternions_2_poses(np, q):
+    """Returns an Nx4x4 array of rotations for an Nx4 array of quaternions"""
+    zero = np.zeros(len(q))
+    return _array_2_poses(np, _kernel_quaternion_2_rot(np, q), zero, zero, zero)
+
+
+def _kernel_pose_2_ur(np, M):
+    """Returns an Nx6 array of UR targets (rotation vector) for an Nx3x4 array, same as Pose_2_UR"""
+    NUMERIC_TOLERANCE = 1e-8
+    angle = np.arccos(np.clip((M[:, 0, 0] + M[:, 1, 1] + M[:, 2, 2] - 1) * 0.5, -1.0, 1.0))
+    rxyz = np.column_stack((M[:, 2, 1] - M[:, 1, 2], M[:, 0, 2] - M[:, 2, 0], M[:, 1, 0] - M[:, 0, 1]))
+    rnorm = np.sqrt((rxyz * rxyz).sum(axis=1))
+    general = (angle >= NUMERIC_TOLERANCE) & (np.abs(np.sin(angle)) >= NUMERIC_TOLERANCE) & (rnorm >= NUMERIC_TOLERANCE)
+    targets = np.zeros((len(angle), 6))
+    targets[:, 0:3] = M[:, :, 3]
+    targets[general, 3:6] = rxyz[general] * (angle[general] / rnorm[general])[:, None]
+    # rotations close to 180 deg are rare: use the scalar function
+    for i in np.nonzero((angle >= NUMERIC_TOLERANCE) & ~general)[0]:
+        targets[i, 3:6] = Pose_2_UR(Pose4(M[i].tolist()))[3:6]
+    return targets
+
+
+def _kernel_ur_2_pose(np, T):
+    """Returns an Nx4x4 array for an Nx6 array of UR targets (rotation vector), same as UR_2_Pose"""
+    wpr = T[:, 3:6]
+    angle = np.sqrt((wpr * wpr).sum(axis=1))
+    ratio = np.ones(len(angle)) * 0.5
+    nonzero = angle != 0.0
+    ratio[nonzero] = np.sin(0.5 * angle[nonzero]) / angle[nonzero]
+    q = np.column_stack((np.cos(0.5 * angle), wpr * ratio[:, None]))
+    return _array_2_poses(np, _kernel_quaternion_2_rot(np, q), T[:, 0], T[:, 1], T[:, 2])
+
+
+def _kernel_poses_2_kuka(np, M):
+    """Returns an Nx6 array of KUKA targets for an Nx3x4 array, same as Pose_2_KUKA"""
+    x, y, z, r, p, w = _kernel_pose_2_xyzrpw(np, M)
+    return np.column_stack((x, y, z, w * 180 / pi, p * 180 / pi, r * 180 / pi))
+
+
+def _kernel_poses_2_xyzrpw(np, M):
+    """Returns an Nx6 array of [x,y,z,r,p,w] targets for an Nx3x4 array, same as pose_2_xyzrpw"""
+    x, y, z, r, p, w = _kernel_pose_2_xyzrpw(np, M)
+    return np.column_stack((x, y, z, r * 180 / pi, p * 180 / pi, w * 180 / pi))
+
+
+def _kernel_poses_2_staubli(np, M):
+    """Returns an Nx6 array of Staubli targets for an Nx3x4 array, same as Pose_2_Staubli"""
+    x, y, z, rx, ry, rz = _kernel_pose_2_txyzrxyz(np, M)
+    return np.column_stack((x, y, z, rx * 180.0 / pi, ry * 180.0 / pi, rz * 180.0 / pi))
+
+
+
+
+def _kernel_kuka_2_poses(np, T):
+    """Returns an Nx4x4 array for an Nx6 array of KUKA targets, same as KUKA_2_Pose"""
+    # KUKA_2_Pose uses the same rotation as xyzrpw_2_pose with the angles in reverse order
+    return _kernel_xyzrpw_2_pose(np, T[:, [0, 1, 2, 5, 4, 3]])
+
+
+def _kernel_staubli_2_poses(np, T):
+    """Returns an Nx4x4 array for an Nx6 array of Staubli targets, same as Pose"""
+    rx = T[:, 3] * pi / 180
+    ry = T[:, 4] * pi / 180
+    rz = T[:, 5] * pi / 180
+    srx, crx, sry, cry, srz, crz = np.sin(rx), np.cos(rx), np.sin(ry), np.cos(ry), np.sin(rz), np.cos(rz)
+    rot = [cry * crz, -cry * srz, sry,
+           crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx,
+           srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry]
+    return _array_2_poses(np, rot, T[:, 0], T[:, 1], T[:, 2])
+
+
+def _kernel_abb_2_poses(np, T):
+    """Returns an Nx4x4 array for an Nx7 array of ABB targets"""
+    return _array_2_poses(np, _kernel_quaternion_2_rot(np, T[:, 3:7]), T[:, 0], T[:, 1], T[:, 2])
+
+
+def _scalar_abb_2_pose(target):
+    """Returns the pose of an ABB target [x,y,z,q1,q2,q3,q4]"""
+    pose = quaternion_2_pose(target[3:7])
+    pose.setPos(target[0:3])
+    return pose
+
+
+def Poses_2_KUKA(poses, decimals=None):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of KUKA XYZABC targets. Returns a list of lists if NumPy is not available.
+    Provide the number of decimals used to print the targets to get the same text as Pose_2_KUKA for each pose.
+
+    .. seealso:: :func:`~robodk.Pose_2_KUKA`, :func:`~robodk.KUKA_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_poses_2_kuka, Pose_2_KUKA, decimals)
+
+
+def KUKA_2_Poses(targets):
+    """Converts an Nx6 array of KUKA XYZABC targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.KUKA_2_Pose`, :func:`~robodk.Poses_2_KUKA`
+    """
+    return _batch_2_poses(targets, 6, _kernel_kuka_2_poses, KUKA_2_Pose)
+
+
+def Poses_2_Fanuc(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Fanuc XYZWPR targets. Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_Fanuc`, :func:`~robodk.Fanuc_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_poses_2_xyzrpw, Pose_2_Fanuc)
+
+
+def Fanuc_2_Poses(targets):
+    """Converts an Nx6 array of Fanuc XYZWPR targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Fanuc_2_Pose`, :func:`~robodk.Poses_2_Fanuc`
+    """
+    return _batch_2_poses(targets, 6, _kernel_xyzrpw_2_pose, Fanuc_2_Pose)
+
+
+def Poses_2_Motoman(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Motoman XYZWPR targets. Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_Motoman`, :func:`~robodk.Motoman_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_poses_2_xyzrpw, Pose_2_Motoman)
+
+
+def Motoman_2_Poses(targets):
+    """Converts an Nx6 array of Motoman XYZWPR targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Motoman_2_Pose`, :func:`~robodk.Poses_2_Motoman`
+    """
+    return _batch_2_poses(targets, 6, _kernel_xyzrpw_2_pose, Motoman_2_Pose)
+
+
+def Poses_2_Nachi(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Nachi XYZRPW targets. Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_Nachi`, :func:`~robodk.Nachi_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_poses_2_kuka, Pose_2_Nachi)
+
+
+def Nachi_2_Poses(targets):
+    """Converts an Nx6 array of Nachi XYZRPW targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Nachi_2_Pose`, :func:`~robodk.Poses_2_Nachi`
+    """
+    return _batch_2_poses(targets, 6, _kernel_xyzrpw_2_pose, Nachi_2_Pose)
+
+
+def Poses_2_Staubli(poses, decimals=None):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Staubli XYZWPR targets. Returns a list of lists if NumPy is not available.
+    Provide the number of decimals used to print the targets to get the same text as Pose_2_Staubli for each pose.
+
+    .. seealso:: :func:`~robodk.Pose_2_Staubli`, :func:`~robodk.Staubli_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_poses_2_staubli, Pose_2_Staubli, decimals)
+
+
+def Staubli_2_Poses(targets):
+    """Converts an Nx6 array of Staubli XYZWPR targets to an Nx4x4 array of poses (same as calling :func:`~robodk.Pose` for each target). Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose`, :func:`~robodk.Poses_2_Staubli`
+    """
+    return _batch_2_poses(targets, 6, _kernel_staubli_2_poses, lambda target: Pose(*target))
+
+
+def Poses_2_Adept(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Adept targets. Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_Adept`, :func:`~robodk.Adept_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_pose_2_adept, Pose_2_Adept)
+
+
+def Adept_2_Poses(targets):
+    """Converts an Nx6 array of Adept targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Adept_2_Pose`, :func:`~robodk.Poses_2_Adept`
+    """
+    return _batch_2_poses(targets, 6, _kernel_adept_2_pose, Adept_2_Pose)
+
+
+def Poses_2_Comau(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of Comau targets. Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_Comau`, :func:`~robodk.Comau_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_pose_2_adept, Pose_2_Comau)
+
+
+def Comau_2_Poses(targets):
+    """Converts an Nx6 array of Comau targets to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Comau_2_Pose`, :func:`~robodk.Poses_2_Comau`
+    """
+    return _batch_2_poses(targets, 6, _kernel_adept_2_pose, Comau_2_Pose)
+
+
+def Poses_2_UR(poses):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx6 array of UR targets (position and rotation vector). Returns a list of lists if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.Pose_2_UR`, :func:`~robodk.UR_2_Poses`
+    """
+    return _batch_pose_2(poses, _kernel_pose_2_ur, Pose_2_UR)
+
+
+def UR_2_Poses(targets):
+    """Converts an Nx6 array of UR targets (position and rotation vector) to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.UR_2_Pose`, :func:`~robodk.Poses_2_UR`
+    """
+    return _batch_2_poses(targets, 6, _kernel_ur_2_pose, UR_2_Pose)
+
+
+def Poses_2_Quaternions(poses, continuity=True):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx4 array of quaternions [q1,q2,q3,q4]. Returns a list of lists if NumPy is not available.
+    If continuity is True, the sign of each quaternion is chosen so that consecutive quaternions do not flip (q and -q are the same orientation). Otherwise q1 is always positive, as in :func:`~robodk.pose_2_quaternion`.
+
+    .. seealso:: :func:`~robodk.pose_2_quaternion`, :func:`~robodk.Quaternions_2_Poses`
+    """
+    np = _numpy_or_none()
+    if np is not None:
+        q = _kernel_pose_2_quaternion(np, _poses_2_array(np, poses))
+        if continuity:
+            _kernel_quaternion_continuity(np, q)
+        return q
+
+    qlist = []
+    for pose in poses:
+        q = pose_2_quaternion(pose if isinstance(pose, Mat) else Mat(pose))
+        if continuity and qlist and (q[0] * qlist[-1][0] + q[1] * qlist[-1][1] + q[2] * qlist[-1][2] + q[3] * qlist[-1][3]) < 0:
+            q = [-q[0], -q[1], -q[2], -q[3]]
+        qlist.append(q)
+    return qlist
+
+
+def Quaternions_2_Poses(quaternions):
+    """Converts an Nx4 array of quaternions [q1,q2,q3,q4] to an Nx4x4 array of poses (rotation only). Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.quaternion_2_pose`, :func:`~robodk.Poses_2_Quaternions`
+    """
+    return _batch_2_poses(quaternions, 4, _kernel_quaternions_2_poses, quaternion_2_pose)
+
+
+def Poses_2_ABB(poses, continuity=False):
+    """Converts a list of poses (or an Nx4x4 array) to an Nx7 array of ABB targets [x,y,z,q1,q2,q3,q4]. Returns a list of lists if NumPy is not available.
+    Set continuity to True to avoid quaternion sign flips between consecutive targets (see :func:`~robodk.Poses_2_Quaternions`).
+
+    .. seealso:: :func:`~robodk.Pose_2_ABB`, :func:`~robodk.ABB_2_Poses`
+    """
+    quaternions = Poses_2_Quaternions(poses, continuity)
+    np = _numpy_or_none()
+    if np is None:
+        return [list(_pose_2_12(pose if isinstance(pose, Mat) else Mat(pose))[3::4]) + q for pose, q in zip(poses, quaternions)]
+    return np.column_stack((_poses_2_array(np, poses)[:, :, 3], quaternions))
+
+
+def ABB_2_Poses(targets):
+    """Converts an Nx7 array of ABB targets [x,y,z,q1,q2,q3,q4] to an Nx4x4 array of poses. Returns a list of poses if NumPy is not available.
+
+    .. seealso:: :func:`~robodk.quaternion_2_pose`, :func:`~robodk.Poses_2_ABB`
+    """
+    return _batch_2_poses(targets, 7, _kernel_abb_2_poses, _scalar_abb_2_pose)
+
+
+def _as_pose(pose):
+    """Returns a pose as a :class:`.Mat` given a Mat, a 4x4 list or a 4x4 array"""
+    if isinstance(pose, Mat):
+        return pose
+    if hasattr(pose, 'tolist'):
+        pose = pose.tolist()
+    return Pose4(pose)
+
+
+def _kernel_pose_slerp(np, pose1, pose2, fractions, rvec=None):
+    """Returns a Kx4x4 array of poses between pose1 (fraction 0) and pose2 (fraction 1): the position is interpolated linearly and the orientation with a spherical linear interpolation (SLERP)"""
+    h1 = np.array(_pose_2_12(pose1), dtype=np.float64).reshape(3, 4)
+    h2 = np.array(_pose_2_12(pose2), dtype=np.float64).reshape(3, 4)
+    # the relative rotation as a rotation vector: SLERP is a rotation about the same axis by a fraction of the angle
+    if rvec is None:
+        rvec = Pose_2_UR(invH(pose1) * pose2)[3:6]
+    angle = norm(rvec)
+    poses = np.zeros((len(fractions), 4, 4))
+    if angle > 0:
+        ux, uy, uz = rvec[0] / angle, rvec[1] / angle, rvec[2] / angle
+        K = np.array([[0, -uz, uy], [uz, 0, -ux], [-uy, ux, 0]])
+        theta = fractions * angle
+        rot = np.eye(3) + np.sin(theta)[:, None, None] * K + (1 - np.cos(theta))[:, None, None] * np.dot(K, K)
+        poses[:, 0:3, 0:3] = np.matmul(h1[:, 0:3], rot)
+    else:
+        poses[:, 0:3, 0:3] = h1[:, 0:3]
+    poses[:, 0:3, 3] = h1[:, 3] + fractions[:, None] * (h2[:, 3] - h1[:, 3])
+    poses[:, 3, 3] = 1.0
+    return poses
+
+
+def _path_split_plan(poses, delta_mm, times, delta_s):
+    """Yields (pose1, pose2, n, offset, scale, add_pose2) for each segment of a path.
+    The n intermediate poses of the segment are located at the fractions (i + offset) * scale, for i in range(n)."""
+    if delta_s is not None:
+        if times is None or len(times) != len(poses):
+            raise Exception("Provide one time value per pose to split a path by time")
+        t0 = times[0]
+    for j in range(len(poses) - 1):
+        pose1 = _as_pose(poses[j])
+        pose2 = _as_pose(poses[j + 1])
+        if delta_s is None:
+            dist_mm = distance(pose1.Pos(), pose2.Pos())
+            steps = max(1, int(dist_mm / delta_mm))
+            yield pose1, pose2, steps - 1, 1, 1.0 / steps, True
+        else:
+            duration = times[j + 1] - times[j]
+            kstart = max(1, int(math.ceil((times[j] - t0) / delta_s)))
+            kend = int(math.ceil((times[j + 1] - t0) / delta_s))
+            last = j == len(poses) - 2
+            if duration <= 0 or kend <= kstart:
+                if last:
+                    yield pose1, pose2, 0, 0, 0.0, True
+                continue
+            yield pose1, pose2, kend - kstart, kstart + (t0 - times[j]) / delta_s, delta_s / duration, last
+
+
+def Poses_Split_Iter(poses, delta_mm=1.0, times=None, delta_s=None, chunk_size=4096):
+    """Same as :func:`~robodk.Poses_Split` but returns a generator that yields one pose at a time. The poses are calculated in chunks of chunk_size so that the memory used does not depend on the length of the path.
+
+    .. seealso:: :func:`~robodk.Poses_Split`, :func:`~robodk.Pose_Split`
+    """
+    np = _numpy_or_none()
+    if len(poses) > 0:
+        yield _as_pose(poses[0])
+    for pose1, pose2, n, offset, scale, add_pose2 in _path_split_plan(poses, delta_mm, times, delta_s):
+        if np is None:
+            xyzwpr = Pose_2_UR(invH(pose1) * pose2)
+            for i in range(n):
+                factor = (i + offset) * scale
+                yield pose1 * UR_2_Pose([value * factor for value in xyzwpr])
+        else:
+            for i0 in range(0, n, chunk_size):
+                fractions = (np.arange(i0, min(n, i0 + chunk_size)) + offset) * scale
+                for row in _kernel_pose_slerp(np, pose1, pose2, fractions)[:, 0:3, :].reshape(-1, 12).tolist():
+                    yield _pose4(*row)
+        if add_pose2:
+            yield pose2
+
+
+def Poses_Split(poses, delta_mm=1.0, times=None, delta_s=None):
+    """Densify a path given as a list of poses (or an Nx4x4 array). The position is interpolated linearly and the orientation with a spherical linear interpolation (SLERP).
+    By default each segment is split by steps of delta_mm in mm, as in :func:`~robodk.Pose_Split`, and the result includes the first pose and all the poses of the path.
+    If delta_s is provided, the path is sampled every delta_s seconds given the time of each pose (times, in seconds). The result includes the first and the last pose.
+    Returns an Nx4x4 array, or a list of poses if NumPy is not available. Use :func:`~robodk.Poses_Split_Iter` for very long paths.
+
+    :param poses: list of poses or Nx4x4 array
+    :param float delta_mm: maximum step in mm
+    :param list times: time of each pose in seconds (required if delta_s is provided)
+    :param float delta_s: time step in seconds
+
+    .. seealso:: :func:`~robodk.Poses_Split_Iter`, :func:`~robodk.Pose_Split`
+    """
+    np = _numpy_or_none()
+    if np is None:
+        return list(Poses_Split_Iter(poses, delta_mm, times, delta_s))
+    if len(poses) == 0:
+        return np.zeros((0, 4, 4))
+    chunks = [np.array([_as_pose(poses[0]).Rows()], dtype=np.float64)]
+    for pose1, pose2, n, offset, scale, add_pose2 in _path_split_plan(poses, delta_mm, times, delta_s):
+        if n > 0:
+            chunks.append(_kernel_pose_slerp(np, pose1, pose2, (np.arange(n) + offset) * scale))
+        if add_pose2:
+            chunks.append(np.array([pose2.Rows()], dtype=np.float64))
+    return np.concatenate(chunks)
+
+
 #----------------------------------------------------
 #-------- ROBOT MODEL (D-H and D-H M) ---------------
 
@@ -993,10 +1751,9 @@ def dh(rz, tx=None, tz=None, rx=None):
     srx = math.sin(rx)
     crz = math.cos(rz)
     srz = math.sin(rz)
-    return Mat( [[crz, -srz*crx,  srz*srx, tx*crz],
-                 [srz,  crz*crx, -crz*srx, tx*srz],
-                 [  0,      srx,      crx,     tz],
-                 [  0,        0,        0,      1]])
+    return _pose4(crz, -srz*crx,  srz*srx, tx*crz,
+                  srz,  crz*crx, -crz*srx, tx*srz,
+                    0,      srx,      crx,     tz)
 
 def dhm(rx, tx=None, tz=None, rz=None):
     """Returns the Denavit-Hartenberg Modified 4x4 matrix for a robot link (Craig 1986).
@@ -1011,10 +1768,9 @@ def dhm(rx, tx=None, tz=None, rz=None):
     srx = math.sin(rx)
     crz = math.cos(rz)
     srz = math.sin(rz)
-    return Mat([[crz,        -srz,    0,      tx],
-                [crx*srz, crx*crz, -srx, -tz*srx],
-                [srx*srz, crz*srx,  crx,  tz*crx],
-                [      0,       0,    0,       1]])
+    return _pose4(crz,        -srz,    0,      tx,
+                  crx*srz, crx*crz, -srx, -tz*srx,
+                  srx*srz, crz*srx,  crx,  tz*crx)
 
 def joints_2_angles(jin, type):
     """Converts the robot encoders into angles between links depending on the type of the robot."""
@@ -1185,6 +1941,40 @@ class MatrixError(Exception):
     pass
 
 
+# Storage backends for new Mat objects
+MAT_BACKEND_LIST = 'list'  # list of lists (default, no dependencies)
+MAT_BACKEND_NUMPY = 'numpy'  # contiguous float64 array (requires NumPy)
+_MAT_BACKEND = MAT_BACKEND_LIST
+
+
+def setMatBackend(backend=MAT_BACKEND_NUMPY):
+    """Select the storage used by new :class:`.Mat` objects. The NumPy backend stores each matrix as a contiguous float64 array, which makes products, inverses and conversions of large chains of poses faster.
+    If NumPy is not available the list backend is used. Returns the backend in use.
+
+    :param str backend: MAT_BACKEND_NUMPY or MAT_BACKEND_LIST
+
+    .. seealso:: :func:`~robodk.MatBackend`, :class:`.Mat`
+    """
+    global _MAT_BACKEND
+    if backend == MAT_BACKEND_NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            backend = MAT_BACKEND_LIST
+    elif backend != MAT_BACKEND_LIST:
+        raise Exception(MatrixError, "Unknown Mat backend: %s" % str(backend))
+    _MAT_BACKEND = backend
+    return backend
+
+
+def MatBackend():
+    """Returns the storage backend used by new :class:`.Mat` objects (MAT_BACKEND_LIST or MAT_BACKEND_NUMPY)
+
+    .. seealso:: :func:`~robodk.setMatBackend`
+    """
+    return _MAT_BACKEND
+
+
 class Mat(object):
     """Mat is a matrix object. The main purpose of this object is to represent a pose in the 3D space (position and orientation).
 
@@ -1228,6 +2018,22 @@ class Mat(object):
             robot.MoveJ(pose2)                      # Make a joint move to the new position
             # target.setPose(pose2)                  # We can also update the pose to targets, tools, reference frames, objects, ...
     """
+    # Matrices have no __dict__: this saves memory for the many small matrices used as poses (see Pose4)
+    __slots__ = ('rows', '__weakref__')
+
+    def __new__(cls, *args, **kwargs):
+        # Mat() creates an object of the active storage backend (see setMatBackend)
+        if cls is Mat and _MAT_BACKEND == MAT_BACKEND_NUMPY:
+            cls = MatNumpy
+        return object.__new__(cls)
+
+    def __getstate__(self):
+        return {'rows': self.rows}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __init__(self, rows=None, ncols=None):
         if ncols is None:
             if rows is None:
@@ -1236,7 +2042,7 @@ class Mat(object):
                 self.rows = [[0] * n for x in range(m)]
             else:
                 if isinstance(rows, Mat):
-                    rows = rows.copy().rows
+                    rows = [list(row) for row in rows.Rows()]
                 m = len(rows)
                 transpose = 0
                 if isinstance(rows, list) and len(rows) == 0:
@@ -1414,7 +2220,7 @@ class Mat(object):
             x, y, z, rx, ry, rz = Pose_2_TxyzRxyz(self)
             str_add = 'Pose(%.3f, %.3f, %.3f,  %.3f, %.3f, %.3f):\n' % (x, y, z, rx * 180 / pi, ry * 180 / pi, rz * 180 / pi)
 
-        s = '\n [ '.join([(', '.join([('%.3f' % item if type(item) == float else str(item)) for item in row]) + ' ],') for row in self.rows])
+        s = '\n [ '.join([(', '.join([('%.3f' % item if type(item) == float else str(item)) for item in row]) + ' ],') for row in self.Rows()])
         return str_add + '[[ ' + s[:-1] + ']\n'
 
     def __repr__(self):
@@ -1707,96 +2513,605 @@ class Mat(object):
 
         .. seealso:: :func:`~Mat.SaveCSV`, :func:`~robodk.SaveList`, :func:`~robodk.LoadList`, :func:`~robodk.LoadMat`
         """
-        sz = self.size()
-        m = sz[0]
-        n = sz[1]
-        file = open(strfile, 'w')
-        for j in range(n):
-            for i in range(m):
-                file.write(('%.6f' + separator) % self.rows[i][j])
-            file.write('\n')
-        file.close()
+        rows = self.Rows()
+        if hasattr(rows, 'T'):
+            columns = rows.T.tolist()
+        else:
+            columns = list(zip(*rows))
+        _save_rows(columns, strfile, separator)
 
 
-#-------------------------------------------------------
-# FTP TRANSFER Tools
-def RemoveFileFTP(ftp, filepath):
-    """Delete a file on a remote server."""
-    import ftplib
-    try:
-        ftp.delete(filepath)
-    except ftplib.all_errors as e:
-        import sys
-        print('POPUP: Could not remove file {0}: {1}'.format(filepath, e))
-        sys.stdout.flush()
+class MatNumpy(Mat):
+    """Mat object stored as a contiguous float64 NumPy array (self.arr). It is created by Mat() when the NumPy backend is active.
+    The rows attribute is the array itself, so rows[i][j] reads and writes the matrix in place.
 
+    .. seealso:: :func:`~robodk.setMatBackend`, :class:`.Mat`
+    """
+    __slots__ = ('arr', )
 
-def RemoveDirFTP(ftp, path):
-    """Recursively delete a directory tree on a remote server."""
-    import ftplib
-    wd = ftp.pwd()
-    try:
-        names = ftp.nlst(path)
-    except ftplib.all_errors as e:
-        # some FTP servers complain when you try and list non-existent paths
-        print('RemoveDirFTP: Could not remove folder {0}: {1}'.format(path, e))
-        return
+    def __init__(self, rows=None, ncols=None):
+        import numpy as np
+        if ncols is None:
+            if rows is None:
+                self.arr = np.zeros((4, 4))
+                return
+            if isinstance(rows, Mat):
+                self.arr = _mat_2_array(rows).copy()
+                return
+            if isinstance(rows, list) and len(rows) == 0:
+                # Check empty matrix
+                self.arr = np.zeros((1, 0))
+                return
+            try:
+                arr = np.array(rows, dtype=np.float64)
+            except ValueError:
+                # make the size uniform (fill blanks with zeros)
+                n = max([len(row) for row in rows])
+                arr = np.array([list(row) + [0] * (n - len(row)) for row in rows], dtype=np.float64)
+            if arr.ndim == 1:
+                # a list of values is a column vector
+                arr = arr.reshape((-1, 1))
+            self.arr = np.ascontiguousarray(arr)
+        else:
+            m = max(rows, 0)
+            n = max(ncols, 0)
+            if m == 0:
+                m = 1
+                n = 0
+            self.arr = np.zeros((m, n))
 
-    for name in names:
-        if os.path.split(name)[1] in ('.', '..'): continue
-        print('RemoveDirFTP: Checking {0}'.format(name))
-        try:
-            ftp.cwd(path + '/' + name)  # if we can cwd to it, it's a folder
-            ftp.cwd(wd)  # don't try a nuke a folder we're in
-            RemoveDirFTP(ftp, path + '/' + name)
-        except ftplib.all_errors:
-            ftp.delete(path + '/' + name)
-            #RemoveFileFTP(ftp, name)
+    @staticmethod
+    def _from_array(arr):
+        """Wrap a float64 array without copying it"""
+        newmat = object.__new__(MatNumpy)
+        newmat.arr = arr
+        return newmat
 
-    try:
-        ftp.rmd(path)
-    except ftplib.all_errors as e:
-        print('RemoveDirFTP: Could not remove {0}: {1}'.format(path, e))
+    @property
+    def rows(self):
+        return self.arr
 
+    @rows.setter
+    def rows(self, rows):
+        import numpy as np
+        self.arr = np.array(rows, dtype=np.float64)
 
-def UploadDirFTP(localpath, server_ip, remote_path, username, password):
-    """Upload a folder to a robot through FTP recursively"""
-    import ftplib
-    import os
-    import sys
-    main_folder = os.path.basename(os.path.normpath(localpath))
-    print("POPUP: <p>Connecting to <strong>%s</strong> using user name <strong>%s</strong> and password ****</p><p>Please wait...</p>" % (server_ip, username))
-    sys.stdout.flush()
-    try:
-        myFTP = ftplib.FTP(server_ip, username, password)
-        print('Connection established')
-    except:
-        error_str = sys.exc_info()[1]
-        print("POPUP: <font color=\"red\">Connection to %s failed: <p>%s</p></font>" % (server_ip, error_str))
-        sys.stdout.flush()
-        pause(4)
-        return False
+    def __iter__(self):
+        return iter(self.arr.T.tolist())
 
-    remote_path_prog = remote_path + '/' + main_folder
-    myPath = r'%s' % localpath
-    print("POPUP: Connected. Deleting existing files on %s..." % remote_path_prog)
-    sys.stdout.flush()
-    RemoveDirFTP(myFTP, remote_path_prog)
-    print("POPUP: Connected. Uploading program to %s..." % server_ip)
-    sys.stdout.flush()
-    try:
-        myFTP.cwd(remote_path)
-        myFTP.mkd(main_folder)
-        myFTP.cwd(remote_path_prog)
-    except:
-        error_str = sys.exc_info()[1]
-        print("POPUP: <font color=\"red\">Remote path not found or can't be created: %s</font>" % (remote_path))
-        sys.stdout.flush()
-        pause(4)
-        #contin = mbox("Remote path\n%s\nnot found or can't create folder.\n\nChange path and permissions and retry." % remote_path)
-        return False
+    def copy(self):
+        return MatNumpy._from_array(self.arr.copy())
 
-    def uploadThis(path):
+    def __len__(self):
+        """Return the number of columns"""
+        return self.arr.shape[1]
+
+    def Cols(self):
+        """Retrieve the matrix as a list of columns (list of list of float)."""
+        return self.arr.T.tolist()
+
+    def Rows(self):
+        """Get the matrix as a list of lists"""
+        return self.arr.tolist()
+
+    def _slice(self, idx, dim):
+        """Converts an int index to a slice so that indexing keeps 2 dimensions"""
+        if isinstance(idx, slice):
+            return idx
+        if idx < 0:
+            idx += self.arr.shape[dim]
+        return slice(idx, idx + 1)
+
+    def __getitem__(self, idx):
+        if type(idx) is tuple and type(idx[0]) is int and type(idx[1]) is int:
+            return self.arr.item(idx)
+        if isinstance(idx, int):  #integer A[1]
+            return MatNumpy._from_array(self.arr[self._slice(idx, 0), :].copy())
+        elif isinstance(idx, slice):  #one slice: A[1:3]
+            return MatNumpy._from_array(self.arr[idx, :].copy())
+        idx1 = idx[0]
+        idx2 = idx[1]
+        if isinstance(idx1, int) and isinstance(idx2, int):
+            return self.arr.item(idx1, idx2)
+        return MatNumpy._from_array(self.arr[self._slice(idx1, 0), self._slice(idx2, 1)].copy())
+
+    def __setitem__(self, idx, item):
+        if isinstance(idx, tuple) and isinstance(idx[0], int) and isinstance(idx[1], int) and isinstance(item, (int, float)):
+            self.arr[idx] = item
+            return
+        if isinstance(item, (int, float)):
+            item = [[item]]
+        elif isinstance(item, list):
+            item = Mat(item)
+        if isinstance(item, Mat):
+            item = _mat_2_array(item)
+
+        if isinstance(idx, (int, slice)):  #A[1] or A[1:3]
+            idx1 = idx
+            idx2 = 0
+        else:
+            idx1 = idx[0]
+            idx2 = idx[1]
+        idx1 = self._slice(idx1, 0)
+        idx2 = self._slice(idx2, 1)
+        target = self.arr[idx1, idx2]
+        if target.shape != item.shape:
+            raise Exception(MatrixError, "Submatrix indices does not match the new matrix sizes", item.shape[0], "x", item.shape[1], "<-", target.shape[0], "x", target.shape[1])
+        self.arr[idx1, idx2] = item
+
+    def tr(self):
+        """Returns the transpose of the matrix"""
+        if self.arr.size == 0:
+            return Mat(0, 0)
+        return MatNumpy._from_array(self.arr.T.copy())
+
+    def size(self, dim=None):
+        """Returns the size of a matrix (m,n).
+        Dim can be set to 0 to return m (rows) or 1 to return n (columns)"""
+        if dim is None:
+            return self.arr.shape
+        elif dim == 0 or dim == 1:
+            return self.arr.shape[dim]
+        else:
+            raise Exception(MatrixError, "Invalid dimension!")
+
+    def __add__(self, mat):
+        """Add a matrix to this matrix and
+        return the new matrix. It doesn't modify
+        the current matrix"""
+        if isinstance(mat, (int, float)):
+            return MatNumpy._from_array(self.arr + mat)
+        other = _mat_2_array(mat)
+        if self.arr.shape != other.shape:
+            raise Exception(MatrixError, "Can not add matrices of sifferent sizes!")
+        return MatNumpy._from_array(self.arr + other)
+
+    def __sub__(self, mat):
+        """Subtract a matrix from this matrix and
+        return the new matrix. It doesn't modify
+        the current matrix"""
+        if isinstance(mat, (int, float)):
+            return MatNumpy._from_array(self.arr - mat)
+        other = _mat_2_array(mat)
+        if self.arr.shape != other.shape:
+            raise Exception(MatrixError, "Can not subtract matrices of sifferent sizes!")
+        return MatNumpy._from_array(self.arr - other)
+
+    def __mul__(self, mat):
+        """Multiply a matrix with this matrix and
+        return the new matrix. It doesn't modify
+        the current matrix"""
+        import numpy as np
+        if isinstance(mat, (int, float)):
+            return MatNumpy._from_array(self.arr * mat)
+        if isinstance(mat, list):  #case of a matrix times a vector
+            szvect = len(mat)
+            m = self.arr.shape[0]
+            if szvect + 1 == m:
+                result = np.dot(self.arr[:-1, :-1], mat) + self.arr[:-1, -1]
+            elif szvect == m:
+                result = np.dot(self.arr, mat)
+            else:
+                raise Exception(MatrixError, "Invalid product")
+            return result.tolist()
+        other = _mat_2_array(mat)
+        if self.arr.shape[1] != other.shape[0]:
+            raise Exception(MatrixError, "Matrices cannot be multipled (unexpected size)!")
+        return MatNumpy._from_array(np.dot(self.arr, other))
+
+    def isHomogeneous(self):
+        """returns 1 if it is a Homogeneous matrix"""
+        import numpy as np
+        if self.arr.shape != (4, 4):
+            return False
+        rot = self.arr[:3, :3]
+        test = np.dot(rot, rot.T)
+        test.flat[::4] -= 1.0
+        return bool(np.abs(test).sum() <= 1e-4)
+
+    def invH(self):
+        """Returns the inverse of this pose (homogeneous matrix assumed)"""
+        import numpy as np
+        if not self.isHomogeneous():
+            raise Exception(MatrixError, "Pose matrix is not homogeneous. invH() can only compute the inverse of a homogeneous matrix")
+        rot_t = self.arr[:3, :3].T
+        hout = np.eye(4)
+        hout[:3, :3] = rot_t
+        hout[:3, 3] = -np.dot(rot_t, self.arr[:3, 3])
+        return MatNumpy._from_array(hout)
+
+    def tolist(self):
+        """Returns the first column of the matrix as a list"""
+        return self.arr[:, 0].tolist()
+
+    def list(self):
+        """Returns the first column of the matrix as a list"""
+        return self.arr[:, 0].tolist()
+
+    def list2(self):
+        """Returns the matrix as list of lists (one list per column)"""
+        return self.arr.T.tolist()
+
+    def Pos(self):
+        """Returns the position of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
+        return self.arr[:3, 3].tolist()
+
+    def VX(self):
+        """Returns the X vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
+        return self.arr[:3, 0].tolist()
+
+    def VY(self):
+        """Returns the Y vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
+        return self.arr[:3, 1].tolist()
+
+    def VZ(self):
+        """Returns the Z vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
+        return self.arr[:3, 2].tolist()
+
+    def setPos(self, newpos):
+        """Sets the XYZ position of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
+        self.arr[:3, 3] = [newpos[0], newpos[1], newpos[2]]
+        return self
+
+
+class _Pose4Row(list):
+    """Row of a :class:`.Pose4` returned by Pose4.rows: assigning values updates the pose"""
+    __slots__ = ('_pose', '_index')
+
+    def __setitem__(self, idx, item):
+        list.__setitem__(self, idx, item)
+        self._pose._setRow(self._index, self)
+
+    def __reduce__(self):
+        # Copies are plain lists
+        return (list, (list(self), ))
+
+    def _resize(self, *args):
+        raise Exception(MatrixError, "The rows of a Pose4 must have 4 values")
+
+    append = extend = insert = pop = remove = __delitem__ = __iadd__ = __imul__ = _resize
+
+
+class _Pose4Rows(list):
+    """Rows of a :class:`.Pose4` returned by Pose4.rows: assigning rows updates the pose"""
+    __slots__ = ('_pose', )
+
+    def __setitem__(self, idx, item):
+        list.__setitem__(self, idx, item)
+        for i in range(4):
+            self._pose._setRow(i, list.__getitem__(self, i))
+
+    def __reduce__(self):
+        # Copies are plain lists
+        return (list, ([list(row) for row in self], ))
+
+    def _resize(self, *args):
+        raise Exception(MatrixError, "A Pose4 must have 4 rows")
+
+    append = extend = insert = pop = remove = __delitem__ = __iadd__ = __imul__ = _resize
+
+
+class Pose4(Mat):
+    """Pose4 is a 4x4 homogeneous matrix (pose) stored as 12 floats: the 3x3 rotation and the translation. The last row is always [0,0,0,1].
+    Products, inverses and point transformations are calculated in closed form. Pose4 objects are returned by :func:`~robodk.transl`, :func:`~robodk.rotx`, :func:`~robodk.KUKA_2_Pose` and the other pose constructors of this module and can be used anywhere a :class:`.Mat` is expected.
+    The rows (pose.rows or pose.Rows()) can be modified in place, as with :class:`.Mat`, as long as the last row stays [0,0,0,1]. Use Mat(pose) to obtain a generic 4x4 matrix that can be modified freely.
+
+    :param rows: 4x4 or 3x4 list of lists or a :class:`.Mat` pose (identity by default)
+
+    .. seealso:: :class:`.Mat`, :func:`~robodk.transl`, :func:`~robodk.KUKA_2_Pose`
+    """
+    # The 12 values are slot attributes: fast access and no __dict__
+    __slots__ = ('m00', 'm01', 'm02', 'm03', 'm10', 'm11', 'm12', 'm13', 'm20', 'm21', 'm22', 'm23')
+
+    def __init__(self, rows=None):
+        if rows is None:
+            self.m00, self.m01, self.m02, self.m03 = 1.0, 0.0, 0.0, 0.0
+            self.m10, self.m11, self.m12, self.m13 = 0.0, 1.0, 0.0, 0.0
+            self.m20, self.m21, self.m22, self.m23 = 0.0, 0.0, 1.0, 0.0
+            return
+        if isinstance(rows, Mat):
+            rows = rows.Rows()
+        if len(rows) not in (3, 4) or any([len(row) != 4 for row in rows]):
+            raise Exception(MatrixError, "Pose4 requires a 4x4 or 3x4 matrix")
+        if len(rows) == 4 and list(rows[3]) != [0, 0, 0, 1]:
+            raise Exception(MatrixError, "Pose4 requires the last row to be [0,0,0,1]")
+        self.m00, self.m01, self.m02, self.m03 = rows[0]
+        self.m10, self.m11, self.m12, self.m13 = rows[1]
+        self.m20, self.m21, self.m22, self.m23 = rows[2]
+
+    def __reduce__(self):
+        return (Pose4, ([[self.m00, self.m01, self.m02, self.m03], [self.m10, self.m11, self.m12, self.m13], [self.m20, self.m21, self.m22, self.m23]], ))
+
+    @property
+    def rows(self):
+        """Rows of the pose (list of lists). Assigning a value of a row updates the pose: pose.rows[i][j] = value"""
+        rows = _Pose4Rows()
+        rows._pose = self
+        values = [self.m00, self.m01, self.m02, self.m03, self.m10, self.m11, self.m12, self.m13, self.m20, self.m21, self.m22, self.m23, 0, 0, 0, 1]
+        for i in range(4):
+            row = _Pose4Row(values[4 * i:4 * i + 4])
+            row._pose = self
+            row._index = i
+            list.append(rows, row)
+        return rows
+
+    def _setRow(self, i, row):
+        """Updates a row of the pose (the last row must be [0,0,0,1])"""
+        if len(row) != 4:
+            raise Exception(MatrixError, "The rows of a Pose4 must have 4 values")
+        if i == 3 or i == -1:
+            if list(row) != [0, 0, 0, 1]:
+                raise Exception(MatrixError, "Pose4 requires the last row to be [0,0,0,1]")
+            return
+        names = _POSE4_SLOTS[i]
+        setattr(self, names[0], row[0])
+        setattr(self, names[1], row[1])
+        setattr(self, names[2], row[2])
+        setattr(self, names[3], row[3])
+
+    @rows.setter
+    def rows(self, rows):
+        self.__init__(rows)
+
+    def __iter__(self):
+        return iter(self.Cols())
+
+    def copy(self):
+        return _pose4(self.m00, self.m01, self.m02, self.m03, self.m10, self.m11, self.m12, self.m13, self.m20, self.m21, self.m22, self.m23)
+
+    def __len__(self):
+        """Return the number of columns"""
+        return 4
+
+    def ColsCount(self):
+        """Return the number of coumns. Same as len()."""
+        return 4
+
+    def Cols(self):
+        """Retrieve the matrix as a list of columns (list of list of float)."""
+        return [[self.m00, self.m10, self.m20, 0], [self.m01, self.m11, self.m21, 0], [self.m02, self.m12, self.m22, 0], [self.m03, self.m13, self.m23, 1]]
+
+    def Rows(self):
+        """Get the matrix as a list of lists"""
+        return self.rows
+
+    def size(self, dim=None):
+        """Returns the size of a matrix (m,n).
+        Dim can be set to 0 to return m (rows) or 1 to return n (columns)"""
+        if dim is None:
+            return (4, 4)
+        elif dim == 0 or dim == 1:
+            return 4
+        else:
+            raise Exception(MatrixError, "Invalid dimension!")
+
+    def __getitem__(self, idx):
+        if type(idx) is tuple and type(idx[0]) is int and type(idx[1]) is int:
+            i, j = idx
+            if i < 0:
+                i += 4
+            if i == 3:
+                return (0, 0, 0, 1)[j]
+            return getattr(self, _POSE4_SLOTS[i][j])
+        return Mat.__getitem__(self, idx)
+
+    def __setitem__(self, idx, item):
+        if type(idx) is tuple and type(idx[0]) is int and type(idx[1]) is int and isinstance(item, (int, float)):
+            i, j = idx
+            if i < 0:
+                i += 4
+            if i != 3:
+                setattr(self, _POSE4_SLOTS[i][j], item)
+                return
+        # Generic update: the result must still be a pose
+        newmat = Mat(self.rows)
+        newmat[idx] = item
+        self.rows = newmat.Rows()
+
+    def __mul__(self, mat):
+        """Multiply a matrix with this pose and
+        return the new matrix. It doesn't modify
+        the current pose"""
+        if isinstance(mat, Pose4):
+            a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23 = self.m00, self.m01, self.m02, self.m03, self.m10, self.m11, self.m12, self.m13, self.m20, self.m21, self.m22, self.m23
+            b00, b01, b02, b03, b10, b11, b12, b13, b20, b21, b22, b23 = mat.m00, mat.m01, mat.m02, mat.m03, mat.m10, mat.m11, mat.m12, mat.m13, mat.m20, mat.m21, mat.m22, mat.m23
+            return _pose4(a00 * b00 + a01 * b10 + a02 * b20, a00 * b01 + a01 * b11 + a02 * b21, a00 * b02 + a01 * b12 + a02 * b22, a00 * b03 + a01 * b13 + a02 * b23 + a03,
+                          a10 * b00 + a11 * b10 + a12 * b20, a10 * b01 + a11 * b11 + a12 * b21, a10 * b02 + a11 * b12 + a12 * b22, a10 * b03 + a11 * b13 + a12 * b23 + a13,
+                          a20 * b00 + a21 * b10 + a22 * b20, a20 * b01 + a21 * b11 + a22 * b21, a20 * b02 + a21 * b12 + a22 * b22, a20 * b03 + a21 * b13 + a22 * b23 + a23)
+        if isinstance(mat, list) and (len(mat) == 3 or len(mat) == 4):  #case of a pose times a point
+            px, py, pz = mat[0], mat[1], mat[2]
+            pw = 1.0 if len(mat) == 3 else mat[3]
+            point = [self.m00 * px + self.m01 * py + self.m02 * pz + self.m03 * pw, self.m10 * px + self.m11 * py + self.m12 * pz + self.m13 * pw, self.m20 * px + self.m21 * py + self.m22 * pz + self.m23 * pw]
+            if len(mat) == 4:
+                point.append(pw)
+            return point
+        return Mat.__mul__(self, mat)
+
+    def isHomogeneous(self):
+        """returns 1 if it is a Homogeneous matrix"""
+        m00, m01, m02, m10, m11, m12, m20, m21, m22 = self.m00, self.m01, self.m02, self.m10, self.m11, self.m12, self.m20, self.m21, self.m22
+        zero = abs(m00 * m00 + m01 * m01 + m02 * m02 - 1.0) + abs(m10 * m10 + m11 * m11 + m12 * m12 - 1.0) + abs(m20 * m20 + m21 * m21 + m22 * m22 - 1.0)
+        zero += 2 * (abs(m00 * m10 + m01 * m11 + m02 * m12) + abs(m00 * m20 + m01 * m21 + m02 * m22) + abs(m10 * m20 + m11 * m21 + m12 * m22))
+        return zero <= 1e-4
+
+    def invH(self):
+        """Returns the inverse of this pose (homogeneous matrix assumed)"""
+        if not self.isHomogeneous():
+            raise Exception(MatrixError, "Pose matrix is not homogeneous. invH() can only compute the inverse of a homogeneous matrix")
+        m00, m01, m02, x, m10, m11, m12, y, m20, m21, m22, z = self.m00, self.m01, self.m02, self.m03, self.m10, self.m11, self.m12, self.m13, self.m20, self.m21, self.m22, self.m23
+        return _pose4(m00, m10, m20, -(m00 * x + m10 * y + m20 * z),
+                      m01, m11, m21, -(m01 * x + m11 * y + m21 * z),
+                      m02, m12, m22, -(m02 * x + m12 * y + m22 * z))
+
+    def tolist(self):
+        """Returns the first column of the matrix as a list"""
+        return [self.m00, self.m10, self.m20, 0]
+
+    def list(self):
+        """Returns the first column of the matrix as a list"""
+        return [self.m00, self.m10, self.m20, 0]
+
+    def list2(self):
+        """Returns the matrix as list of lists (one list per column)"""
+        return self.Cols()
+
+    def Pos(self):
+        """Returns the position of a pose"""
+        return [self.m03, self.m13, self.m23]
+
+    def VX(self):
+        """Returns the X vector of a pose"""
+        return [self.m00, self.m10, self.m20]
+
+    def VY(self):
+        """Returns the Y vector of a pose"""
+        return [self.m01, self.m11, self.m21]
+
+    def VZ(self):
+        """Returns the Z vector of a pose"""
+        return [self.m02, self.m12, self.m22]
+
+    def setPos(self, newpos):
+        """Sets the XYZ position of a pose"""
+        self.m03, self.m13, self.m23 = newpos[0], newpos[1], newpos[2]
+        return self
+
+    def setVX(self, v_xyz):
+        """Sets the VX vector of a pose, which is the first column of a homogeneous matrix"""
+        self.m00, self.m10, self.m20 = normalize3(v_xyz)
+        return self
+
+    def setVY(self, v_xyz):
+        """Sets the VY vector of a pose, which is the second column of a homogeneous matrix"""
+        self.m01, self.m11, self.m21 = normalize3(v_xyz)
+        return self
+
+    def setVZ(self, v_xyz):
+        """Sets the VZ vector of a pose, which is the third column of a homogeneous matrix"""
+        self.m02, self.m12, self.m22 = normalize3(v_xyz)
+        return self
+
+    def rotationPose(self):
+        """Return the rotation pose of this matrix. The position returned is set to [0,0,0]"""
+        return self.copy().setPos([0, 0, 0])
+
+
+_POSE4_SLOTS = (Pose4.__slots__[0:4], Pose4.__slots__[4:8], Pose4.__slots__[8:12])
+
+
+def _pose4(m00, m01, m02, m03, m10, m11, m12, m13, m20, m21, m22, m23):
+    """Creates a :class:`.Pose4` given the first 3 rows of a pose (row major)"""
+    pose = object.__new__(Pose4)
+    pose.m00 = m00
+    pose.m01 = m01
+    pose.m02 = m02
+    pose.m03 = m03
+    pose.m10 = m10
+    pose.m11 = m11
+    pose.m12 = m12
+    pose.m13 = m13
+    pose.m20 = m20
+    pose.m21 = m21
+    pose.m22 = m22
+    pose.m23 = m23
+    return pose
+
+
+def _pose_2_12(pose):
+    """Returns the first 3 rows of a pose as 12 values (row major)"""
+    if isinstance(pose, Pose4):
+        return (pose.m00, pose.m01, pose.m02, pose.m03, pose.m10, pose.m11, pose.m12, pose.m13, pose.m20, pose.m21, pose.m22, pose.m23)
+    rows = pose.Rows()
+    return tuple(rows[0][0:4]) + tuple(rows[1][0:4]) + tuple(rows[2][0:4])
+
+
+def _mat_2_array(mat):
+    """Returns the float64 NumPy array of a :class:`.Mat` (no copy for NumPy backed matrices)"""
+    if isinstance(mat, MatNumpy):
+        return mat.arr
+    import numpy as np
+    return np.array(mat.Rows(), dtype=np.float64)
+
+
+#-------------------------------------------------------
+# FTP TRANSFER Tools
+def RemoveFileFTP(ftp, filepath):
+    """Delete a file on a remote server."""
+    import ftplib
+    try:
+        ftp.delete(filepath)
+    except ftplib.all_errors as e:
+        import sys
+        print('POPUP: Could not remove file {0}: {1}'.format(filepath, e))
+        sys.stdout.flush()
+
+
+def RemoveDirFTP(ftp, path):
+    """Recursively delete a directory tree on a remote server."""
+    import ftplib
+    wd = ftp.pwd()
+    try:
+        names = ftp.nlst(path)
+    except ftplib.all_errors as e:
+        # some FTP servers complain when you try and list non-existent paths
+        print('RemoveDirFTP: Could not remove folder {0}: {1}'.format(path, e))
+        return
+
+    for name in names:
+        if os.path.split(name)[1] in ('.', '..'): continue
+        print('RemoveDirFTP: Checking {0}'.format(name))
+        try:
+            ftp.cwd(path + '/' + name)  # if we can cwd to it, it's a folder
+            ftp.cwd(wd)  # don't try a nuke a folder we're in
+            RemoveDirFTP(ftp, path + '/' + name)
+        except ftplib.all_errors:
+            ftp.delete(path + '/' + name)
+            #RemoveFileFTP(ftp, name)
+
+    try:
+        ftp.rmd(path)
+    except ftplib.all_errors as e:
+        print('RemoveDirFTP: Could not remove {0}: {1}'.format(path, e))
+
+
+def UploadDirFTP(localpath, server_ip, remote_path, username, password):
+    """Upload a folder to a robot through FTP recursively"""
+    import ftplib
+    import os
+    import sys
+    main_folder = os.path.basename(os.path.normpath(localpath))
+    print("POPUP: <p>Connecting to <strong>%s</strong> using user name <strong>%s</strong> and password ****</p><p>Please wait...</p>" % (server_ip, username))
+    sys.stdout.flush()
+    try:
+        myFTP = ftplib.FTP(server_ip, username, password)
+        print('Connection established')
+    except:
+        error_str = sys.exc_info()[1]
+        print("POPUP: <font color=\"red\">Connection to %s failed: <p>%s</p></font>" % (server_ip, error_str))
+        sys.stdout.flush()
+        pause(4)
+        return False
+
+    remote_path_prog = remote_path + '/' + main_folder
+    myPath = r'%s' % localpath
+    print("POPUP: Connected. Deleting existing files on %s..." % remote_path_prog)
+    sys.stdout.flush()
+    RemoveDirFTP(myFTP, remote_path_prog)
+    print("POPUP: Connected. Uploading program to %s..." % server_ip)
+    sys.stdout.flush()
+    try:
+        myFTP.cwd(remote_path)
+        myFTP.mkd(main_folder)
+        myFTP.cwd(remote_path_prog)
+    except:
+        error_str = sys.exc_info()[1]
+        print("POPUP: <font color=\"red\">Remote path not found or can't be created: %s</font>" % (remote_path))
+        sys.stdout.flush()
+        pause(4)
+        #contin = mbox("Remote path\n%s\nnot found or can't create folder.\n\nChange path and permissions and retry." % remote_path)
+        return False
+
+    def uploadThis(path):
         files = os.listdir(path)
         os.chdir(path)
         for f in files:
@@ -1905,288 +3220,1382 @@ def UploadFTP(program, robot_ip, remote_path, ftp_user, ftp_pass, pause_sec=2):
 
 
 #------------------------------------------------------
-#--------       TKinter dependencies    ---------------
-_tkinter_available = True
-if sys.version_info[0] < 3:
-    # Python 2.X only:
-    try:
-        import Tkinter as tkinter
-        import tkFileDialog as filedialog
-        import tkMessageBox as messagebox
-    except:
-        _tkinter_available = False
-else:
-    # Python 3.x only
+#--------       Program buffers and logs    ---------------
+class ProgStream(object):
+    """ProgStream stores the lines of a program (RobotPost.PROG) in a buffered temporary file instead of a list, so the memory used by a post processor does not depend on the length of the program.
+    It supports the list operations used by the post processors: append, extend, insert, len, indexing and iteration. The first lines (header block) and the last line are kept in memory,
+    reading or inserting other lines uses the temporary file (inserting a line copies the file, like list.insert moves the following items).
+    Iterating returns the text as lines: a line that contains line breaks is returned as several lines, so the file written is the same.
+
+    The temporary file is deleted by close, when the object is deleted or at the end of a with block.
+
+    :param int head_lines: number of lines kept in memory at the start of the program (header block)
+    :param str folder: folder for the temporary file (default: system temporary folder)
+    :param int buffer_size: size of the write buffer in bytes
+
+    .. code-block:: python
+
+        class RobotPost(object):
+            def __init__(self, robotpost=None, robotname=None, robot_axes=6, **kwargs):
+                self.PROG = ProgStream()
+    """
+
+    def __init__(self, head_lines=32, folder=None, buffer_size=1048576):
+        self.head = []
+        self.head_lines = head_lines
+        self.last = None
+        self.count = 0
+        self.folder = folder
+        self.buffer_size = buffer_size
+        self._file = None
+        self._offsets = None  # start of each line of the temporary file, in bytes
+        self._size = 0
+        self._at_end = True
+
+    def _new_file(self):
+        import tempfile
+        return tempfile.TemporaryFile('w+b', self.buffer_size, dir=self.folder)
+
+    def _write(self, line):
+        if self._file is None:
+            if len(self.head) < self.head_lines:
+                self.head.append(line)
+                return
+            import array
+            self._file = self._new_file()
+            self._offsets = array.array('d')
+            self._size = 0
+        elif not self._at_end:
+            # The file was read since the last write
+            self._file.seek(0, 2)
+            self._at_end = True
+        data = (line + '\n').encode('utf-8', 'replace')
+        self._offsets.append(self._size)
+        self._file.write(data)
+        self._size += len(data)
+
+    def _read(self, i):
+        """Returns line i of the temporary file"""
+        start = int(self._offsets[i])
+        end = int(self._offsets[i + 1]) if i + 1 < len(self._offsets) else self._size
+        self._file.flush()
+        self._file.seek(start)
+        self._at_end = False
+        return self._file.read(end - start)[:-1].decode('utf-8')
+
+    def _insert_file(self, i, line):
+        """Inserts a line before line i of the temporary file. The file is copied to a new temporary file."""
+        data = (line + '\n').encode('utf-8', 'replace')
+        start = int(self._offsets[i])
+        source = self._file
+        source.flush()
+        source.seek(0)
+        target = self._new_file()
+        remaining = start
+        while remaining > 0:
+            chunk = source.read(min(remaining, self.buffer_size))
+            target.write(chunk)
+            remaining -= len(chunk)
+        target.write(data)
+        while True:
+            chunk = source.read(self.buffer_size)
+            if not chunk:
+                break
+            target.write(chunk)
+        source.close()
+        self._file = target
+        self._at_end = True
+        for j in range(i, len(self._offsets)):
+            self._offsets[j] += len(data)
+        self._offsets.insert(i, start)
+        self._size += len(data)
+
+    def append(self, line):
+        if self.last is not None:
+            self._write(self.last)
+        self.last = line
+        self.count += 1
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def insert(self, index, line):
+        # Same index rules as list.insert: negative indexes count from the end and indexes out of range insert at the start or at the end
+        if index < 0:
+            index = max(index + self.count, 0)
+        if index >= self.count:
+            self.append(line)
+            return
+        if index <= len(self.head):
+            self.head.insert(index, line)
+        elif index == self.count - 1:
+            # Insert before the last line
+            self._write(line)
+        else:
+            self._insert_file(index - len(self.head), line)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError('list index out of range')
+        if index < len(self.head):
+            return self.head[index]
+        if index == self.count - 1:
+            return self.last
+        return self._read(index - len(self.head))
+
+    def __iter__(self):
+        for line in self.head:
+            yield line
+        if self._file is not None:
+            self._file.flush()
+            self._file.seek(0)
+            self._at_end = False
+            for line in self._file:
+                yield line[:-1].decode('utf-8')
+        if self.last is not None:
+            yield self.last
+
+    def close(self):
+        """Delete the temporary file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._offsets = None
+        self.head = []
+        self.last = None
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __del__(self):
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+
+
+# Severity of the messages of a ProgLog
+LOG_INFO = 0
+LOG_WARNING = 1
+LOG_ERROR = 2
+
+_LOG_SEVERITY_NAMES = {LOG_INFO: 'Info', LOG_WARNING: 'Warning', LOG_ERROR: 'Error'}
+
+
+class ProgLog(object):
+    """ProgLog collects the messages of a post processor (RobotPost.LOG) as records with a severity and the program line. Repeated messages are counted instead of stored again, so the cost of logging stays linear when a post reports a warning for every target.
+    The text shown to the user is rendered on demand (see Summary). Existing code that checks len(LOG) or concatenates LOG with a string keeps working.
+
+    :param int max_records: maximum number of different messages stored (other messages are only counted)
+    :param int max_lines: maximum number of program lines remembered for each repeated message
+    """
+
+    def __init__(self, max_records=1000, max_lines=5):
+        self.max_records = max_records
+        self.max_lines = max_lines
+        self.records = []  # [severity, message, count, lines] in the order of the first occurrence
+        self.count = 0
+        self.dropped = 0
+        self._index = {}
+
+    def add(self, message, severity=LOG_WARNING, line=None):
+        """Add a message to the log.
+
+        :param str message: message
+        :param int severity: LOG_INFO, LOG_WARNING or LOG_ERROR
+        :param int line: program line related to the message (optional)
+        """
+        self.count += 1
+        key = (severity, message)
+        record = self._index.get(key)
+        if record is None:
+            if len(self.records) >= self.max_records:
+                self.dropped += 1
+                return
+            record = [severity, message, 0, []]
+            self.records.append(record)
+            self._index[key] = record
+        record[2] += 1
+        lines = record[3]
+        if line is not None and len(lines) < self.max_lines and (not lines or lines[-1] != line):
+            lines.append(line)
+
+    def Records(self, severity=LOG_INFO):
+        """Returns the messages with the given severity or higher as a list of (severity, message, count, lines)"""
+        return [tuple(r) for r in self.records if r[0] >= severity]
+
+    def Text(self):
+        """Returns the messages as text (one line per message, repeated messages are shown once with the number of occurrences)"""
+        text = []
+        for severity, message, count, lines in self.records:
+            if severity == LOG_ERROR:
+                message = 'Error: ' + message
+            if count > 1:
+                info = 'x%i' % count
+                if lines:
+                    info += ', lines ' + ', '.join([str(i) for i in lines])
+                    if count > len(lines):
+                        info += '...'
+                message += ' (%s)' % info
+            text.append(message + '\n')
+        if self.dropped > 0:
+            text.append('... %i more messages\n' % self.dropped)
+        return ''.join(text)
+
+    def Summary(self, title='Program generation LOG:'):
+        """Returns the text displayed to the user once the program is generated"""
+        return title + '\n\n' + self.Text()
+
+    def clear(self):
+        self.records = []
+        self.count = 0
+        self.dropped = 0
+        self._index = {}
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        return self.Text()
+
+    def __add__(self, other):
+        return self.Text() + other
+
+    def __radd__(self, other):
+        return other + self.Text()
+
+
+def BatchTarget(poses, joints, confs, index):
+    """Returns the pose (:class:`.Mat`), joints (list) and configuration of one target of a batch of movements (see :class:`.RobotPostBatch`)"""
+    pose = poses[index]
+    if pose is not None and not isinstance(pose, Mat):
+        pose = Mat(pose.tolist() if hasattr(pose, 'tolist') else pose)
+    jnts = joints[index]
+    jnts = jnts.tolist() if hasattr(jnts, 'tolist') else list(jnts)
+    conf = None
+    if confs is not None:
+        conf = confs[index]
+        conf = conf.tolist() if hasattr(conf, 'tolist') else conf
+    return pose, jnts, conf
+
+
+class RobotPostBatch(object):
+    """Default batch movement API of a post processor (RobotPost). Each method calls the single movement method for each target.
+    Post processors can provide faster versions that generate the same program.
+
+    Poses can be provided as a list of poses or an Nx4x4 array, joints as a list of joints or an NxJ array and configurations as a list or an Nx3 array.
+    """
+
+    def MoveJ_Batch(self, poses, joints, confs=None):
+        """Add a batch of joint movements (same as calling MoveJ for each target)"""
+        for i in range(len(joints)):
+            self.MoveJ(*BatchTarget(poses, joints, confs, i))
+
+    def MoveL_Batch(self, poses, joints, confs=None):
+        """Add a batch of linear movements (same as calling MoveL for each target)"""
+        for i in range(len(joints)):
+            self.MoveL(*BatchTarget(poses, joints, confs, i))
+
+    def addlines_batch(self, move, line, poses, joints, confs=None):
+        """Add a line for each target of a batch of movements. The line is formatted with the joints (%(joints)s, each value as %.6f separated by commas) and the pose (%(pose)s, the x, y, z, rx, ry, rz text of str(pose)).
+        The single movement method (move) is called for each target if the line uses the pose and the batch has joint targets.
+
+        Example:
+
+            .. code-block:: python
+
+                def MoveL_Batch(self, poses, joints, confs=None):
+                    self.addlines_batch(self.MoveL, '    robot.MoveL([%(joints)s,%(pose)s])', poses, joints, confs)
+        """
+        if '%(pose)s' not in line:
+            for jnts in _joints_2_str_batch(joints):
+                self.addline(line % {'joints': jnts})
+            return
+
+        if isinstance(poses, list) and any([pose is None for pose in poses]):
+            for i in range(len(joints)):
+                move(*BatchTarget(poses, joints, confs, i))
+            return
+
+        for jnts, pose in zip(_joints_2_str_batch(joints), _poses_2_str_batch(poses)):
+            self.addline(line % {'joints': jnts, 'pose': pose})
+
+
+def _joints_2_str_batch(joints):
+    """Returns the text of a batch of joint targets, each value as %.6f separated by commas"""
     try:
-        import tkinter
-        from tkinter import filedialog
-        from tkinter import messagebox
-    except ModuleNotFoundError:
-        _tkinter_available = False
-
-#------------------
-
-#------------------
-if _tkinter_available:
-
-    def getOpenFile(path_preference="C:/RoboDK/Library/", strfile='', strtitle='Open file ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
-        """Pop up a file dialog window to select a file to open. Returns a file object opened in read-only mode. Use returned value.name to retrieve the file path."""
-        options = {}
-        options['initialdir'] = path_preference
-        options['title'] = strtitle
-        options['defaultextension'] = defaultextension  #'.txt'
-        options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
-        options['initialfile'] = strfile
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        file_path = filedialog.askopenfilename(**options)
-        # same as: file_path = tkinter.filedialog.askopenfilename()
-        return file_path
-
-    def getSaveFile(path_preference="C:/RoboDK/Library/", strfile='file.txt', strtitle='Save file as ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
-        """Pop up a file dialog window to select a file to save. Returns a file object opened in write-only mode. Use returned value.name to retrieve the file path."""
-        options = {}
-        options['initialdir'] = path_preference
-        options['title'] = strtitle
-        options['defaultextension'] = defaultextension  #'.txt'
-        options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
-        options['initialfile'] = strfile
-        #options['parent'] = root
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        file_path = filedialog.asksaveasfile(**options)
-        #same as: file_path = tkinter.filedialog.asksaveasfile(**options)
-        return file_path
-
-    def getOpenFileName(path_preference="C:/RoboDK/Library/", strfile='', strtitle='Open file ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
-        """Pop up a file dialog window to select a file to open. Returns the file path as a string."""
-        options = {}
-        options['initialdir'] = path_preference
-        options['title'] = strtitle
-        options['defaultextension'] = defaultextension  #'.txt'
-        options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
-        options['initialfile'] = strfile
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        file_path = filedialog.askopenfilename(**options)
-        # same as: file_path = tkinter.filedialog.askopenfilename()
-        return file_path
-
-    def getSaveFileName(path_preference="C:/RoboDK/Library/", strfile='file.txt', strtitle='Save file as ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
-        """Pop up a file dialog window to select a file to save. Returns the file path as a string."""
-        options = {}
-        options['initialdir'] = path_preference
-        options['title'] = strtitle
-        options['defaultextension'] = defaultextension  #'.txt'
-        options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
-        options['initialfile'] = strfile
-        #options['parent'] = root
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        file_path = filedialog.asksaveasfilename(**options)
-        #same as: file_path = tkinter.filedialog.asksaveasfile(**options)
-        return file_path
-
-    def getSaveFolder(path_programs='/', popup_msg='Select a directory to save your program'):
-        """Ask the user to select a folder to save a program or other file. Returns the path of the folder as a string."""
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        dirname = filedialog.askdirectory(initialdir=path_programs, title=popup_msg)
-        if len(dirname) < 1:
-            dirname = None
-
-        return dirname
-
-    def getOpenFolder(path_preference="C:/RoboDK/Library/", strtitle='Open folder ...'):
-        """Pop up a folder dialog window to select a folder to open. Returns the path of the folder as a string."""
-        options = {}
-        options['title'] = strtitle
-        options['initialdir'] = path_preference
-        root = tkinter.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        file_path = filedialog.askdirectory(**options)
-        return file_path
-
-    def ShowMessage(msg, title=None):
-        """Show a blocking message"""
-        print(msg)
-        if title is None:
-            title = msg
-
-        root = tkinter.Tk()
-        root.overrideredirect(1)
-        root.withdraw()
-        root.attributes("-topmost", True)
-        result = messagebox.showinfo(title, msg)  #, icon='warning')#, parent=texto)
-        root.destroy()
-        return result
+        import numpy
+        J = numpy.asarray(joints, dtype=numpy.float64)
+    except (ImportError, ValueError, TypeError):
+        # NumPy not available or joint targets with a different number of joints
+        J = None
+    if J is None or J.ndim != 2:
+        return ['' if jnts is None else ','.join(['%.6f' % value for value in jnts]) for jnts in joints]
+    fmt = ','.join(['%.6f'] * J.shape[1])
+    return [fmt % tuple(jnts) for jnts in J.tolist()]
+
+
+def _poses_2_str_batch(poses):
+    """Returns the text of a batch of poses (same as the x, y, z, rx, ry, rz text of str(pose) for each pose)"""
+    targets = Poses_2_Staubli(poses, 3)
+    if hasattr(targets, 'tolist'):
+        targets = targets.tolist()
+    return ['%.3f, %.3f, %.3f,  %.3f, %.3f, %.3f' % tuple(xyzwpr) for xyzwpr in targets]
+
+
+#------------------------------------------------------
+#--------       Compiled post processors    ---------------
+# Import times in seconds of the robodk module, tkinter and the compiled post processors (see PostImportMetrics)
+POST_IMPORT_METRICS = {}
+
+# Compiled post processor folder (v<major><minor>) of each post processor file and loaded attributes
+_COMPILED_POST_PATHS = {}
+_COMPILED_POST_CACHE = {}
+
+
+def CompiledPostPath(post_file):
+    """Returns the folder with the compiled post processors for the Python version in use (v<major><minor>, next to the post processor file).
+    The folder is checked once per post processor file and Python process."""
+    key = os.path.abspath(post_file)
+    path_library = _COMPILED_POST_PATHS.get(key)
+    if path_library is None:
+        # Detect Python version and post processor
+        print("Using Python version: " + str(sys.version_info))
+        path_file = os.path.dirname(post_file).replace(os.sep, "/")
+        print("RoboDK Post Processor: " + path_file)
+
+        # Check if the post is compatible with the Python version
+        version_str = str(sys.version_info[0]) + str(sys.version_info[1])
+        path_library = os.path.dirname(key).replace(os.sep, "/") + '/v' + version_str
+        if not os.path.isdir(path_library):
+            msg = "Invalid Python version or post processor not found. Make sure you are using a supported Python version: " + path_file + '/v' + version_str
+            msg += "\nSelect Tools-Options-Python and select a supported Python version"
+            print(msg)
+            raise Exception(msg)
+        _COMPILED_POST_PATHS[key] = path_library
+    return path_library
+
+
+def LoadCompiledPost(post_file, name, attribute='RobotPost'):
+    """Returns an attribute (the RobotPost class by default) of the compiled version of a post processor (v<major><minor>/<name>).
+    The module is imported once per Python process and the import time is added to POST_IMPORT_METRICS.
+
+    Example:
+
+        .. code-block:: python
+
+            BasePost = LoadCompiledPost(__file__, "KUKA_KRC4")
+
+    .. seealso:: :func:`~robodk.PostImportMetrics`
+    """
+    path_library = CompiledPostPath(post_file)
+    key = (path_library, name, attribute)
+    if key in _COMPILED_POST_CACHE:
+        return _COMPILED_POST_CACHE[key]
+
+    import importlib
+    path_posts = os.path.dirname(path_library)
+    if path_posts not in [p.replace(os.sep, "/") for p in sys.path]:
+        sys.path.append(path_posts)
+
+    t_start = time.time()
+    module = importlib.import_module(os.path.basename(path_library) + '.' + name)
+    if name not in POST_IMPORT_METRICS:
+        POST_IMPORT_METRICS[name] = time.time() - t_start
+
+    value = getattr(module, attribute)
+    _COMPILED_POST_CACHE[key] = value
+    return value
+
+
+def PostImportMetrics():
+    """Returns a text report of the import times of the robodk module, tkinter and the compiled post processors (POST_IMPORT_METRICS)"""
+    lines = []
+    for name, seconds in sorted(POST_IMPORT_METRICS.items(), key=lambda item: -item[1]):
+        lines.append("%-32s %8.1f ms" % (name, seconds * 1000))
+    return '\n'.join(lines)
+
+
+#------------------------------------------------------
+#--------       Batch post processing    ---------------
+# State of the program being generated by the current worker process (see PostProcessBatch)
+_POST_BATCH_TASK = None
+
+# Modules imported by the generated programs that are not post processors
+_POST_BATCH_NOT_POSTS = ('robodk', 'robolink', 'math', 'os', 'sys', 'time')
 
-    def ShowMessageYesNo(msg, title=None):
-        """Show a blocking message and let the user answer Yes or No"""
-        print(msg)
-        if title is None:
-            title = msg
-
-        root = tkinter.Tk()
-        root.overrideredirect(1)
-        root.withdraw()
-        root.attributes("-topmost", True)
-        result = messagebox.askyesno(title, msg)  #, icon='warning')#, parent=texto)
-        root.destroy()
-        return result
 
-    def ShowMessageYesNoCancel(msg, title=None):
-        """Show a blocking message and let the user answer Yes, No or Cancel"""
-        print(msg)
-        if title is None:
-            title = msg
-
-        root = tkinter.Tk()
-        root.overrideredirect(1)
-        root.withdraw()
-        root.attributes("-topmost", True)
-        result = messagebox.askyesnocancel(title, msg)  #, icon='warning')#, parent=texto)
-        root.destroy()
+def _post_batch_module_name(source, posts_dir):
+    """Returns the name of the post processor imported by a generated program (from <post> import *), or None"""
+    import re
+    for name in re.findall(r'^\s*from\s+([A-Za-z_]\w*)\s+import\s', source, re.MULTILINE):
+        if name not in _POST_BATCH_NOT_POSTS and os.path.isfile(os.path.join(posts_dir, name + '.py')):
+            return name
+    return None
+
+
+def _post_batch_patch(post_class):
+    """Makes ProgSave of a post processor save to the batch output folder without user interaction, and skips ProgSendRobot"""
+    if post_class.__dict__.get('_POST_BATCH_PATCHED', False):
+        return
+
+    prog_save = post_class.ProgSave
+
+    def ProgSave(self, folder, progname, ask_user=False, show_result=False):
+        task = _POST_BATCH_TASK
+        if task is not None and task['output_dir']:
+            folder = task['output_dir']
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        result = prog_save(self, folder, progname, False, False)
+        if task is not None:
+            task['programs'].append(progname)
+            files = getattr(self, 'PROG_FILES', [])
+            task['files'] += files if isinstance(files, list) else [files]
+            if getattr(self, 'LOG', ''):
+                task['log'].append(str(self.LOG))
         return result
 
-    class MessageBox(object):
-        def __init__(self, msg, b1, b2, frame, t, entry):
-
-            root = self.root = tkinter.Tk()
-            root.title('Input')
-            self.msg = str(msg)
-            # ctrl+c to copy self.msg
-            root.bind('<Control-c>', func=self.to_clip)
-            # remove the outer frame if frame=False
-            if not frame: root.overrideredirect(True)
-            # default values for the buttons to return
-            self.b1_return = True
-            self.b2_return = False
-            # if b1 or b2 is a tuple unpack into the button text & return value
-            if isinstance(b1, tuple): b1, self.b1_return = b1
-            if isinstance(b2, tuple): b2, self.b2_return = b2
-            # main frame
-            frm_1 = tkinter.Frame(root)
-            frm_1.pack(ipadx=2, ipady=2)
-            # the message
-            message = tkinter.Label(frm_1, text=self.msg)
-            message.pack(padx=8, pady=8)
-            # if entry=True create and set focus
-            if entry is not None:
-                if entry == True:
-                    entry = ''
-                self.entry = tkinter.Entry(frm_1)
-                self.entry.pack()
-                self.entry.insert(0, entry)
-                self.entry.focus_set()
-            # button frame
-            frm_2 = tkinter.Frame(frm_1)
-            frm_2.pack(padx=4, pady=4)
-            # buttons
-            btn_1 = tkinter.Button(frm_2, width=8, text=b1)
-            btn_1['command'] = self.b1_action
-            btn_1.pack(side='left')
-            if not entry: btn_1.focus_set()
-            btn_2 = tkinter.Button(frm_2, width=8, text=b2)
-            btn_2['command'] = self.b2_action
-            btn_2.pack(side='left')
-            # the enter button will trigger the focused button's action
-            btn_1.bind('<KeyPress-Return>', func=self.b1_action)
-            btn_2.bind('<KeyPress-Return>', func=self.b2_action)
-            # roughly center the box on screen
-            # for accuracy see: http://stackoverflow.com/a/10018670/1217270
-            root.update_idletasks()
-            xp = (root.winfo_screenwidth() // 2) - (root.winfo_width() // 2)
-            yp = (root.winfo_screenheight() // 2) - (root.winfo_height() // 2)
-            geom = (root.winfo_width(), root.winfo_height(), xp, yp)
-            root.geometry('{0}x{1}+{2}+{3}'.format(*geom))
-            # call self.close_mod when the close button is pressed
-            root.protocol("WM_DELETE_WINDOW", self.close_mod)
-            # a trick to activate the window (on windows 7)
-            #root.deiconify()
-            # if t is specified: call time_out after t seconds
-            if t: root.after(int(t * 1000), func=self.time_out)
-
-        def b1_action(self, event=None):
-            try:
-                x = self.entry.get()
-            except AttributeError:
-                self.returning = self.b1_return
-                self.root.quit()
+    def ProgSendRobot(self, *args, **kwargs):
+        print('Batch post processing: ProgSendRobot skipped')
+
+    post_class.ProgSave = ProgSave
+    post_class.ProgSendRobot = ProgSendRobot
+    post_class._POST_BATCH_PATCHED = True
+
+
+def _post_batch_worker(task):
+    """Runs one generated program script with the post processor of the task. Returns the result of the task (see PostProcessBatch)."""
+    global _POST_BATCH_TASK
+    import importlib
+    import runpy
+    import traceback
+    try:
+        from io import StringIO
+    except ImportError:
+        from StringIO import StringIO  # Python 2
+
+    script, post, posts_dir, output_dir = task
+    result = {'script': script, 'post': post, 'ok': False, 'seconds': 0.0, 'programs': [], 'files': [], 'log': [], 'output': '', 'error': ''}
+    _POST_BATCH_TASK = dict(result, output_dir=output_dir)
+    output = StringIO()
+    stdout, stderr = sys.stdout, sys.stderr
+    imported = None
+    t0 = time.time()
+    try:
+        sys.stdout = sys.stderr = output
+        if posts_dir not in sys.path:
+            sys.path.insert(0, posts_dir)
+
+        if script.lower().endswith(POST_RECORDING_EXT):
+            # Replay a recording of the post processor calls
+            recording = LoadPostRecording(script)
+            post = post or recording.post
+            module = importlib.import_module(post)
+            _post_batch_patch(module.RobotPost)
+            ReplayPost(recording, module)
+
+        else:
+            with open(script, 'r') as fid:
+                source = fid.read()
+
+            imported = _post_batch_module_name(source, posts_dir)
+            post = post or imported
+            if post is None:
+                raise Exception('The post processor used by %s is unknown. Provide the post processor name.' % script)
+
+            module = importlib.import_module(post)
+            _post_batch_patch(module.RobotPost)
+            if imported is not None and imported != post:
+                sys.modules[imported] = module
+
+            runpy.run_path(script, run_name='__main__')
+
+        result['ok'] = True
+
+    except BaseException:
+        result['error'] = traceback.format_exc()
+
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        if imported is not None and post is not None and imported != post and sys.modules.get(imported) is sys.modules.get(post):
+            del sys.modules[imported]
+
+    result['seconds'] = time.time() - t0
+    result['post'] = post
+    result['output'] = output.getvalue()
+    for key in ['programs', 'files', 'log']:
+        result[key] = _POST_BATCH_TASK[key]
+    result['log'] = '\n'.join(result['log'])
+    _POST_BATCH_TASK = None
+    return result
+
+
+def PostProcessBatch(scripts, post=None, output_dir=None, processes=None, posts_dir=None):
+    """Generate the robot programs of a list of program scripts (the Python files generated by RoboDK to drive a post processor) using a pool of processes.
+    ProgSave never asks the user for a folder or displays the result, and ProgSendRobot is skipped.
+
+    :param list scripts: paths of the program scripts or post processor call recordings (.rdkrec, see :func:`~robodk.RecordPostScript`)
+    :param str post: name of the post processor to use (for example, 'KUKA_KRC4_TG'). By default, each script uses the post processor it imports.
+    :param str output_dir: folder to save the programs. By default, each script saves the programs to the folder given to ProgSave.
+    :param int processes: number of processes (default: one per CPU). Use 1 to run the scripts in this process.
+    :param str posts_dir: folder of the post processors (default: folder of this module)
+    :return: list of results in the same order as scripts. Each result is a dictionary with the keys: script, post, ok, seconds, programs, files, log (post processor log), output (console output) and error (traceback).
+
+    .. code-block:: python
+
+        results = PostProcessBatch(glob.glob('cell/*.py'), 'KUKA_KRC4_TG', 'cell/output')
+        for result in results:
+            print("%s %.2f s %s" % (result['script'], result['seconds'], 'OK' if result['ok'] else result['error']))
+    """
+    if posts_dir is None:
+        posts_dir = os.path.dirname(os.path.abspath(__file__))
+    if output_dir:
+        output_dir = os.path.abspath(output_dir)
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+
+    tasks = [(os.path.abspath(script), post, posts_dir, output_dir) for script in scripts]
+    if processes == 1 or len(tasks) <= 1:
+        return [_post_batch_worker(task) for task in tasks]
+
+    import multiprocessing
+    pool = multiprocessing.Pool(processes)
+    try:
+        # imap keeps the order of the scripts
+        return list(pool.imap(_post_batch_worker, tasks, 1))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def PostProcessBatchMain(argv=None):
+    """Command line entry point of PostProcessBatch. It prints the time taken by each program and returns 1 if any program failed (0 otherwise).
+
+    python robodk.py postbatch [-h] [--post POST] [--output OUTPUT] [--jobs JOBS] [--logs LOGS] scripts [scripts ...]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog='robodk.py postbatch', description='Generate robot programs from RoboDK program scripts in parallel')
+    parser.add_argument('scripts', nargs='+', help='program scripts generated by RoboDK')
+    parser.add_argument('--post', default=None, help='post processor to use (default: the post imported by each script)')
+    parser.add_argument('--output', default=None, help='folder to save the programs (default: the folder set in each script)')
+    parser.add_argument('--jobs', type=int, default=None, help='number of processes (default: one per CPU)')
+    parser.add_argument('--logs', default=None, help='folder to save one log file per script')
+    args = parser.parse_args(argv)
+
+    t0 = time.time()
+    results = PostProcessBatch(args.scripts, args.post, args.output, args.jobs)
+    nfailed = 0
+    for result in results:
+        name = os.path.splitext(os.path.basename(result['script']))[0]
+        status = 'OK' if result['ok'] else 'FAILED'
+        if not result['ok']:
+            nfailed += 1
+        print('%-40s %-8s %8.3f s  %s' % (name, status, result['seconds'], ', '.join(result['programs'])))
+        if not result['ok']:
+            print(result['error'])
+        if args.logs:
+            if not os.path.isdir(args.logs):
+                os.makedirs(args.logs)
+            with open(os.path.join(args.logs, name + '.log'), 'w') as fid:
+                fid.write(result['output'])
+                if result['log']:
+                    fid.write('\nProgram generation LOG:\n' + result['log'] + '\n')
+                if result['error']:
+                    fid.write('\n' + result['error'])
+
+    print('%i programs, %i failed, total %.3f s (sum of program times %.3f s)' % (len(results), nfailed, time.time() - t0, sum([r['seconds'] for r in results])))
+    return 1 if nfailed > 0 else 0
+
+
+#------------------------------------------------------
+#--------       Post processor call recordings    ---------------
+# File extension of post processor call recordings (see PostRecording)
+POST_RECORDING_EXT = '.rdkrec'
+
+_POST_RECORDING_MAGIC = b'RDKREC01'
+
+# Value tags of a post processor call recording
+_REC_NONE = 0
+_REC_FALSE = 1
+_REC_TRUE = 2
+_REC_INT = 3
+_REC_FLOAT = 4
+_REC_STR = 5
+_REC_POSE = 6
+_REC_FLOATS = 7
+_REC_LIST = 8
+_REC_TUPLE = 9
+_REC_DICT = 10
+_REC_MAT = 11
+_REC_BIGINT = 12
+
+
+class PostRecording(object):
+    """PostRecording holds the calls made to a post processor (RobotPost) in a compact columnar form: one opcode per call, value tags, integers, floats (joints and numbers), poses (12 values per pose) and a table of unique strings.
+    A recording can be saved to a binary file and replayed with any post processor to generate the same program for another robot controller, without running RoboDK again.
+
+    .. seealso:: :func:`~robodk.RecordPostScript`, :func:`~robodk.ReplayPost`, :func:`~robodk.LoadPostRecording`
+    """
+
+    def __init__(self, post=None):
+        from array import array
+        self.post = post  # post processor used to record the calls
+        self.names = []  # method names (the opcode is the index in this list)
+        self.strings = []  # unique strings
+        self.ops = array('H')
+        self.tags = array('B')
+        self.ints = array('i')
+        self.floats = array('d')
+        self.poses = array('d')
+        self._name_ids = {}
+        self._string_ids = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def _string_id(self, text):
+        sid = self._string_ids.get(text)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(text)
+            self._string_ids[text] = sid
+        return sid
+
+    def _add(self, value):
+        tags = self.tags
+        if value is None:
+            tags.append(_REC_NONE)
+        elif value is True or value is False:
+            tags.append(_REC_TRUE if value else _REC_FALSE)
+        elif isinstance(value, float):
+            tags.append(_REC_FLOAT)
+            self.floats.append(value)
+        elif isinstance(value, int) or type(value).__name__ == 'long':
+            if -2147483648 <= value <= 2147483647:
+                tags.append(_REC_INT)
+                self.ints.append(value)
+            else:
+                tags.append(_REC_BIGINT)
+                self.ints.append(self._string_id(str(value)))
+        elif isinstance(value, str) or type(value).__name__ == 'unicode':
+            tags.append(_REC_STR)
+            self.ints.append(self._string_id(value))
+        elif isinstance(value, Mat):
+            rows = value.Rows()
+            if len(rows) == 4 and len(rows[0]) == 4 and list(rows[3]) == [0, 0, 0, 1]:
+                tags.append(_REC_POSE)
+                self.poses.extend(_pose_2_12(value))
+            else:
+                tags.append(_REC_MAT)
+                self.ints.append(len(rows))
+                self.ints.append(len(rows[0]) if len(rows) > 0 else 0)
+                for row in rows:
+                    self.floats.extend(row)
+        elif isinstance(value, (list, tuple)):
+            if isinstance(value, list) and len(value) > 0 and all([type(v) is float for v in value]):
+                tags.append(_REC_FLOATS)
+                self.ints.append(len(value))
+                self.floats.extend(value)
             else:
-                if x:
-                    self.returning = x
-                    self.root.quit()
+                tags.append(_REC_LIST if isinstance(value, list) else _REC_TUPLE)
+                self.ints.append(len(value))
+                for v in value:
+                    self._add(v)
+        elif isinstance(value, dict):
+            tags.append(_REC_DICT)
+            self.ints.append(len(value))
+            for k in sorted(value):
+                self._add(k)
+                self._add(value[k])
+        elif hasattr(value, 'tolist'):
+            # NumPy arrays and scalars
+            self._add(value.tolist())
+        else:
+            raise Exception('Unable to record a value of type %s' % type(value).__name__)
 
-        def b2_action(self, event=None):
-            self.returning = self.b2_return
-            self.root.quit()
+    def Record(self, name, args=(), kwargs=None):
+        """Add a call to the recording.
 
-        # remove this function and the call to protocol
-        # then the close button will act normally
-        def close_mod(self):
-            pass
+        :param str name: name of the RobotPost method ('__init__' for the constructor)
+        :param list args: positional arguments
+        :param dict kwargs: keyword arguments
+        """
+        op = self._name_ids.get(name)
+        if op is None:
+            op = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = op
+        kwargs = kwargs or {}
+        self.ops.append(op)
+        self.ints.append(len(args))
+        self.ints.append(len(kwargs))
+        for value in args:
+            self._add(value)
+        for key in sorted(kwargs):
+            self.ints.append(self._string_id(key))
+            self._add(kwargs[key])
+
+    def Calls(self):
+        """Iterate over the calls of the recording. Each call is returned as (name, args, kwargs)."""
+        from itertools import islice
+        names = self.names
+        strings = self.strings
+        tags = iter(self.tags)
+        ints = iter(self.ints)
+        floats = iter(self.floats)
+        poses = iter(self.poses)
+
+        def value():
+            tag = next(tags)
+            if tag == _REC_FLOATS:
+                return list(islice(floats, next(ints)))
+            elif tag == _REC_POSE:
+                v = list(islice(poses, 12))
+                return Mat([v[0:4], v[4:8], v[8:12], [0.0, 0.0, 0.0, 1.0]])
+            elif tag == _REC_FLOAT:
+                return next(floats)
+            elif tag == _REC_INT:
+                return next(ints)
+            elif tag == _REC_STR:
+                return strings[next(ints)]
+            elif tag == _REC_NONE:
+                return None
+            elif tag == _REC_TRUE:
+                return True
+            elif tag == _REC_FALSE:
+                return False
+            elif tag == _REC_LIST:
+                return [value() for i in range(next(ints))]
+            elif tag == _REC_TUPLE:
+                return tuple([value() for i in range(next(ints))])
+            elif tag == _REC_DICT:
+                n = next(ints)
+                d = {}
+                for i in range(n):
+                    k = value()
+                    d[k] = value()
+                return d
+            elif tag == _REC_MAT:
+                nrows = next(ints)
+                ncols = next(ints)
+                return Mat([list(islice(floats, ncols)) for i in range(nrows)])
+            elif tag == _REC_BIGINT:
+                return int(strings[next(ints)])
+            raise Exception('Invalid post recording tag: %i' % tag)
+
+        for op in self.ops:
+            nargs = next(ints)
+            nkwargs = next(ints)
+            args = [value() for i in range(nargs)]
+            kwargs = {}
+            for i in range(nkwargs):
+                key = strings[next(ints)]
+                kwargs[key] = value()
+            yield names[op], args, kwargs
+
+    def Poses(self):
+        """Returns all the poses of the recording in the order they were recorded as an Nx3x4 NumPy array (or a list of :class:`.Mat` if NumPy is not available)"""
+        np = _numpy_or_none()
+        if np is None:
+            v = self.poses
+            return [Mat([list(v[i:i + 4]), list(v[i + 4:i + 8]), list(v[i + 8:i + 12]), [0.0, 0.0, 0.0, 1.0]]) for i in range(0, len(v), 12)]
+        return np.frombuffer(self.poses, dtype=np.float64).reshape(-1, 3, 4)
+
+    def Save(self, filename):
+        """Save the recording to a binary file (little endian).
+
+        .. seealso:: :func:`~robodk.LoadPostRecording`
+        """
+        import struct
+        texts = [(self.post or '')] + self.names + self.strings
+        texts = [t.encode('utf-8') for t in texts]
+        from array import array
+        lengths = array('i', [len(t) for t in texts])
+        with open(filename, 'wb') as fid:
+            fid.write(_POST_RECORDING_MAGIC)
+            fid.write(struct.pack('<7i', len(texts), len(self.names), len(self.ops), len(self.tags), len(self.ints), len(self.floats), len(self.poses)))
+            for column in [lengths, self.ops, self.tags, self.ints, self.floats, self.poses]:
+                if sys.byteorder == 'big':
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                if column is lengths:
+                    column.tofile(fid)
+                    fid.write(b''.join(texts))
+                else:
+                    column.tofile(fid)
+
+    def Load(self, filename):
+        """Load a recording saved with Save. Returns the recording.
+
+        .. seealso:: :func:`~robodk.LoadPostRecording`
+        """
+        import struct
+        from array import array
+        with open(filename, 'rb') as fid:
+            if fid.read(len(_POST_RECORDING_MAGIC)) != _POST_RECORDING_MAGIC:
+                raise Exception('Invalid post recording file: %s' % filename)
+            ntexts, nnames, nops, ntags, nints, nfloats, nposes = struct.unpack('<7i', fid.read(28))
+            columns = []
+            for typecode, n in [('i', ntexts), (None, 0), ('H', nops), ('B', ntags), ('i', nints), ('d', nfloats), ('d', nposes)]:
+                if typecode is None:
+                    blob = fid.read(sum(columns[0]))
+                    continue
+                column = array(typecode)
+                column.fromfile(fid, n)
+                if sys.byteorder == 'big':
+                    column.byteswap()
+                columns.append(column)
+
+        lengths, self.ops, self.tags, self.ints, self.floats, self.poses = columns
+        texts = []
+        i = 0
+        for n in lengths:
+            texts.append(blob[i:i + n].decode('utf-8'))
+            i += n
+        self.post = texts[0] or None
+        self.names = texts[1:1 + nnames]
+        self.strings = texts[1 + nnames:]
+        self._name_ids = dict([(name, i) for i, name in enumerate(self.names)])
+        self._string_ids = dict([(s, i) for i, s in enumerate(self.strings)])
+        return self
 
-        def time_out(self):
-            try:
-                x = self.entry.get()
-            except AttributeError:
-                self.returning = None
+
+def LoadPostRecording(filename):
+    """Load a post processor call recording saved with :func:`PostRecording.Save`"""
+    return PostRecording().Load(filename)
+
+
+class PostRecorder(object):
+    """PostRecorder is a drop-in replacement of RobotPost that records every call to a :class:`.PostRecording` instead of generating a program."""
+
+    def __init__(self, recording, *args, **kwargs):
+        self.__dict__['_recording'] = recording
+        recording.Record('__init__', args, kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        record = self._recording.Record
+
+        def call(*args, **kwargs):
+            record(name, args, kwargs)
+
+        # Cache the method so the next calls skip __getattr__
+        self.__dict__[name] = call
+        return call
+
+    def __setattr__(self, name, value):
+        self._recording.Record('__setattr__', (name, value))
+
+
+def RecordPostScript(script, filename=None, posts_dir=None):
+    """Run a program script generated by RoboDK (the Python file that drives a post processor) and record the calls to the post processor instead of generating the program.
+
+    :param str script: path of the program script
+    :param str filename: save the recording to this file (optional)
+    :param str posts_dir: folder of the post processors (default: folder of this module)
+    :return: :class:`.PostRecording`
+    """
+    import runpy
+    import types
+    if posts_dir is None:
+        posts_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(script, 'r') as fid:
+        post = _post_batch_module_name(fid.read(), posts_dir)
+    if post is None:
+        raise Exception('The post processor used by %s is unknown' % script)
+
+    # The script sees the names of the post processor module (Pose, etc.) with RobotPost replaced by a recorder
+    import importlib
+    if posts_dir not in sys.path:
+        sys.path.insert(0, posts_dir)
+    recording = PostRecording(post)
+    module = types.ModuleType(post)
+    try:
+        module.__dict__.update(importlib.import_module(post).__dict__)
+    except Exception:
+        # The post processor is not available here (for example, a compiled post for another Python version)
+        module.__dict__.update([(k, v) for k, v in globals().items() if not k.startswith('_')])
+
+    def RobotPost(*args, **kwargs):
+        return PostRecorder(recording, *args, **kwargs)
+
+    module.RobotPost = RobotPost
+    saved = sys.modules.get(post)
+    sys.modules[post] = module
+    try:
+        runpy.run_path(script, run_name='__main__')
+    finally:
+        if saved is None:
+            del sys.modules[post]
+        else:
+            sys.modules[post] = saved
+
+    if filename:
+        recording.Save(filename)
+    return recording
+
+
+def ReplayPost(recording, post=None, folder=None, send=False):
+    """Replay a post processor call recording with a post processor. Returns the RobotPost instance of the last program.
+
+    :param recording: :class:`.PostRecording` or file name of a recording
+    :param post: post processor to use: module name (for example, 'KUKA_KRC4_TG'), module or RobotPost class. By default, the post processor used to record the calls.
+    :param str folder: save the programs to this folder without asking the user or displaying the result (optional)
+    :param bool send: replay the calls to ProgSendRobot (skipped by default)
+
+    .. code-block:: python
+
+        recording = RecordPostScript('Prog1.py', 'Prog1.rdkrec')
+        ReplayPost(recording, 'KUKA_KRC4_TG', 'programs/kuka')
+        ReplayPost(recording, 'CSV', 'programs/csv')
+    """
+    if not isinstance(recording, PostRecording):
+        recording = LoadPostRecording(recording)
+    post = post or recording.post
+    if isinstance(post, str):
+        import importlib
+        post = importlib.import_module(post)
+    post_class = getattr(post, 'RobotPost', post)
+
+    instance = None
+    methods = {}
+    for name, args, kwargs in recording.Calls():
+        if name == '__init__':
+            instance = post_class(*args, **kwargs)
+            methods = {}
+            continue
+        elif name == '__setattr__':
+            setattr(instance, *args)
+            continue
+        elif name == 'ProgSendRobot' and not send:
+            continue
+        elif name == 'ProgSave' and folder is not None:
+            args = [folder] + list(args[1:2]) + [False, False]
+            kwargs.pop('ask_user', None)
+            kwargs.pop('show_result', None)
+
+        method = methods.get(name)
+        if method is None:
+            method = getattr(instance, name)
+            methods[name] = method
+        method(*args, **kwargs)
+
+    return instance
+
+
+def PostRecordMain(argv=None):
+    """Command line entry point of RecordPostScript. It saves one recording (.rdkrec) per program script. Returns 1 if any script failed (0 otherwise).
+
+    python robodk.py postrecord [-h] [--output OUTPUT] scripts [scripts ...]
+    """
+    import argparse
+    import traceback
+    parser = argparse.ArgumentParser(prog='robodk.py postrecord', description='Record the post processor calls of RoboDK program scripts')
+    parser.add_argument('scripts', nargs='+', help='program scripts generated by RoboDK')
+    parser.add_argument('--output', default=None, help='folder to save the recordings (default: next to each script)')
+    args = parser.parse_args(argv)
+
+    if args.output and not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    nfailed = 0
+    for script in args.scripts:
+        name = os.path.splitext(os.path.basename(script))[0]
+        filename = os.path.join(args.output or os.path.dirname(os.path.abspath(script)), name + POST_RECORDING_EXT)
+        t0 = time.time()
+        try:
+            recording = RecordPostScript(script, filename)
+            print('%-40s %8i calls %8.3f s  %s' % (name, len(recording), time.time() - t0, filename))
+        except Exception:
+            nfailed += 1
+            print('%-40s FAILED' % name)
+            print(traceback.format_exc())
+    return 1 if nfailed > 0 else 0
+
+
+#------------------------------------------------------
+#--------       TKinter dependencies    ---------------
+# tkinter is imported on first use (see _tkinter_import)
+_tkinter_modules = None
+
+
+def _tkinter_import():
+    """Returns the tkinter, filedialog and messagebox modules. They are imported the first time a dialog is shown."""
+    global _tkinter_modules
+    if _tkinter_modules is None:
+        t_start = time.time()
+        try:
+            if sys.version_info[0] < 3:
+                # Python 2.X only:
+                import Tkinter as tkinter
+                import tkFileDialog as filedialog
+                import tkMessageBox as messagebox
             else:
+                # Python 3.x only
+                import tkinter
+                from tkinter import filedialog
+                from tkinter import messagebox
+        except ImportError:
+            raise Exception('tkinter is not available: dialogs and message boxes can not be displayed')
+        _tkinter_modules = (tkinter, filedialog, messagebox)
+        POST_IMPORT_METRICS['tkinter'] = time.time() - t_start
+    return _tkinter_modules
+
+
+class _TkinterModule(object):
+    """Placeholder of the tkinter, filedialog or messagebox module: the module is imported on first use (see _tkinter_import)"""
+
+    def __init__(self, index, name):
+        self._index = index
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(_tkinter_import()[self._index], attr)
+
+    def __repr__(self):
+        return "<deferred module '%s'>" % self._name
+
+
+# Same names as when tkinter was imported with robodk (available with: from robodk import *)
+tkinter = _TkinterModule(0, 'tkinter')
+filedialog = _TkinterModule(1, 'filedialog')
+messagebox = _TkinterModule(2, 'messagebox')
+
+
+def getOpenFile(path_preference="C:/RoboDK/Library/", strfile='', strtitle='Open file ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
+    """Pop up a file dialog window to select a file to open. Returns a file object opened in read-only mode. Use returned value.name to retrieve the file path."""
+    tkinter, filedialog, _ = _tkinter_import()
+    options = {}
+    options['initialdir'] = path_preference
+    options['title'] = strtitle
+    options['defaultextension'] = defaultextension  #'.txt'
+    options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
+    options['initialfile'] = strfile
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    file_path = filedialog.askopenfilename(**options)
+    # same as: file_path = tkinter.filedialog.askopenfilename()
+    return file_path
+
+
+def getSaveFile(path_preference="C:/RoboDK/Library/", strfile='file.txt', strtitle='Save file as ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
+    """Pop up a file dialog window to select a file to save. Returns a file object opened in write-only mode. Use returned value.name to retrieve the file path."""
+    tkinter, filedialog, _ = _tkinter_import()
+    options = {}
+    options['initialdir'] = path_preference
+    options['title'] = strtitle
+    options['defaultextension'] = defaultextension  #'.txt'
+    options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
+    options['initialfile'] = strfile
+    #options['parent'] = root
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    file_path = filedialog.asksaveasfile(**options)
+    #same as: file_path = tkinter.filedialog.asksaveasfile(**options)
+    return file_path
+
+
+def getOpenFileName(path_preference="C:/RoboDK/Library/", strfile='', strtitle='Open file ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
+    """Pop up a file dialog window to select a file to open. Returns the file path as a string."""
+    tkinter, filedialog, _ = _tkinter_import()
+    options = {}
+    options['initialdir'] = path_preference
+    options['title'] = strtitle
+    options['defaultextension'] = defaultextension  #'.txt'
+    options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
+    options['initialfile'] = strfile
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    file_path = filedialog.askopenfilename(**options)
+    # same as: file_path = tkinter.filedialog.askopenfilename()
+    return file_path
+
+
+def getSaveFileName(path_preference="C:/RoboDK/Library/", strfile='file.txt', strtitle='Save file as ...', defaultextension='.txt', filetypes=[('All files', '.*'), ('Text files', '.txt')]):
+    """Pop up a file dialog window to select a file to save. Returns the file path as a string."""
+    tkinter, filedialog, _ = _tkinter_import()
+    options = {}
+    options['initialdir'] = path_preference
+    options['title'] = strtitle
+    options['defaultextension'] = defaultextension  #'.txt'
+    options['filetypes'] = filetypes  # [('all files', '.*'), ('text files', '.txt')]
+    options['initialfile'] = strfile
+    #options['parent'] = root
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    file_path = filedialog.asksaveasfilename(**options)
+    #same as: file_path = tkinter.filedialog.asksaveasfile(**options)
+    return file_path
+
+
+def getSaveFolder(path_programs='/', popup_msg='Select a directory to save your program'):
+    """Ask the user to select a folder to save a program or other file. Returns the path of the folder as a string."""
+    tkinter, filedialog, _ = _tkinter_import()
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    dirname = filedialog.askdirectory(initialdir=path_programs, title=popup_msg)
+    if len(dirname) < 1:
+        dirname = None
+
+    return dirname
+
+
+def getOpenFolder(path_preference="C:/RoboDK/Library/", strtitle='Open folder ...'):
+    """Pop up a folder dialog window to select a folder to open. Returns the path of the folder as a string."""
+    tkinter, filedialog, _ = _tkinter_import()
+    options = {}
+    options['title'] = strtitle
+    options['initialdir'] = path_preference
+    root = tkinter.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    file_path = filedialog.askdirectory(**options)
+    return file_path
+
+
+def ShowMessage(msg, title=None):
+    """Show a blocking message"""
+    tkinter, _, messagebox = _tkinter_import()
+    print(msg)
+    if title is None:
+        title = msg
+
+    root = tkinter.Tk()
+    root.overrideredirect(1)
+    root.withdraw()
+    root.attributes("-topmost", True)
+    result = messagebox.showinfo(title, msg)  #, icon='warning')#, parent=texto)
+    root.destroy()
+    return result
+
+
+def ShowMessageYesNo(msg, title=None):
+    """Show a blocking message and let the user answer Yes or No"""
+    tkinter, _, messagebox = _tkinter_import()
+    print(msg)
+    if title is None:
+        title = msg
+
+    root = tkinter.Tk()
+    root.overrideredirect(1)
+    root.withdraw()
+    root.attributes("-topmost", True)
+    result = messagebox.askyesno(title, msg)  #, icon='warning')#, parent=texto)
+    root.destroy()
+    return result
+
+
+def ShowMessageYesNoCancel(msg, title=None):
+    """Show a blocking message and let the user answer Yes, No or Cancel"""
+    tkinter, _, messagebox = _tkinter_import()
+    print(msg)
+    if title is None:
+        title = msg
+
+    root = tkinter.Tk()
+    root.overrideredirect(1)
+    root.withdraw()
+    root.attributes("-topmost", True)
+    result = messagebox.askyesnocancel(title, msg)  #, icon='warning')#, parent=texto)
+    root.destroy()
+    return result
+
+
+class MessageBox(object):
+    def __init__(self, msg, b1, b2, frame, t, entry):
+        tkinter = _tkinter_import()[0]
+
+        root = self.root = tkinter.Tk()
+        root.title('Input')
+        self.msg = str(msg)
+        # ctrl+c to copy self.msg
+        root.bind('<Control-c>', func=self.to_clip)
+        # remove the outer frame if frame=False
+        if not frame: root.overrideredirect(True)
+        # default values for the buttons to return
+        self.b1_return = True
+        self.b2_return = False
+        # if b1 or b2 is a tuple unpack into the button text & return value
+        if isinstance(b1, tuple): b1, self.b1_return = b1
+        if isinstance(b2, tuple): b2, self.b2_return = b2
+        # main frame
+        frm_1 = tkinter.Frame(root)
+        frm_1.pack(ipadx=2, ipady=2)
+        # the message
+        message = tkinter.Label(frm_1, text=self.msg)
+        message.pack(padx=8, pady=8)
+        # if entry=True create and set focus
+        if entry is not None:
+            if entry == True:
+                entry = ''
+            self.entry = tkinter.Entry(frm_1)
+            self.entry.pack()
+            self.entry.insert(0, entry)
+            self.entry.focus_set()
+        # button frame
+        frm_2 = tkinter.Frame(frm_1)
+        frm_2.pack(padx=4, pady=4)
+        # buttons
+        btn_1 = tkinter.Button(frm_2, width=8, text=b1)
+        btn_1['command'] = self.b1_action
+        btn_1.pack(side='left')
+        if not entry: btn_1.focus_set()
+        btn_2 = tkinter.Button(frm_2, width=8, text=b2)
+        btn_2['command'] = self.b2_action
+        btn_2.pack(side='left')
+        # the enter button will trigger the focused button's action
+        btn_1.bind('<KeyPress-Return>', func=self.b1_action)
+        btn_2.bind('<KeyPress-Return>', func=self.b2_action)
+        # roughly center the box on screen
+        # for accuracy see: http://stackoverflow.com/a/10018670/1217270
+        root.update_idletasks()
+        xp = (root.winfo_screenwidth() // 2) - (root.winfo_width() // 2)
+        yp = (root.winfo_screenheight() // 2) - (root.winfo_height() // 2)
+        geom = (root.winfo_width(), root.winfo_height(), xp, yp)
+        root.geometry('{0}x{1}+{2}+{3}'.format(*geom))
+        # call self.close_mod when the close button is pressed
+        root.protocol("WM_DELETE_WINDOW", self.close_mod)
+        # a trick to activate the window (on windows 7)
+        #root.deiconify()
+        # if t is specified: call time_out after t seconds
+        if t: root.after(int(t * 1000), func=self.time_out)
+
+    def b1_action(self, event=None):
+        try:
+            x = self.entry.get()
+        except AttributeError:
+            self.returning = self.b1_return
+            self.root.quit()
+        else:
+            if x:
                 self.returning = x
-            finally:
                 self.root.quit()
 
-        def to_clip(self, event=None):
-            self.root.clipboard_clear()
-            self.root.clipboard_append(self.msg)
-
-    def mbox(msg, b1='OK', b2='Cancel', frame=True, t=False, entry=None):
-        """Create an instance of MessageBox, and get data back from the user.
-
-        :param msg: string to be displayed
-        :type msg: str
-        :param b1: left button text, or a tuple (<text for button>, <to return on press>)
-        :type b1: str, tuple
-        :param b2: right button text, or a tuple (<text for button>, <to return on press>)
-        :type b2: str, tuple
-        :param frame: include a standard outerframe: True or False
-        :type frame: bool
-        :param t: time in seconds (int or float) until the msgbox automatically closes
-        :type t: int, float
-        :param entry: include an entry widget that will provide its contents returned. Provide text to fill the box
-        :type entry: None, bool, str
+    def b2_action(self, event=None):
+        self.returning = self.b2_return
+        self.root.quit()
 
-        Example:
+    # remove this function and the call to protocol
+    # then the close button will act normally
+    def close_mod(self):
+        pass
 
-            .. code-block:: python
+    def time_out(self):
+        try:
+            x = self.entry.get()
+        except AttributeError:
+            self.returning = None
+        else:
+            self.returning = x
+        finally:
+            self.root.quit()
 
-                name = mbox('Enter your name', entry=True)
-                name = mbox('Enter your name', entry='default')
-                if name:
-                    print("Value: " + name)
+    def to_clip(self, event=None):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(self.msg)
 
-                value = mbox('Male or female?', ('male', 'm'), ('female', 'f'))
-                mbox('Process done')
 
-        """
-        msgbox = MessageBox(msg, b1, b2, frame, t, entry)
+def mbox(msg, b1='OK', b2='Cancel', frame=True, t=False, entry=None):
+    """Create an instance of MessageBox, and get data back from the user.
 
-        try:
-            from robolink import getPathIcon
-            iconpath = getPathIcon()
-            msgbox.root.iconbitmap(iconpath)
-        except:
-            print("RoboDK's Robolink module not found")
-
-        msgbox.root.attributes("-topmost", True)
-        msgbox.root.mainloop()
-        # the function pauses here until the mainloop is quit
-        msgbox.root.destroy()
-        return msgbox.returning
+    :param msg: string to be displayed
+    :type msg: str
+    :param b1: left button text, or a tuple (<text for button>, <to return on press>)
+    :type b1: str, tuple
+    :param b2: right button text, or a tuple (<text for button>, <to return on press>)
+    :type b2: str, tuple
+    :param frame: include a standard outerframe: True or False
+    :type frame: bool
+    :param t: time in seconds (int or float) until the msgbox automatically closes
+    :type t: int, float
+    :param entry: include an entry widget that will provide its contents returned. Provide text to fill the box
+    :type entry: None, bool, str
+
+    Example:
+
+        .. code-block:: python
+
+            name = mbox('Enter your name', entry=True)
+            name = mbox('Enter your name', entry='default')
+            if name:
+                print("Value: " + name)
+
+            value = mbox('Male or female?', ('male', 'm'), ('female', 'f'))
+            mbox('Process done')
+
+    """
+    msgbox = MessageBox(msg, b1, b2, frame, t, entry)
+
+    try:
+        from robolink import getPathIcon
+        iconpath = getPathIcon()
+        msgbox.root.iconbitmap(iconpath)
+    except:
+        print("RoboDK's Robolink module not found")
+
+    msgbox.root.attributes("-topmost", True)
+    msgbox.root.mainloop()
+    # the function pauses here until the mainloop is quit
+    msgbox.root.destroy()
+    return msgbox.returning
+
+
+# Time to import the robodk module (see PostImportMetrics)
+POST_IMPORT_METRICS['robodk'] = time.time() - _ROBODK_IMPORT_START
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ('postbatch', 'postrecord'):
+        # Use the robodk module imported by the post processors (Mat must be the same class)
+        import robodk
+        main = robodk.PostProcessBatchMain if sys.argv[1] == 'postbatch' else robodk.PostRecordMain
+        sys.exit(main(sys.argv[2:]))
+
+    def BenchmarkMat(iterations=20000):
+        """Compare the list and NumPy Mat backends and the Pose4 type on pose products, inverses and conversions"""
+        xyzabc = [[i * 0.1, 200 - i * 0.05, 300 + i * 0.02, i * 0.01, 10 - i * 0.002, 20 + i * 0.003] for i in range(100)]
+        for backend in [MAT_BACKEND_LIST, MAT_BACKEND_NUMPY, 'pose4']:
+            if backend == 'pose4':
+                poses = [KUKA_2_Pose(v) for v in xyzabc]
+            elif setMatBackend(backend) != backend:
+                print("Mat backend %s not available" % backend)
+                continue
+            else:
+                poses = [Mat(KUKA_2_Pose(v).Rows()) for v in xyzabc]
+
+            nposes = len(poses)
+            tic()
+            for i in range(iterations):
+                poses[i % nposes] * poses[(i + 1) % nposes]
+            t_mul = toc()
+
+            tic()
+            for i in range(iterations):
+                poses[i % nposes].invH()
+            t_inv = toc()
+
+            tic()
+            for i in range(iterations):
+                Pose_2_KUKA(poses[i % nposes])
+            t_conv = toc()
+
+            print("Mat backend %-6s: multiply %.2f us, invert %.2f us, Pose_2_KUKA %.2f us" % (backend, t_mul * 1e6 / iterations, t_inv * 1e6 / iterations, t_conv * 1e6 / iterations))
+
+        setMatBackend(MAT_BACKEND_LIST)
+
+    BenchmarkMat()
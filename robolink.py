@@ -39,6 +39,7 @@ import sys  # Only used to detect python version using sys.version_info
 import os
 import time
 import threading
+import collections
 
 # Tree item types
 ITEM_TYPE_STATION = 1
@@ -604,6 +605,480 @@ def EmbedWindow(window_name, docked_name=None, size_w=-1, size_h=-1, pid=0, area
     t.start()
 
 
+#------------------------------------------------------------
+# Binary codec: RoboDK exchanges big endian doubles and integers. Whole payloads are packed and unpacked with one struct (or NumPy) call.
+def _pack_doubles(values):
+    """Packs a list (or NumPy array) of floats as big endian doubles"""
+    if hasattr(values, 'dtype'):
+        import numpy as np
+        return np.ascontiguousarray(values, dtype='>f8').tobytes()
+    return struct.pack('>%id' % len(values), *values)
+
+
+def _cols_2_pose(values):
+    """Returns a pose given its 16 values in column major order (the order used by RoboDK)"""
+    if values[3] == 0 and values[7] == 0 and values[11] == 0 and values[15] == 1:
+        return robodk._pose4(values[0], values[4], values[8], values[12], values[1], values[5], values[9], values[13], values[2], values[6], values[10], values[14])
+    return robodk.Mat([list(values[i::4]) for i in range(4)])
+
+
+def _item_ptr(item):
+    """Returns the pointer of an item (Item or int)"""
+    if item is None:
+        return 0
+    return item.item if hasattr(item, 'item') else int(item)
+
+
+def _buffer_values(values):
+    """Returns the doubles of a flat buffer (array.array, memoryview or a list) as a list"""
+    if isinstance(values, memoryview):
+        if values.format != 'd' or values.ndim != 1:
+            values = values.cast('B').cast('d')
+        return values.tolist()
+    return list(values)
+
+
+def _pack_items_poses(items, poses):
+    """Packs the items and poses of S_Hlocals and S_Hlocal_AbsS as [item, pose (16 doubles, column major)] for each item.
+    poses can be a list of poses, an Nx4x4 array or a buffer of N*16 doubles in row major order (NumPy array, array.array or memoryview)."""
+    nitems = len(items)
+    ptrs = [_item_ptr(item) for item in items]
+    np = robodk._numpy_or_none()
+    if np is None:
+        if isinstance(poses, (list, tuple)) and nitems > 0 and isinstance(poses[0], robodk.Mat):
+            cols_list = [pose.Cols() for pose in poses]
+            values = [value for cols in cols_list for value in cols[0] + cols[1] + cols[2] + cols[3]]
+        else:
+            rows = _buffer_values(poses)
+            values = [rows[16 * i + 4 * r + c] for i in range(nitems) for c in range(4) for r in range(4)]
+        if len(values) != 16 * nitems:
+            raise Exception('The number of items must match the number of poses')
+        return b''.join([struct.pack('>Q16d', ptrs[i], *values[16 * i:16 * i + 16]) for i in range(nitems)])
+
+    if isinstance(poses, (list, tuple)):
+        arr = np.zeros((len(poses), 4, 4))
+        arr[:, 0:3, :] = robodk._poses_2_array(np, poses)
+        arr[:, 3, 3] = 1.0
+    else:
+        arr = np.asarray(poses, dtype=np.float64)
+    if arr.size != 16 * nitems:
+        raise Exception('The number of items must match the number of poses')
+    packed = np.empty(nitems, dtype=[('item', '>u8'), ('pose', '>f8', (16, ))])
+    packed['item'] = ptrs
+    packed['pose'] = arr.reshape(nitems, 4, 4).transpose(0, 2, 1).reshape(nitems, 16)
+    return packed.tobytes()
+
+
+def _pack_items_joints(items, joints_list):
+    """Packs the items and joints of S_ThetasList as [item, ndof (int), joints (ndof doubles)] for each item.
+    joints_list can be a list of joints (lists or Mat), an NxDOF array or a buffer of N*DOF doubles (NumPy array, array.array or memoryview)."""
+    nitems = len(items)
+    ptrs = [_item_ptr(item) for item in items]
+    np = robodk._numpy_or_none()
+    if isinstance(joints_list, (list, tuple)):
+        joints_list = [joints if isinstance(joints, list) or hasattr(joints, 'dtype') else joints.tolist() for joints in joints_list]
+        if np is None or nitems == 0 or len(set([len(joints) for joints in joints_list])) > 1:
+            # Robots with a different number of axes
+            return b''.join([struct.pack('>Qi', ptrs[i], len(joints_list[i])) + _pack_doubles(joints_list[i]) for i in range(nitems)])
+
+    if np is None:
+        values = _buffer_values(joints_list)
+        ndof = len(values) // nitems if nitems > 0 else 0
+        return b''.join([struct.pack('>Qi', ptrs[i], ndof) + _pack_doubles(values[ndof * i:ndof * (i + 1)]) for i in range(nitems)])
+
+    arr = np.asarray(joints_list, dtype=np.float64)
+    if nitems == 0:
+        return b''
+    arr = arr.reshape(nitems, -1)
+    ndof = arr.shape[1]
+    packed = np.empty(nitems, dtype=[('item', '>u8'), ('ndof', '>i4'), ('joints', '>f8', (ndof, ))])
+    packed['item'] = ptrs
+    packed['ndof'] = ndof
+    packed['joints'] = arr
+    return packed.tobytes()
+
+
+class _SocketReader(object):
+    """Read-ahead buffer for the RoboDK socket. The socket is read in large chunks and lines and fixed size fields are served from the buffer.
+    A read always returns the number of bytes requested, even if the socket returns the data in several pieces."""
+    CHUNK_SIZE = 65536
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.pos = 0
+
+    def _fill(self, nbytes):
+        """Reads from the socket until at least nbytes are available in the buffer"""
+        if self.pos > 0:
+            del self.buffer[:self.pos]
+            self.pos = 0
+        while len(self.buffer) < nbytes:
+            data = self.sock.recv(max(self.CHUNK_SIZE, nbytes - len(self.buffer)))
+            if not data:
+                raise Exception('Connection closed by RoboDK')
+            self.buffer += data
+
+    def read(self, nbytes):
+        """Returns exactly nbytes as a bytearray"""
+        available = len(self.buffer) - self.pos
+        if available >= nbytes:
+            data = self.buffer[self.pos:self.pos + nbytes]
+            self.pos += nbytes
+            return data
+
+        if nbytes - available <= self.CHUNK_SIZE:
+            self._fill(nbytes)
+            data = self.buffer[0:nbytes]
+            self.pos = nbytes
+            return data
+
+        # Large payloads are received directly into the result
+        data = bytearray(nbytes)
+        data[0:available] = self.buffer[self.pos:]
+        del self.buffer[:]
+        self.pos = 0
+        view = memoryview(data)
+        received = available
+        while received < nbytes:
+            nrec = self.sock.recv_into(view[received:], nbytes - received)
+            if nrec == 0:
+                raise Exception('Connection closed by RoboDK')
+            received += nrec
+        return data
+
+    def read_line(self):
+        """Returns the bytes up to the next LF (\\n), the LF is consumed but not returned"""
+        start = self.pos
+        while True:
+            idx = self.buffer.find(b'\n', start)
+            if idx >= 0:
+                line = bytes(self.buffer[self.pos:idx])
+                self.pos = idx + 1
+                return line
+            start = len(self.buffer) - self.pos
+            self._fill(start + 1)
+
+
+def _batch_output(rows, status, ncols):
+    """Returns the result of a batch calculation as a [float64 Nxncols array, int array] pair, or as lists if NumPy is not available"""
+    try:
+        import numpy as np
+    except ImportError:
+        return rows, status
+    return np.array(rows, dtype=np.float64).reshape(len(rows), ncols), np.array(status, dtype=np.int32)
+
+
+class ProgramJointList(object):
+    """Joint list of a program returned by :func:`~robolink.Item.InstructionListJoints_Array`. The data is a float64 NumPy array (or a memory map of a .npy file) with one row per step:
+    [J1, J2, ..., Jn, ERROR, MM_STEP, DEG_STEP, MOVE_ID, TIME, X, Y, Z, SPEED_J1, ..., SPEED_Jn, ACCEL_J1, ..., ACCEL_Jn]
+    The TIME, XYZ, speed and acceleration columns are only available if they were requested with the flags. The column properties are views: they do not copy the data.
+
+    :param data: NxM float64 array (one row per step)
+    :param int flags: flags used to calculate the joint list
+    :param int ndof: number of robot axes (default=None: it is deduced from the number of columns and the flags)
+    """
+    def __init__(self, data, flags=0, ndof=None):
+        self.data = data
+        self.flags = int(flags)
+        ncols = data.shape[1]
+        if ndof is None:
+            if self.flags <= 0:
+                ndof = ncols - 4
+            else:
+                ndof = (ncols - 8) // [1, 1, 2, 3, 3][min(self.flags, 4)]
+        self.ndof = ndof
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __iter__(self):
+        return self.iter_rows()
+
+    def _cols(self, start, count):
+        if start + count > self.data.shape[1]:
+            raise Exception('The joint list does not include these columns. Calculate the joint list with the corresponding flags.')
+        return self.data[:, start:start + count]
+
+    @property
+    def joints(self):
+        """NxNDOF view of the joint values"""
+        return self._cols(0, self.ndof)
+
+    @property
+    def error(self):
+        """Error flags (see PathErrorFlags)"""
+        return self._cols(self.ndof, 1)[:, 0]
+
+    @property
+    def mm_step(self):
+        return self._cols(self.ndof + 1, 1)[:, 0]
+
+    @property
+    def deg_step(self):
+        return self._cols(self.ndof + 2, 1)[:, 0]
+
+    @property
+    def move_id(self):
+        return self._cols(self.ndof + 3, 1)[:, 0]
+
+    @property
+    def time(self):
+        """Time stamp of each step (flags >= 1)"""
+        return self._cols(self.ndof + 4, 1)[:, 0]
+
+    @property
+    def xyz(self):
+        """Nx3 view of the TCP position (flags >= 1)"""
+        return self._cols(self.ndof + 5, 3)
+
+    @property
+    def speeds(self):
+        """NxNDOF view of the joint speeds (flags >= 2)"""
+        return self._cols(self.ndof + 8, self.ndof)
+
+    @property
+    def accelerations(self):
+        """NxNDOF view of the joint accelerations (flags >= 3)"""
+        return self._cols(2 * self.ndof + 8, self.ndof)
+
+    def iter_rows(self, chunk_size=4096):
+        """Generator of the rows of the joint list. A memory mapped file is read chunk_size rows at a time."""
+        import numpy as np
+        nrows = self.data.shape[0]
+        for start in range(0, nrows, chunk_size):
+            block = np.array(self.data[start:start + chunk_size])
+            for row in block:
+                yield row
+
+
+def _request_of(function):
+    """Returns the request form of a bound API function, such as item.Pose (see Robolink._call), or None if it has none"""
+    owner = getattr(function, '__self__', None)
+    if not isinstance(owner, (Robolink, Item)):
+        return None
+    return getattr(owner, '_request_' + function.__name__, None)
+
+
+class BatchFuture(object):
+    """Result of a command queued in a :class:`.RobolinkBatch`. The result is available once the batch is sent.
+
+    .. seealso:: :func:`~robolink.Robolink.batch`
+    """
+    def __init__(self):
+        self._done = False
+        self._result = None
+        self._exception = None
+
+    def _set_result(self, result):
+        self._result = result
+        self._done = True
+
+    def _set_exception(self, exception):
+        self._exception = exception
+        self._done = True
+
+    def done(self):
+        """Returns True if the command was executed"""
+        return self._done
+
+    def exception(self):
+        """Returns the exception raised by the command (None if it succeeded)"""
+        return self._exception
+
+    def result(self):
+        """Returns the value returned by the command. It raises the same exception the command would have raised if it was called directly."""
+        if not self._done:
+            raise Exception('The batch has not been sent yet')
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+class RobolinkBatch(object):
+    """Queue of API calls that are sent to RoboDK together. Use :func:`~robolink.Robolink.batch` to create a batch.
+    The requests of the queued calls are written to the socket together and the replies are read in order afterwards, so the round trip latency is paid once per batch instead of once per call.
+    Each call keeps its own status check: if a call fails, its future raises the error and the following calls are still executed.
+
+    These functions are pipelined: Robolink.Item and the Item functions Name, setName, Type, Parent, Pose, setPose, PoseAbs, setPoseAbs, Joints, setJoints, SolveFK, SolveIK and Busy.
+    Other functions are executed directly, in order, once the replies of the previous calls are read. Each call is executed once.
+    The requests are sent in groups of WINDOW calls, so the replies waiting to be read never fill the socket buffers.
+
+    .. seealso:: :class:`.BatchFuture`
+    """
+    WINDOW = 256
+
+    def __init__(self, link):
+        self.link = link
+        self._calls = []
+
+    def add(self, function, *args, **kwargs):
+        """Queue a call to an API function, such as add(item.Pose) or add(robot.setJoints, [0,0,0,0,0,0]). Returns a :class:`.BatchFuture`."""
+        future = BatchFuture()
+        self._calls.append((function, args, kwargs, future))
+        return future
+
+    def flush(self):
+        """Send the queued calls and read all the replies"""
+        calls = self._calls
+        self._calls = []
+        if calls:
+            self.link._run_batch(calls)
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+
+class _TracingSocket(object):
+    """Socket wrapper that counts the bytes sent and received (installed by Robolink.setTracer)"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.sent = 0
+        self.received = 0
+
+    def send(self, data):
+        nbytes = self.sock.send(data)
+        self.sent += nbytes
+        return nbytes
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+        self.sent += len(data)
+
+    def recv(self, nbytes):
+        data = self.sock.recv(nbytes)
+        self.received += len(data)
+        return data
+
+    def recv_into(self, buffer, nbytes=0):
+        nrec = self.sock.recv_into(buffer, nbytes)
+        self.received += nrec
+        return nrec
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class RobolinkTracer(object):
+    """Records the API calls made through one or more :class:`.Robolink` objects: command name, bytes sent, bytes received and wall time of each call.
+    The last size calls are kept in a ring buffer (records). Use :func:`~robolink.Robolink.setTracer` to start tracing a link.
+
+    Each record is a list: [command, start time (s), end time (s), bytes sent, bytes received, thread id]. A call starts when its command is sent and ends when its last status is received.
+
+    :param int size: number of calls to keep
+
+    .. code-block:: python
+
+        tracer = RobolinkTracer()
+        RDK.setTracer(tracer)
+        ...
+        print(tracer.Summary())
+        tracer.SaveChromeTrace('robolink_trace.json')  # open with chrome://tracing or https://ui.perfetto.dev
+
+    .. seealso:: :func:`~robolink.Robolink.setTracer`
+    """
+    # Upper limits of the latency histogram bins, in ms
+    HISTOGRAM_BINS_MS = [0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+    def __init__(self, size=100000):
+        self.records = collections.deque(maxlen=size)
+        self._open = {}
+        self._clock = getattr(time, 'perf_counter', time.time)
+
+    def clear(self):
+        """Removes all the records"""
+        self.records.clear()
+        self._open.clear()
+
+    def _on_line(self, link, line):
+        """A line is sent: it is a new command unless the previous call is still waiting for its status"""
+        key = id(link)
+        state = self._open.get(key)
+        if state is not None and not state[1]:
+            return
+        sock = link._TRACE_SOCK
+        now = self._clock()
+        record = [line, now, now, 0, 0, threading.current_thread().ident]
+        self._open[key] = [record, False, sock, sock.sent if sock else 0, sock.received if sock else 0]
+
+    def _on_status(self, link):
+        """A status is received: the call ends (calls that wait for a second status, such as blocking moves, are extended)"""
+        state = self._open.get(id(link))
+        if state is None:
+            return
+        record, done, sock, sent0, received0 = state
+        record[2] = self._clock()
+        if sock is not None:
+            record[3] = sock.sent - sent0
+            record[4] = sock.received - received0
+        if not done:
+            state[1] = True
+            self.records.append(record)
+
+    def Histograms(self, bins_ms=None):
+        """Returns the latency histogram of each command of the records as a dictionary: {command: {'count', 'total_ms', 'min_ms', 'max_ms', 'p50_ms', 'p99_ms', 'bins': [(upper limit in ms, count), ...]}}"""
+        if bins_ms is None:
+            bins_ms = self.HISTOGRAM_BINS_MS
+        latencies = {}
+        for record in list(self.records):
+            latencies.setdefault(record[0], []).append((record[2] - record[1]) * 1000.0)
+
+        import bisect
+        histograms = {}
+        for command, values in latencies.items():
+            values.sort()
+            counts = [0] * (len(bins_ms) + 1)
+            for value in values:
+                counts[bisect.bisect_left(bins_ms, value)] += 1
+            n = len(values)
+            histograms[command] = {
+                'count': n,
+                'total_ms': sum(values),
+                'min_ms': values[0],
+                'max_ms': values[-1],
+                'p50_ms': values[int(0.50 * (n - 1))],
+                'p99_ms': values[int(0.99 * (n - 1))],
+                'bins': list(zip(list(bins_ms) + [float('inf')], counts)),
+            }
+        return histograms
+
+    def Summary(self):
+        """Returns a table with the number of calls, the latency and the bytes exchanged per command, sorted by total time"""
+        traffic = {}
+        for record in list(self.records):
+            sent, received = traffic.get(record[0], (0, 0))
+            traffic[record[0]] = (sent + record[3], received + record[4])
+        histograms = self.Histograms()
+        lines = ['%-24s %8s %10s %9s %9s %9s %12s %12s' % ('Command', 'Calls', 'Total ms', 'p50 ms', 'p99 ms', 'Max ms', 'Sent', 'Received')]
+        for command in sorted(histograms, key=lambda c: -histograms[c]['total_ms']):
+            h = histograms[command]
+            sent, received = traffic[command]
+            lines.append('%-24s %8i %10.2f %9.3f %9.3f %9.3f %12i %12i' % (command[:24], h['count'], h['total_ms'], h['p50_ms'], h['p99_ms'], h['max_ms'], sent, received))
+        return '\n'.join(lines)
+
+    def ChromeTrace(self):
+        """Returns the records in the Chrome trace event format (a dictionary that can be saved as JSON)"""
+        pid = os.getpid()
+        events = []
+        for command, start, end, sent, received, tid in list(self.records):
+            events.append({'name': command, 'cat': 'robolink', 'ph': 'X', 'ts': start * 1e6, 'dur': (end - start) * 1e6, 'pid': pid, 'tid': tid, 'args': {'sent': sent, 'received': received}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def SaveChromeTrace(self, filename):
+        """Saves the records as a Chrome trace JSON file (open it with chrome://tracing or https://ui.perfetto.dev)"""
+        import json
+        with open(filename, 'w') as fid:
+            json.dump(self.ChromeTrace(), fid)
+
+
 class Robolink:
     """The Robolink class is the link to to RoboDK and allows creating macros for Robodk, simulate applications and generate programs offline.
     Any interaction is made through \"items\" (Item() objects). An item is an object in the
@@ -699,7 +1174,8 @@ class Robolink:
 
     DEBUG = False  # Debug output through console
     COM = None  # tcpip com
-    _lock = threading.Lock()
+    _READER = None  # read-ahead buffer of COM (see _reader)
+    _lock = threading.RLock()  # fallback only: each Robolink object uses its own lock (see __init__)
     ARGUMENTS = []  # Command line arguments to RoboDK, such as /NOSPLASH /NOSHOW to not display RoboDK. It has no effect if RoboDK is already running.
     CLOSE_STD_OUT = False  # Close standard output for roboDK (RoboDK console output will no longer be visible)
     PORT = -1  # current port
@@ -708,6 +1184,17 @@ class Robolink:
     # Remember last status message
     LAST_STATUS_MESSAGE = ''
 
+    # Client side cache of item handles (by name) and item metadata (type, name and parent). It is disabled by default (see setCache)
+    # The cache and the hit and miss counters are set for each object in __init__ (the class values are fallbacks only)
+    CACHE_ITEMS = False
+    _CACHE = None
+    CACHE_HITS = 0
+    CACHE_MISSES = 0
+
+    # Tracer of the API calls (see setTracer) and the socket wrapper that counts the bytes exchanged
+    _TRACER = None
+    _TRACE_SOCK = None
+
     #%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
     def _setTimeout(self, timeout_sec=30):
         """Set the communication timeout (in seconds)."""
@@ -739,6 +1226,8 @@ class Robolink:
     def _check_status(self):
         """This procedure checks the status of the connection"""
         status = self._rec_int()
+        if self._TRACER is not None:
+            self._TRACER._on_status(self)
         if status == 0:
             # everything is OK
             self.LAST_STATUS_MESSAGE = ''
@@ -795,21 +1284,30 @@ class Robolink:
             print("WARNING: Color provided is not in the range [0,1] ([r,g,b,a])")
         return color
 
-    def _send_line(self, string=None):
-        """Sends a string of characters with a \\n"""
+    def _encode_line(self, string):
+        """Returns a string of characters with a \\n as bytes (the _encode_ functions return what the _send_ functions send)"""
         string = string.replace('\n', '<br>')
+        if self._TRACER is not None:
+            self._TRACER._on_line(self, string)
         if sys.version_info[0] < 3:
-            self.COM.send(bytes(string + '\n'))  # Python 2.x only
-        else:
-            self.COM.send(bytes(string + '\n', 'utf-8'))  # Python 3.x only
+            return bytes(string + '\n')  # Python 2.x only
+        return bytes(string + '\n', 'utf-8')  # Python 3.x only
+
+    def _send_line(self, string=None):
+        """Sends a string of characters with a \\n"""
+        self.COM.send(self._encode_line(string))
+
+    def _reader(self):
+        """Returns the read-ahead buffer of the current socket. All the _rec_ functions read through it."""
+        reader = self._READER
+        if reader is None or reader.sock is not self.COM:
+            reader = _SocketReader(self.COM)
+            self._READER = reader
+        return reader
 
     def _rec_line(self):
         """Receives a string. It reads until if finds LF (\\n)"""
-        string = b''
-        chari = self.COM.recv(1)
-        while chari != b'\n':  # read until LF
-            string = string + chari
-            chari = self.COM.recv(1)
+        string = self._reader().read_line()
         return str(string.decode('utf-8'))  # python 2 and python 3 compatible
         #string = ''
         #chari = self.COM.recv(1).decode('utf-8')
@@ -818,22 +1316,23 @@ class Robolink:
         #    chari = self.COM.recv(1).decode('utf-8')
         #return str(string) # python 2 and python 3 compatible
 
-    def _send_item(self, item):
-        """Sends an item pointer"""
+    def _encode_item(self, item):
+        """Returns an item pointer as bytes"""
         if isinstance(item, Item):
-            self.COM.send(struct.pack('>Q', item.item))  #q=unsigned long long (64 bits), d=float64
-            return
+            return struct.pack('>Q', item.item)  #q=unsigned long long (64 bits), d=float64
         if item is None:
             item = 0
-        self.COM.send(struct.pack('>Q', item))  #q=unsigned long long (64 bits), d=float64
+        return struct.pack('>Q', item)  #q=unsigned long long (64 bits), d=float64
+
+    def _send_item(self, item):
+        """Sends an item pointer"""
+        self.COM.send(self._encode_item(item))
 
     def _rec_item(self):
         """Receives an item pointer"""
-        buffer = self.COM.recv(8)
-        item = struct.unpack('>Q', buffer)  #q=unsigned long long (64 bits), d=float64
-        buffer2 = self.COM.recv(4)
-        itemtype = struct.unpack('>i', buffer2)
-        return Item(self, item[0], itemtype[0])
+        buffer = self._recv_exact(12)
+        item, itemtype = struct.unpack('>Qi', buffer)  #q=unsigned long long (64 bits), d=float64
+        return Item(self, item, itemtype)
 
     def _send_bytes(self, data):
         """Sends a byte array"""
@@ -847,14 +1346,9 @@ class Robolink:
 
     def _rec_bytes(self):
         """Receives a byte array"""
-        buffer = self.COM.recv(4)
+        buffer = self._recv_exact(4)
         bytes_len = struct.unpack('>I', buffer)[0]  #q=unsigned long long (64 bits), d=float64
-        data = b''
-        bytes_remaining = bytes_len
-        while bytes_remaining > 0:
-            data += self.COM.recv(bytes_remaining)
-            bytes_remaining = bytes_len - len(data)
-        return data
+        return bytes(self._recv_exact(bytes_len))
 
     def _send_ptr(self, ptr_h):
         """Sends a generic pointer"""
@@ -862,80 +1356,70 @@ class Robolink:
 
     def _rec_ptr(self):
         """Receives a generic pointer"""
-        buffer = self.COM.recv(8)
+        buffer = self._recv_exact(8)
         ptr_h = struct.unpack('>Q', buffer)  #q=unsigned long long (64 bits), d=float64
         return ptr_h[0]  #return ptr_h
 
-    def _send_pose(self, pose):
-        """Sends a pose (4x4 matrix)"""
+    def _encode_pose(self, pose):
+        """Returns a pose (4x4 matrix) as bytes"""
         if not pose.isHomogeneous():
             print("Warning: pose is not homogeneous!")
             print(pose)
-        posebytes = b''
-        for j in range(4):
-            for i in range(4):
-                posebytes = posebytes + struct.pack('>d', pose[i, j])
-        self.COM.send(posebytes)
+        cols = pose.Cols()
+        return struct.pack('>16d', *(cols[0] + cols[1] + cols[2] + cols[3]))
+
+    def _send_pose(self, pose):
+        """Sends a pose (4x4 matrix)"""
+        self.COM.sendall(self._encode_pose(pose))
 
     def _rec_pose(self):
         """Receives a pose (4x4 matrix)"""
-        posebytes = self.COM.recv(16 * 8)
-        posenums = struct.unpack('>16d', posebytes)
-        pose = robodk.Mat(4, 4)
-        cnt = 0
-        for j in range(4):
-            for i in range(4):
-                pose[i, j] = posenums[cnt]
-                cnt = cnt + 1
-        return pose
+        posebytes = self._recv_exact(16 * 8)
+        return _cols_2_pose(struct.unpack('>16d', posebytes))
 
     def _send_xyz(self, pos):
         """Sends an xyz vector"""
-        posbytes = b''
-        for i in range(3):
-            posbytes = posbytes + struct.pack('>d', pos[i])
-        self.COM.send(posbytes)
+        self.COM.sendall(struct.pack('>3d', pos[0], pos[1], pos[2]))
 
     def _rec_xyz(self):
         """Receives an xyz vector"""
-        posbytes = self.COM.recv(3 * 8)
-        posnums = struct.unpack('>3d', posbytes)
-        pos = [0, 0, 0]
-        for i in range(3):
-            pos[i] = posnums[i]
-        return pos
+        posbytes = self._recv_exact(3 * 8)
+        return list(struct.unpack('>3d', posbytes))
 
-    def _send_int(self, num):
-        """Sends an int (32 bits)"""
+    def _encode_int(self, num):
+        """Returns an int (32 bits) as bytes"""
         if isinstance(num, float):
             num = round(num)
         elif not isinstance(num, int):
             num = num[0]
-        self.COM.send(struct.pack('>i', num))
+        return struct.pack('>i', num)
+
+    def _send_int(self, num):
+        """Sends an int (32 bits)"""
+        self.COM.send(self._encode_int(num))
 
     def _rec_int(self):
         """Receives an int (32 bits)"""
-        buffer = self.COM.recv(4)
+        buffer = self._recv_exact(4)
         num = struct.unpack('>i', buffer)
         return num[0]
 
+    def _encode_array(self, values):
+        """Returns an array of doubles as bytes"""
+        if not isinstance(values, list) and not hasattr(values, 'dtype'):  #if it is a Mat() with joints
+            values = values.tolist()
+        nval = len(values)
+        return struct.pack('>i', nval) + _pack_doubles(values)
+
     def _send_array(self, values):
         """Sends an array of doubles"""
-        if not isinstance(values, list):  #if it is a Mat() with joints
-            values = (values.tr()).rows[0]
-        nval = len(values)
-        self._send_int(nval)
-        if nval > 0:
-            buffer = b''
-            for i in range(nval):
-                buffer = buffer + struct.pack('>d', values[i])
-            self.COM.send(buffer)
+        self.COM.sendall(self._encode_array(values))
 
     def _rec_array(self):
         """Receives an array of doubles"""
         nvalues = self._rec_int()
         if nvalues > 0:
-            buffer = self.COM.recv(8 * nvalues)
+            buffer = self._recv_exact(8 * nvalues)
             values = list(struct.unpack('>' + str(nvalues) + 'd', buffer))
             #values = fread(self.COM, nvalues, 'double')
         else:
@@ -943,46 +1427,86 @@ class Robolink:
         return robodk.Mat(values)
 
     def _send_matrix(self, mat):
-        """Sends a 2 dimensional matrix (nxm)"""
+        """Sends a 2 dimensional matrix (nxm). mat can be a Mat, a 2D NumPy array (same layout as Mat) or a list of points (one point per column)."""
         if mat is None:
             self._send_int(0)
             self._send_int(0)
             return
         if type(mat) == list:
             mat = robodk.Mat(mat).tr()
-        size = mat.size()
-        self._send_int(size[0])
-        self._send_int(size[1])
-        for j in range(size[1]):
+        if isinstance(mat, robodk.MatNumpy):
+            mat = mat.arr
+        if hasattr(mat, 'dtype'):
+            size = mat.shape
+            import numpy as np
+            matbytes = np.asarray(mat, dtype='>f8').tobytes(order='F')  # column major
+        else:
+            size = mat.size()
             matbytes = b''
-            for i in range(size[0]):
-                matbytes = matbytes + struct.pack('>d', mat[i, j])
-            self.COM.send(matbytes)
+            if size[0] * size[1] > 0:
+                cols = mat.Cols()
+                matbytes = struct.pack('>%id' % (size[0] * size[1]), *[value for col in cols for value in col])
+        self.COM.sendall(struct.pack('>ii', size[0], size[1]) + matbytes)
 
-    def _rec_matrix(self):
-        """Receives a 2 dimensional matrix (nxm)"""
+    def _rec_matrix(self, as_numpy=False):
+        """Receives a 2 dimensional matrix (nxm). Set as_numpy to True to retrieve a float64 NumPy array instead of a Mat."""
         size1 = self._rec_int()
         size2 = self._rec_int()
         recvsize = size1 * size2 * 8
-        BUFFER_SIZE = 512
+        if as_numpy:
+            import numpy as np
+            if recvsize <= 0:
+                return np.zeros((max(size1, 0), max(size2, 0)))
+            matbytes = self._recv_exact(recvsize)
+            return np.ascontiguousarray(np.frombuffer(matbytes, dtype='>f8').reshape(size2, size1).T, dtype=np.float64)
+
         if recvsize > 0:
-            matbytes = b''
-            to_receive = min(recvsize, BUFFER_SIZE)
-            while to_receive > 0:
-                matbytes += self.COM.recv(to_receive)
-                to_receive = min(recvsize - len(matbytes), BUFFER_SIZE)
+            matbytes = self._recv_exact(recvsize)
             matnums = struct.unpack('>' + str(size1 * size2) + 'd', matbytes)
-            mat = robodk.Mat(size1, size2)
-            cnt = 0
-            for j in range(size2):
-                for i in range(size1):
-                    #mat[i,j] = matnums[cnt]
-                    mat.rows[i][j] = matnums[cnt]
-                    cnt = cnt + 1
+            mat = robodk.Mat([list(matnums[i::size1]) for i in range(size1)])
         else:
             mat = robodk.Mat(0, 0)
         return mat
 
+    def _rec_matrix_rows(self, filename=None, chunk_size=65536):
+        """Receives a 2 dimensional matrix (nxm) as a float64 NumPy array of mxn: each column of the matrix is received as one row.
+        The data is received chunk_size rows at a time straight into the array. If filename is provided, the array is a memory map of a .npy file."""
+        import numpy as np
+        size1 = self._rec_int()
+        size2 = self._rec_int()
+        shape = (max(size2, 0), max(size1, 0))
+        if filename is None:
+            rows = np.empty(shape, dtype=np.float64)
+        elif shape[0] * shape[1] == 0:
+            np.save(filename, np.empty(shape, dtype=np.float64))
+            return np.load(filename, mmap_mode='r+')
+        else:
+            rows = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float64, shape=shape)
+
+        chunk_size = max(1, int(chunk_size))
+        for start in range(0, shape[0], chunk_size):
+            nrows = min(chunk_size, shape[0] - start)
+            rowbytes = self._recv_exact(nrows * size1 * 8)
+            rows[start:start + nrows] = np.frombuffer(rowbytes, dtype='>f8').reshape(nrows, size1)
+
+        if filename is not None:
+            rows.flush()
+        return rows
+
+    def _recv_exact(self, nbytes):
+        """Receives exactly nbytes as a bytearray (recv may return fewer bytes than requested)"""
+        return self._reader().read(nbytes)
+
+    def _call(self, request, *args, **kwargs):
+        """Executes an API function given its request form (the _request_ functions, such as Item._request_Pose). request(*args, **kwargs) returns the bytes to send and reply(), the function that reads the reply and checks the status.
+        The request forms let RobolinkBatch and AsyncRobolink send the request of a call and read its reply later. reply reads the whole reply before it changes any state (AsyncRobolink calls it again if the reply is not complete)."""
+        with self._lock:
+            data, reply = request(*args, **kwargs)
+            if data:
+                self._check_connection()
+                self.COM.sendall(data)
+            return reply()
+
     def _moveX(self, target, itemrobot, movetype, blocking=True):
         """Performs a linear or joint movement. Use MoveJ or MoveL instead."""
         with self._lock:
@@ -1005,8 +1529,8 @@ class Robolink:
                 self._send_item(0)
             elif target.size() == (4, 4):  # target is a pose
                 self._send_int(2)
-                mattr = target.tr()
-                self._send_array(mattr.rows[0] + mattr.rows[1] + mattr.rows[2] + mattr.rows[3])
+                mattr = target.Cols()
+                self._send_array(mattr[0] + mattr[1] + mattr[2] + mattr[3])
                 self._send_item(0)
             else:
                 raise Exception('Invalid input values')
@@ -1040,8 +1564,8 @@ class Robolink:
                 self._send_item(0)
             elif target1.size() == (4, 4):  # target1 is a pose
                 self._send_int(2)
-                mattr = target1.tr()
-                self._send_array(mattr.rows[0] + mattr.rows[1] + mattr.rows[2] + mattr.rows[3])
+                mattr = target1.Cols()
+                self._send_array(mattr[0] + mattr[1] + mattr[2] + mattr[3])
                 self._send_item(0)
             else:
                 raise Exception('Invalid input value for target 1')
@@ -1055,8 +1579,8 @@ class Robolink:
                 self._send_item(0)
             elif target2.size() == (4, 4):  # target2 is a pose
                 self._send_int(2)
-                mattr = target2.tr()
-                self._send_array(mattr.rows[0] + mattr.rows[1] + mattr.rows[2] + mattr.rows[3])
+                mattr = target2.Cols()
+                self._send_array(mattr[0] + mattr[1] + mattr[2] + mattr[3])
                 self._send_item(0)
             else:
                 raise Exception('Invalid input value for target 2')
@@ -1078,6 +1602,10 @@ class Robolink:
         In  5 (optional) : close_std_out -> Close RoboDK standard output path. No RoboDK console output will be shown.
 
         """
+        self._lock = threading.RLock()
+        self._CACHE = None
+        self.CACHE_HITS = 0
+        self.CACHE_MISSES = 0
         with self._lock:
             if type(args) is str:
                 if args != "":
@@ -1135,18 +1663,26 @@ class Robolink:
         # This is already locked
         self.Connect()
 
+    def _request_verify_connection(self):
+        """Request form of _verify_connection (see _call)"""
+        def reply():
+            response = self._rec_line()
+            ver_api = self._rec_int()
+            build = self._rec_int()
+            self._check_status()
+            self.BUILD = build
+            return response == 'RDK_API'
+
+        return self._encode_line('RDK_API') + self._encode_array([self.SAFE_MODE, self.AUTO_UPDATE]), reply
+
     def _verify_connection(self):
         """Verify that we are connected to the RoboDK API server"""
         # Imortant! this should not thread locked
         use_new_version = True
         if use_new_version:
-            self._send_line('RDK_API')
-            self._send_array([self.SAFE_MODE, self.AUTO_UPDATE])
-            response = self._rec_line()
-            ver_api = self._rec_int()
-            self.BUILD = self._rec_int()
-            self._check_status()
-            return response == 'RDK_API'
+            data, reply = self._request_verify_connection()
+            self.COM.sendall(data)
+            return reply()
 
         else:
             self._send_line('CMD_START')
@@ -1180,7 +1716,10 @@ class Robolink:
         self.Disconnect()
 
     def NewLink(self):
-        """Reconnect the API using a different communication link."""
+        """Reconnect the API using a different communication link. Returns 1 if the new link is ready, otherwise it returns 0.
+
+        .. seealso:: :class:`.RobolinkPool`
+        """
         try:
             #if True:
             with self._lock:
@@ -1194,14 +1733,163 @@ class Robolink:
                 connected = self._is_connected()
                 if not (connected > 0):
                     print("Failed to reconnect (1)")
-                    return
+                    return 0
+
+                self._trace_socket()
 
                 # Validate the connection
                 self._verify_connection()
                 self.COM.settimeout(self.TIMEOUT)
+                return 1
 
         except:
             print("Failed to reconnect (2)")
+            return 0
+
+    def setCache(self, enable=True):
+        """Enables or disables the client side cache. When it is enabled, Item(name) returns the cached handle of the items found before, and Item.Name(), Item.Type() and Item.Parent() return the cached value after the first call.
+        The item handles found by name are forgotten when this client adds, pastes, merges, renames, moves or deletes items (Add*, Paste, MergeItems, AddTool, setName, setParent, setParentStatic, Delete and CloseStation).
+
+        Limits of the cache:
+
+        - Changes made from RoboDK (by the user or by other macros) or from other clients are not detected: call InvalidateCache in that case.
+        - Item(name) returns the cached handle even if another item with the same name was added by RoboDK or by another client.
+        - The type of an item never changes, but its name and its parent are only refreshed by the calls of this client listed above.
+        - Copy does not invalidate the cache (the station does not change until Paste is called).
+        - Each link has its own cache (links of a :class:`.RobolinkPool` do not share it).
+
+        :param bool enable: True to enable the cache
+
+        .. seealso:: :func:`~robolink.Robolink.InvalidateCache`, :func:`~robolink.Robolink.CacheStats`
+        """
+        with self._lock:
+            self.CACHE_ITEMS = enable
+            self.InvalidateCache()
+
+    def InvalidateCache(self):
+        """Clears the client side cache (the hit and miss counters are not reset).
+
+        .. seealso:: :func:`~robolink.Robolink.setCache`
+        """
+        with self._lock:
+            if self._CACHE is None:
+                self._CACHE = {'item': {}, 'type': {}, 'name': {}, 'parent': {}}
+            for table in self._CACHE.values():
+                table.clear()
+
+    def CacheStats(self):
+        """Returns the number of cache hits and misses as a dictionary: {'hits': hits, 'misses': misses}
+
+        .. seealso:: :func:`~robolink.Robolink.setCache`
+        """
+        with self._lock:
+            return {'hits': self.CACHE_HITS, 'misses': self.CACHE_MISSES}
+
+    def _cache_get(self, table, key):
+        """Returns a cached value (None if it is not cached or if the cache is disabled)"""
+        if not self.CACHE_ITEMS:
+            return None
+        with self._lock:
+            if self._CACHE is None:
+                self.InvalidateCache()
+            value = self._CACHE[table].get(key)
+            if value is None:
+                self.CACHE_MISSES += 1
+            else:
+                self.CACHE_HITS += 1
+            return value
+
+    def _cache_set(self, table, key, value):
+        """Stores a value in the cache (if it is enabled)"""
+        if self.CACHE_ITEMS and self._CACHE is not None:
+            self._CACHE[table][key] = value
+
+    def _cache_forget(self, ptr_item=None):
+        """Forgets the metadata of an item and the item handles retrieved by name (the names may now match other items)"""
+        if self._CACHE is None:
+            return
+        self._CACHE['item'].clear()
+        for table in ['type', 'name', 'parent']:
+            self._CACHE[table].pop(ptr_item, None)
+
+    def setTracer(self, tracer=None):
+        """Traces the API calls of this link with a :class:`.RobolinkTracer` (command, bytes sent and received and wall time of each call). Set tracer to None to stop tracing.
+        The same tracer can be shared by several links. When no tracer is set, the overhead is a single attribute check per call.
+
+        :param tracer: tracer to record the calls
+        :type tracer: :class:`.RobolinkTracer`
+
+        .. seealso:: :class:`.RobolinkTracer`
+        """
+        with self._lock:
+            if isinstance(self.COM, _TracingSocket):
+                self.COM = self.COM.sock
+            self._TRACE_SOCK = None
+            self._TRACER = tracer
+            self._trace_socket()
+
+    def _trace_socket(self):
+        """Wraps the socket to count the bytes exchanged if a tracer is set"""
+        if self._TRACER is not None and self.COM is not None and not isinstance(self.COM, _TracingSocket):
+            self.COM = _TracingSocket(self.COM)
+            self._TRACE_SOCK = self.COM
+
+    def batch(self):
+        """Returns a :class:`.RobolinkBatch` to pipeline API calls. The calls are sent when the with block ends (or when flush is called) and each call returns a :class:`.BatchFuture`.
+
+        Example:
+
+        .. code-block:: python
+
+            RDK = Robolink()
+            with RDK.batch() as batch:
+                names = [batch.add(item.Name) for item in RDK.ItemList()]
+                poses = [batch.add(item.Pose) for item in RDK.ItemList()]
+
+            print(names[0].result(), poses[0].result())
+
+        .. seealso:: :class:`.RobolinkBatch`
+        """
+        return RobolinkBatch(self)
+
+    def _run_batch(self, calls):
+        """Executes a list of queued calls as (function, args, kwargs, future): the requests are encoded and sent first and the replies are read in order afterwards"""
+        with self._lock:
+            pending = []
+            for function, args, kwargs, future in calls:
+                request = _request_of(function)
+                if request is None or len(pending) >= RobolinkBatch.WINDOW:
+                    self._batch_replies(pending)
+                if request is None:
+                    self._batch_result(future, function, *args, **kwargs)
+                    continue
+                try:
+                    data, reply = request(*args, **kwargs)
+                except Exception as e:
+                    # Nothing is sent for a call that failed before its request was complete
+                    future._set_exception(e)
+                    continue
+                pending.append((data, reply, future))
+            self._batch_replies(pending)
+
+    def _batch_replies(self, pending):
+        """Sends the requests of the pending calls in one send and reads their replies in order"""
+        if not pending:
+            return
+        data = b''.join([request[0] for request in pending])
+        if data:
+            self._check_connection()
+            self.COM.sendall(data)
+        for data, reply, future in pending:
+            self._batch_result(future, reply)
+        del pending[:]
+
+    def _batch_result(self, future, function, *args, **kwargs):
+        """Sets the result of function(*args, **kwargs), or the exception it raises, to the future of a batch call"""
+        try:
+            future._set_result(function(*args, **kwargs))
+        except Exception as e:
+            future._set_exception(e)
 
     def Connect(self):
         """Establish a connection with RoboDK. If RoboDK is not running it will attempt to start RoboDK from the default installation path (otherwise APPLICATION_DIR must be set properly).
@@ -1327,6 +2015,8 @@ class Robolink:
                         print(str(e))
                         raise Exception('Application path is not correct or could not start: ' + self.APPLICATION_DIR)
 
+            if connected > 0:
+                self._trace_socket()
             if connected > 0 and not self._verify_connection():
                 connected = 0
 
@@ -1334,6 +2024,28 @@ class Robolink:
 
     #%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
     # public methods
+    def _request_Item(self, name, itemtype=None):
+        """Request form of Item (see _call)"""
+        if type(name) is not str:
+            raise Exception("Invalid name: provide a name as a string. Item names are visible in the RoboDK tree.")
+
+        cached = self._cache_get('item', (name, itemtype))
+        if cached is not None:
+            return b'', lambda: Item(self, cached[0], cached[1])
+
+        def reply():
+            item = self._rec_item()  #     item = fread(com, 2, 'ulong');% ulong is 32 bits!!!
+            self._check_status()
+            if item.item != 0:
+                self._cache_set('item', (name, itemtype), (item.item, item.type))
+            return item
+
+        if itemtype is None:
+            command = 'G_Item'
+            return self._encode_line(command) + self._encode_line(name), reply
+        command = 'G_Item2'
+        return self._encode_line(command) + self._encode_line(name) + self._encode_int(itemtype), reply
+
     def Item(self, name, itemtype=None):
         """Returns an item by its name. If there is no exact match it will return the last closest match.
         Specify what type of item you are looking for with itemtype. This is useful if 2 items have the same name but different type.
@@ -1368,23 +2080,7 @@ class Robolink:
             robot = RDK.Item('', ITEM_TYPE_ROBOT)   # the first available robot
 
         """
-        with self._lock:
-            if type(name) is not str:
-                raise Exception("Invalid name: provide a name as a string. Item names are visible in the RoboDK tree.")
-
-            self._check_connection()
-            if itemtype is None:
-                command = 'G_Item'
-                self._send_line(command)
-                self._send_line(name)
-            else:
-                command = 'G_Item2'
-                self._send_line(command)
-                self._send_line(name)
-                self._send_int(itemtype)
-            item = self._rec_item()  #     item = fread(com, 2, 'ulong');% ulong is 32 bits!!!
-            self._check_status()
-            return item
+        return self._call(self._request_Item, name, itemtype)
 
     def ItemList(self, filter=None, list_names=False):
         """Returns a list of items (list of name or pointers) of all available items in the currently open station of RoboDK.
@@ -1693,6 +2389,7 @@ class Robolink:
                     list_items.append(newitem)
 
                 self._check_status()
+                self._cache_forget()
                 return list_items
 
             else:
@@ -1702,6 +2399,7 @@ class Robolink:
                 self._send_item(paste_to)
                 newitem = self._rec_item()
                 self._check_status()
+                self._cache_forget()
                 return newitem
 
     def AddFile(self, filename, parent=0):
@@ -1741,6 +2439,7 @@ class Robolink:
             newitem = self._rec_item()
             self.COM.settimeout(self.TIMEOUT)
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddShape(self, triangle_points, add_to=0, override_shapes=False):
@@ -1770,6 +2469,7 @@ class Robolink:
             self._send_int(1 if override_shapes else 0)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddCurve(self, curve_points, reference_object=0, add_to_ref=False, projection_type=PROJECTION_ALONG_NORMAL_RECALC):
@@ -1810,6 +2510,7 @@ class Robolink:
             self._send_int(projection_type)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddPoints(self, points, reference_object=0, add_to_ref=False, projection_type=PROJECTION_ALONG_NORMAL_RECALC):
@@ -1843,6 +2544,7 @@ class Robolink:
             self._send_int(projection_type)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def ProjectPoints(self, points, object_project, projection_type=PROJECTION_ALONG_NORMAL_RECALC, timeout=30):
@@ -1893,6 +2595,7 @@ class Robolink:
             self._check_connection()
             self._send_line('RemoveStn')
             self._check_status()
+            self.InvalidateCache()
 
     def Delete(self, item_list):
         """Remove a list of items.
@@ -1913,6 +2616,7 @@ class Robolink:
                 itm.item = 0
 
             self._check_status()
+            self.InvalidateCache()
 
     def Save(self, filename, itemsave=0):
         """Save an item or a station to a file (formats supported include RDK, STL, ROBOT, TOOL, ...). If no item is provided, the open station is saved.
@@ -1947,6 +2651,7 @@ class Robolink:
             self._send_line(name)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddTarget(self, name, itemparent=0, itemrobot=0):
@@ -1971,6 +2676,7 @@ class Robolink:
             self._send_item(itemrobot)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddFrame(self, name, itemparent=0):
@@ -1989,6 +2695,7 @@ class Robolink:
             self._send_item(itemparent)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddProgram(self, name, itemrobot=0):
@@ -2156,6 +2863,7 @@ class Robolink:
             self._send_item(itemrobot)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def AddMillingProject(self, name='Milling settings', itemrobot=0):
@@ -2181,6 +2889,7 @@ class Robolink:
             self._send_item(itemrobot)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     #%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
@@ -2660,7 +3369,7 @@ class Robolink:
                 import json
                 value = json.dumps(value)
 
-            elif type(value) == robodk.Mat:
+            elif isinstance(value, robodk.Mat):
                 # Special 2D matrix write/read
                 self._check_connection()
                 command = 'G_Gen_Mat'
@@ -2826,45 +3535,37 @@ class Robolink:
     def setPoses(self, items, poses):
         """Sets the relative positions (poses) of a list of items with respect to their parent. For example, the position of an object/frame/target with respect to its parent.
         Use this function instead of setPose() for faster speed.
+        The poses can be provided as a list of poses, as an Nx4x4 float64 array or as a buffer of N*16 doubles in row major order (NumPy array, array.array or memoryview). All the poses are sent with a single write.
 
         .. seealso:: :func:`~robolink.Item.setPose` (item), :func:`~robolink.Item.Pose` (item), :func:`~robolink.Robolink.setPosesAbs`
         """
         with self._lock:
-            if len(items) != len(poses):
-                raise Exception('The number of items must match the number of poses')
-
             if len(items) == 0:
                 return
 
+            payload = struct.pack('>i', len(items)) + _pack_items_poses(items, poses)
             self._check_connection()
             command = 'S_Hlocals'
             self._send_line(command)
-            self._send_int(len(items))
-            for i in range(len(items)):
-                self._send_item(items[i])
-                self._send_pose(poses[i])
+            self.COM.sendall(payload)
             self._check_status()
 
     def setPosesAbs(self, items, poses):
         """Set the absolute positions (poses) of a list of items with respect to the station reference. For example, the position of an object/frame/target with respect to its parent.
         Use this function instead of setPose() for faster speed.
+        The poses can be provided as a list of poses, as an Nx4x4 float64 array or as a buffer of N*16 doubles in row major order (NumPy array, array.array or memoryview). All the poses are sent with a single write.
 
         .. seealso:: :func:`~robolink.Item.setPoseAbs` (item), :func:`~robolink.Item.PoseAbs` (item), :func:`~robolink.Robolink.setPoses`
         """
         with self._lock:
-            if len(items) != len(poses):
-                raise Exception('The number of items must match the number of poses')
-
             if len(items) == 0:
                 return
 
+            payload = struct.pack('>i', len(items)) + _pack_items_poses(items, poses)
             self._check_connection()
             command = 'S_Hlocal_AbsS'
             self._send_line(command)
-            self._send_int(len(items))
-            for i in range(len(items)):
-                self._send_item(items[i])
-                self._send_pose(poses[i])
+            self.COM.sendall(payload)
             self._check_status()
 
     def Joints(self, robot_item_list):
@@ -2888,21 +3589,19 @@ class Robolink:
 
     def setJoints(self, robot_item_list, joints_list):
         """Sets the current robot joints for a list of robot items and a list joints.
+        The joints can be provided as a list of joints, as an NxDOF float64 array or as a buffer of N*DOF doubles (NumPy array, array.array or memoryview). All the joints are sent with a single write.
 
         .. seealso:: :func:`~robolink.Item.setJoints` (item), :func:`~robolink.Item.Joints` (item), :func:`~robolink.Robolink.Joints`"""
         with self._lock:
             nrobs = len(robot_item_list)
-            if nrobs != len(joints_list):
+            if isinstance(joints_list, (list, tuple)) and nrobs != len(joints_list):
                 raise Exception('The size of the robot list does not match the size of the joints list')
 
+            payload = struct.pack('>i', nrobs) + _pack_items_joints(robot_item_list, joints_list)
             self._check_connection()
             command = 'S_ThetasList'
             self._send_line(command)
-            self._send_int(nrobs)
-            for i in range(nrobs):
-                self._send_item(robot_item_list[i])
-                self._send_array(joints_list[i])
-
+            self.COM.sendall(payload)
             self._check_status()
 
     def CalibrateTool(self, poses_xyzwpr, input_format=EULER_RX_RY_RZ, algorithm=CALIBRATE_TCP_BY_POINT, robot=None, tool=None):
@@ -2932,7 +3631,7 @@ class Robolink:
         .. seealso:: :func:`~robolink.Robolink.CalibrateReference`
         """
         with self._lock:
-            if type(poses_xyzwpr) == list and len(poses_xyzwpr) > 0 and type(poses_xyzwpr[0]) == robodk.Mat:
+            if type(poses_xyzwpr) == list and len(poses_xyzwpr) > 0 and isinstance(poses_xyzwpr[0], robodk.Mat):
                 nposes = len(poses_xyzwpr)
                 if len(poses_xyzwpr) > 0:
                     input_format = EULER_RX_RYp_RZpp
@@ -3584,6 +4283,7 @@ class Robolink:
                 self._send_item(itm)
             newitem = self._rec_item()
             self._check_status()
+            self._cache_forget()
             return newitem
 
     def Popup_ISO9283_CubeProgram(self, robot=0):
@@ -3846,6 +4546,171 @@ class Item():
         """
         return self.link
 
+    #"""Request forms of the item calls that RobolinkBatch and AsyncRobolink can pipeline (see Robolink._call)"""
+    def _request_Type(self):
+        link = self.link
+        itemtype = link._cache_get('type', self.item)
+        if itemtype is not None:
+            return b'', lambda: itemtype
+
+        def reply():
+            itemtype = link._rec_int()
+            link._check_status()
+            if itemtype >= 0:
+                link._cache_set('type', self.item, itemtype)
+            return itemtype
+
+        command = 'G_Item_Type'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_Parent(self):
+        link = self.link
+        cached = link._cache_get('parent', self.item)
+        if cached is not None:
+            return b'', lambda: Item(link, cached[0], cached[1])
+
+        def reply():
+            parent = link._rec_item()
+            link._check_status()
+            link._cache_set('parent', self.item, (parent.item, parent.type))
+            return parent
+
+        command = 'G_Parent'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_Name(self):
+        link = self.link
+        name = link._cache_get('name', self.item)
+        if name is not None:
+            return b'', lambda: name
+
+        def reply():
+            name = link._rec_line()
+            link._check_status()
+            link._cache_set('name', self.item, name)
+            return name
+
+        command = 'G_Name'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_setName(self, name):
+        link = self.link
+
+        def reply():
+            link._check_status()
+            link._cache_forget(self.item)
+            return self
+
+        command = 'S_Name'
+        return link._encode_line(command) + link._encode_item(self) + link._encode_line(name), reply
+
+    def _request_Pose(self):
+        link = self.link
+
+        def reply():
+            pose = link._rec_pose()
+            link._check_status()
+            return pose
+
+        command = 'G_Hlocal'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_setPose(self, pose):
+        link = self.link
+
+        def reply():
+            link._check_status()
+            return self
+
+        command = 'S_Hlocal'
+        return link._encode_line(command) + link._encode_item(self) + link._encode_pose(pose), reply
+
+    def _request_PoseAbs(self):
+        link = self.link
+
+        def reply():
+            pose = link._rec_pose()
+            link._check_status()
+            return pose
+
+        command = 'G_Hlocal_Abs'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_setPoseAbs(self, pose):
+        link = self.link
+
+        def reply():
+            link._check_status()
+            return self
+
+        command = 'S_Hlocal_Abs'
+        return link._encode_line(command) + link._encode_item(self) + link._encode_pose(pose), reply
+
+    def _request_Joints(self):
+        link = self.link
+
+        def reply():
+            joints = link._rec_array()
+            link._check_status()
+            return joints
+
+        command = 'G_Thetas'
+        return link._encode_line(command) + link._encode_item(self), reply
+
+    def _request_setJoints(self, joints):
+        link = self.link
+
+        def reply():
+            link._check_status()
+            return self
+
+        command = 'S_Thetas'
+        return link._encode_line(command) + link._encode_array(joints) + link._encode_item(self), reply
+
+    def _request_SolveFK(self, joints, tool=None, reference=None):
+        link = self.link
+
+        def reply():
+            pose = link._rec_pose()
+            link._check_status()
+            if tool is not None:
+                pose = pose * tool
+            if reference is not None:
+                pose = robodk.invH(reference) * pose
+            return pose
+
+        command = 'G_FK'
+        return link._encode_line(command) + link._encode_array(joints) + link._encode_item(self), reply
+
+    def _request_SolveIK(self, pose, joints_approx=None, tool=None, reference=None):
+        link = self.link
+        if tool is not None:
+            pose = pose * robodk.invH(tool)
+        if reference is not None:
+            pose = reference * pose
+
+        def reply():
+            joints = link._rec_array()
+            link._check_status()
+            return joints
+
+        if joints_approx is None:
+            command = 'G_IK'
+            return link._encode_line(command) + link._encode_pose(pose) + link._encode_item(self), reply
+        command = 'G_IK_jnts'
+        return link._encode_line(command) + link._encode_pose(pose) + link._encode_array(joints_approx) + link._encode_item(self), reply
+
+    def _request_Busy(self):
+        link = self.link
+
+        def reply():
+            busy = link._rec_int()
+            link._check_status()
+            return busy
+
+        command = 'IsBusy'
+        return link._encode_line(command) + link._encode_item(self), reply
+
     #"""Generic item calls"""
     def Type(self):
         """Return the type of the item (robot, object, tool, frame, ...).
@@ -3853,14 +4718,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Robolink.Item`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Item_Type'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            itemtype = self.link._rec_int()
-            self.link._check_status()
-            return itemtype
+        return self.link._call(self._request_Type)
 
     def Copy(self, copy_children=True):
         """Copy the item to the clipboard (same as Ctrl+C). Use together with Paste() to duplicate items.
@@ -3942,6 +4800,7 @@ class Item():
             self.link._send_line(command)
             self.link._send_item(self)
             self.link._check_status()
+            self.link.InvalidateCache()
             self.item = 0
 
     def Valid(self, check_deleted=False):
@@ -3986,6 +4845,7 @@ class Item():
             self.link._send_item(self)
             self.link._send_item(parent)
             self.link._check_status()
+            self.link._cache_forget(self.item)
             return parent
 
     def setParentStatic(self, parent):
@@ -4004,6 +4864,7 @@ class Item():
             self.link._send_item(self)
             self.link._send_item(parent)
             self.link._check_status()
+            self.link._cache_forget(self.item)
 
     def AttachClosest(self, keyword='', tolerance_mm=-1, list_objects=[]):
         """Attach the closest object to the tool.
@@ -4069,14 +4930,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.Childs`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Parent'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            parent = self.link._rec_item()
-            self.link._check_status()
-            return parent
+        return self.link._call(self._request_Parent)
 
     def Childs(self):
         """Return a list of the childs items (list of :class:`.Item`) that are attached to this item.
@@ -4194,14 +5048,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.setName`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Name'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            name = self.link._rec_line()
-            self.link._check_status()
-            return name
+        return self.link._call(self._request_Name)
 
     def setName(self, name):
         """Set the name of the item. The name of the item will be displayed in the station tree.
@@ -4210,14 +5057,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.Name`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'S_Name'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            self.link._send_line(name)
-            self.link._check_status()
-            return self
+        return self.link._call(self._request_setName, name)
 
     def setValue(self, varname, value):
         """Set a specific property name to a given value. This is reserved for internal purposes and future compatibility.
@@ -4256,14 +5096,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.Pose`, :func:`~robolink.Item.PoseAbs`, :func:`~robolink.Item.setPoseAbs`, :func:`~robolink.Item.setPoseTool`, :func:`~robolink.Item.setPoseFrame`, :func:`~robolink.Robolink.Item`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'S_Hlocal'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            self.link._send_pose(pose)
-            self.link._check_status()
-            return self
+        return self.link._call(self._request_setPose, pose)
 
     def Pose(self):
         """Returns the relative pose of an object, target or reference frame. For example, the position of an object, target or reference frame with respect to its parent (the item it is attached to in the tree). For robot items, this provide the pose of the end efector with respect to the robot base (same as PoseTool()). It returns the pose as :class:`robodk.Mat`.
@@ -4274,14 +5107,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.Pose`, :func:`~robolink.Item.setPose`, :func:`~robolink.Item.PoseAbs`, :func:`~robolink.Item.PoseTool`, :func:`~robolink.Item.PoseFrame`, :func:`~robolink.Robolink.Item`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Hlocal'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            pose = self.link._rec_pose()
-            self.link._check_status()
-            return pose
+        return self.link._call(self._request_Pose)
 
     def setGeometryPose(self, pose):
         """Set the position (pose) the object geometry with respect to its own reference frame. This can be applied to tools and objects.
@@ -4313,14 +5139,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.PoseAbs`, :func:`~robolink.Item.setPose`, :func:`~robolink.Item.Pose`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'S_Hlocal_Abs'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            self.link._send_pose(pose)
-            self.link._check_status()
-            return self
+        return self.link._call(self._request_setPoseAbs, pose)
 
     def PoseAbs(self):
         """Return the pose (:class:`robodk.Mat`) of this item with respect to the absolute reference frame (also know as the station reference or world coordinate system -WCS-). For example, the position of an object/frame/target with respect to the origin of the station.
@@ -4354,14 +5173,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.setPoseAbs`, :func:`~robolink.Item.Pose`, :func:`~robolink.Item.setPose`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Hlocal_Abs'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            pose = self.link._rec_pose()
-            self.link._check_status()
-            return pose
+        return self.link._call(self._request_PoseAbs)
 
     def Recolor(self, tocolor, fromcolor=None, tolerance=None):
         """Changes the color of an :class:`.Item` (object, tool or robot).
@@ -4727,14 +5539,7 @@ class Item():
             robot.MoveJ(joints)                     # move the robot to the new joint position
 
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_Thetas'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            joints = self.link._rec_array()
-            self.link._check_status()
-            return joints
+        return self.link._call(self._request_Joints)
 
     def SimulatorJoints(self):
         """Return the current joint position of a robot (only from the simulator, never from the real robot).
@@ -4846,14 +5651,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.Joints`
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'S_Thetas'
-            self.link._send_line(command)
-            self.link._send_array(joints)
-            self.link._send_item(self)
-            self.link._check_status()
-            return self
+        return self.link._call(self._request_setJoints, joints)
 
     def JointLimits(self):
         """Retrieve the joint limits of a robot. Returns (lower limits, upper limits, joint type).
@@ -5026,6 +5824,7 @@ class Item():
             self.link._send_line(tool_name)
             newtool = self.link._rec_item()
             self.link._check_status()
+            self.link._cache_forget()
             return newtool
 
     def SolveFK(self, joints, tool=None, reference=None):
@@ -5079,19 +5878,7 @@ class Item():
             robot.MoveJ(new_robot_joints)
             #robot.MoveL(new_robot_joints)
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'G_FK'
-            self.link._send_line(command)
-            self.link._send_array(joints)
-            self.link._send_item(self)
-            pose = self.link._rec_pose()
-            self.link._check_status()
-            if tool is not None:
-                pose = pose * tool
-            if reference is not None:
-                pose = robodk.invH(reference) * pose
-            return pose
+        return self.link._call(self._request_SolveFK, joints, tool, reference)
 
     def JointsConfig(self, joints):
         """Returns the robot configuration state for a set of robot joints.
@@ -5154,28 +5941,7 @@ class Item():
 
         .. seealso:: :func:`~robolink.Item.SolveFK`, :func:`~robolink.Item.SolveIK_All`, :func:`~robolink.Item.JointsConfig`
         """
-        with self.link._lock:
-            if tool is not None:
-                pose = pose * robodk.invH(tool)
-            if reference is not None:
-                pose = reference * pose
-
-            self.link._check_connection()
-            if joints_approx is None:
-                command = 'G_IK'
-                self.link._send_line(command)
-                self.link._send_pose(pose)
-                self.link._send_item(self)
-                joints = self.link._rec_array()
-            else:
-                command = 'G_IK_jnts'
-                self.link._send_line(command)
-                self.link._send_pose(pose)
-                self.link._send_array(joints_approx)
-                self.link._send_item(self)
-                joints = self.link._rec_array()
-            self.link._check_status()
-            return joints
+        return self.link._call(self._request_SolveIK, pose, joints_approx, tool, reference)
 
     def SolveIK_All(self, pose, tool=None, reference=None):
         """Calculates the inverse kinematics for the specified robot and pose. The function returns all available joint solutions as a 2D matrix.
@@ -5200,6 +5966,85 @@ class Item():
             self.link._check_status()
             return joints_list
 
+    def SolveFK_Batch(self, joints_list, tool=None, reference=None, chunk_size=1000):
+        """Calculate the forward kinematics for many sets of robot joints. The requests are pipelined (see :func:`~robolink.Robolink.batch`) so the communication latency is paid once per chunk_size joints instead of once per joints.
+        Returns [poses, status]: poses is an Nx16 array (each row is a 4x4 pose, row by row) and status is 0 for each valid row or -1 if the calculation failed (the row is filled with NaN).
+        Lists are returned instead of arrays if NumPy is not available.
+
+        :param joints_list: list of robot joints or NxDOF array
+        :param tool: Optionally provide the tool used to calculate the forward kinematics (same as SolveFK)
+        :type tool: :class:`robodk.Mat`
+        :param reference: Optionally provide the reference frame used to calculate the forward kinematics (same as SolveFK)
+        :type reference: :class:`robodk.Mat`
+
+        .. seealso:: :func:`~robolink.Item.SolveFK`, :func:`~robolink.Item.SolveIK_Batch`
+        """
+        if hasattr(joints_list, 'tolist'):
+            joints_list = joints_list.tolist()
+        futures = []
+        for i0 in range(0, len(joints_list), chunk_size):
+            with self.link.batch() as batch:
+                for joints in joints_list[i0:i0 + chunk_size]:
+                    futures.append(batch.add(self.SolveFK, joints, tool, reference))
+
+        poses = []
+        status = []
+        for future in futures:
+            if future.exception() is None:
+                poses.append([value for row in future.result().Rows() for value in row])
+                status.append(0)
+            else:
+                poses.append([float('nan')] * 16)
+                status.append(-1)
+        return _batch_output(poses, status, 16)
+
+    def SolveIK_Batch(self, poses, joints_approx=None, tool=None, reference=None, chunk_size=1000):
+        """Calculates the inverse kinematics for many poses. The requests are pipelined (see :func:`~robolink.Robolink.batch`) so the communication latency is paid once per chunk_size poses instead of once per pose.
+        Returns [joints, status]: joints is an NxDOF array and status is 0 for each row with a solution, -1 if there is no solution and -2 if the calculation failed (rows without solution are filled with NaN).
+        Lists are returned instead of arrays if NumPy is not available.
+
+        :param poses: list of poses, Nx4x4 array or Nx16 array (each row is a 4x4 pose, row by row)
+        :param joints_approx: Preferred joint solution (same as SolveIK). Provide one list of joints for all the poses or one row of joints per pose.
+        :param tool: Tool pose with respect to the robot flange (TCP)
+        :type tool: :class:`robodk.Mat`
+        :param reference: Reference pose (reference frame with respect to the robot base)
+        :type reference: :class:`robodk.Mat`
+
+        .. seealso:: :func:`~robolink.Item.SolveIK`, :func:`~robolink.Item.SolveFK_Batch`
+        """
+        if hasattr(joints_approx, 'tolist'):
+            joints_approx = joints_approx.tolist()
+        approx_per_pose = joints_approx is not None and len(joints_approx) > 0 and hasattr(joints_approx[0], '__len__')
+        futures = []
+        for i0 in range(0, len(poses), chunk_size):
+            with self.link.batch() as batch:
+                for i in range(i0, min(len(poses), i0 + chunk_size)):
+                    pose = poses[i]
+                    if not isinstance(pose, robodk.Mat):
+                        if hasattr(pose, 'reshape'):
+                            pose = pose.reshape(4, 4)
+                        pose = robodk._as_pose(pose)
+                    futures.append(batch.add(self.SolveIK, pose, joints_approx[i] if approx_per_pose else joints_approx, tool, reference))
+
+        solutions = []
+        status = []
+        for future in futures:
+            if future.exception() is not None:
+                solutions.append([])
+                status.append(-2)
+                continue
+            joints = future.result().list()
+            # RoboDK returns a single value (or an empty array) if there is no solution
+            if len(joints) > 1:
+                solutions.append(joints)
+                status.append(0)
+            else:
+                solutions.append([])
+                status.append(-1)
+        ndof = max([len(joints) for joints in solutions] + [0])
+        solutions = [joints if joints else [float('nan')] * ndof for joints in solutions]
+        return _batch_output(solutions, status, ndof)
+
     def FilterTarget(self, pose, joints_approx=None):
         """Filters a target to improve accuracy. This option requires a calibrated robot.
         :param pose: pose of the robot TCP with respect to the robot reference frame
@@ -5611,7 +6456,7 @@ class Item():
         :type matrix: list of list of float or a matrix of joints as a :class:`robodk.Mat`"""
         display_ghost_joints = display_type & 2048
         with self.link._lock:
-            if type(matrix) == list and (len(matrix) == 0 or type(matrix[0]) == robodk.Mat or display_ghost_joints):
+            if type(matrix) == list and (len(matrix) == 0 or isinstance(matrix[0], robodk.Mat) or display_ghost_joints):
                 # poses assumed
                 self.link._check_connection()
                 command = 'Show_SeqPoses'
@@ -5659,14 +6504,7 @@ class Item():
             print("Program done")
 
         """
-        with self.link._lock:
-            self.link._check_connection()
-            command = 'IsBusy'
-            self.link._send_line(command)
-            self.link._send_item(self)
-            busy = self.link._rec_int()
-            self.link._check_status()
-            return busy
+        return self.link._call(self._request_Busy)
 
     def Stop(self):
         """Stop a program or a robot
@@ -6394,6 +7232,44 @@ class Item():
             self.link._check_status()
             return error_msg, joint_list, error_code
 
+    def InstructionListJoints_Array(self, mm_step=10, deg_step=5, save_to_npy=None, collision_check=COLLISION_OFF, flags=0, time_step=0.1, chunk_size=65536):
+        """Same as InstructionListJoints but the joint list is received in chunks straight into a NumPy array (one row per step), instead of a :class:`~robodk.Mat`.
+        If save_to_npy is provided, the array is a memory map of that .npy file, so joint lists larger than the available memory can be calculated. Requires NumPy.
+
+        :param float mm_step: step in mm to split the linear movements
+        :param float deg_step: step in deg to split the joint movements
+        :param str save_to_npy: (optional) path of the .npy file to write. If it is not provided, the array is kept in memory.
+        :param int collision_check: (optional) check for collisions
+        :param int flags: (optional) see InstructionListJoints
+        :param float time_step: (optional) set the time step in seconds for time based calculation
+        :param int chunk_size: number of rows received at a time
+        :return: [message (str), joint_list (:class:`.ProgramJointList`), status (int)]
+
+        .. code-block:: python
+
+            msg, jnts, status = program.InstructionListJoints_Array(1, 1, 'joints.npy', flags=4, time_step=0.001)
+            print(jnts.joints[:, 0].max())      # J1 column view
+            t, xyz = jnts.time, jnts.xyz         # no copies
+            for row in jnts:                     # rows are read chunk by chunk
+                pass
+
+        .. seealso:: :func:`~robolink.Item.InstructionListJoints`, :class:`.ProgramJointList`
+        """
+        with self.link._lock:
+            self.link._check_connection()
+            command = 'G_ProgJointList'
+            self.link._send_line(command)
+            self.link._send_item(self)
+            self.link._send_array([mm_step, deg_step, float(collision_check), float(flags), float(time_step)])
+            self.link.COM.settimeout(3600)
+            self.link._send_line('')
+            rows = self.link._rec_matrix_rows(save_to_npy, chunk_size)
+            error_code = self.link._rec_int()
+            self.link.COM.settimeout(self.link.TIMEOUT)
+            error_msg = self.link._rec_line()
+            self.link._check_status()
+            return error_msg, ProgramJointList(rows, flags), error_code
+
     def getParam(self, param):
         """Get custom binary data from this item. Use setParam to set the data.
 
@@ -6511,6 +7387,529 @@ class Item():
             return line
 
 
+#------------------------------------------------------------
+class RobolinkPool(object):
+    """Pool of links to the same RoboDK instance. Each link is a copy of a :class:`.Robolink` object with its own socket (see :func:`~robolink.Robolink.NewLink`) and its own lock,
+    so worker threads that use different links do not wait for each other.
+
+    Items are bound to the link that retrieved them: use Item(link, item.item, item.type) to use an item with a link of the pool.
+
+    :param rdk: Robolink object to take the connection settings from (a new Robolink is created if it is not provided)
+    :type rdk: :class:`.Robolink`
+    :param int size: Number of links (default=None, one link per CPU)
+
+    .. code-block:: python
+
+        RDK = Robolink()
+        robot = RDK.Item('', ITEM_TYPE_ROBOT)
+
+        def solve_ik(link, pose):
+            return Item(link, robot.item, robot.type).SolveIK(pose)
+
+        with RobolinkPool(RDK, 4) as pool:
+            joints_list = pool.map(solve_ik, poses)
+
+    .. seealso:: :func:`~robolink.Robolink.NewLink`, :func:`~robolink.Item.SolveIK_Batch`
+    """
+    def __init__(self, rdk=None, size=None):
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue  # Python 2
+
+        if rdk is None:
+            rdk = Robolink()
+        if size is None:
+            import multiprocessing
+            size = multiprocessing.cpu_count()
+
+        self.rdk = rdk
+        self.links = []
+        self._available = queue.Queue()
+        try:
+            for i in range(size):
+                link = self._new_link()
+                self.links.append(link)
+                self._available.put(link)
+        except:
+            self.close()
+            raise
+
+    def _new_link(self):
+        """Returns a copy of the Robolink object connected through a new socket"""
+        import copy
+        link = copy.copy(self.rdk)
+        link._lock = threading.RLock()
+        link._CACHE = None
+        link.CACHE_HITS = 0
+        link.CACHE_MISSES = 0
+        link.COM = None
+        link._READER = None
+        if not link.NewLink():
+            if link.COM is not None:
+                link.COM.close()
+            raise Exception('Unable to open a new link to RoboDK')
+        return link
+
+    def __len__(self):
+        return len(self.links)
+
+    def acquire(self, timeout=None):
+        """Takes a link from the pool. It waits until a link is available (or until timeout, in seconds). The link must be given back with release."""
+        return self._available.get(timeout=timeout)
+
+    def release(self, link):
+        """Gives back a link taken with acquire"""
+        self._available.put(link)
+
+    def map(self, function, values):
+        """Calls function(link, value) for each value, using one worker thread per link of the pool. Returns the list of results in the same order as values.
+        If a call raises an exception, the remaining values are not processed and the exception is raised."""
+        values = list(values)
+        results = [None] * len(values)
+        errors = []
+        lock = threading.Lock()
+        indexes = iter(range(len(values)))
+
+        def worker(link):
+            while not errors:
+                with lock:
+                    i = next(indexes, None)
+                if i is None:
+                    return
+                try:
+                    results[i] = function(link, values[i])
+                except Exception as e:
+                    errors.append(e)
+
+        links = [self.acquire() for i in range(min(len(self.links), len(values)))]
+        try:
+            threads = [threading.Thread(target=worker, args=(link,)) for link in links]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for link in links:
+                self.release(link)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def close(self):
+        """Closes the sockets of all the links of the pool (the original Robolink object stays connected)"""
+        for link in self.links:
+            try:
+                link.Disconnect()
+            except Exception:
+                pass
+        self.links = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+#------------------------------------------------------------
+# Asyncio client: AsyncRobolink/AsyncItem send the calls that have a request form (see Robolink._call) through an asyncio connection: the requests are written as soon as the calls are submitted
+# and the replies are decoded in the event loop as the data is received. Other calls are executed in the default executor with a blocking link, so the event loop is never blocked.
+class _IncompleteReply(Exception):
+    """Raised by _ReplyBuffer when the reply being decoded is not complete. size is the number of bytes the buffer must hold to continue."""
+    def __init__(self, size):
+        Exception.__init__(self, 'Incomplete reply')
+        self.size = size
+
+
+class _ReplyBuffer(object):
+    """Bytes received through an asyncio connection. It replaces the read-ahead buffer of the link (see Robolink._reader) so the replies are decoded with the same _rec_ functions."""
+    def __init__(self):
+        self.sock = None
+        self.buffer = bytearray()
+        self.pos = 0
+
+    def feed(self, data):
+        """Adds bytes received from RoboDK"""
+        self.buffer += data
+
+    def compact(self):
+        """Drops the bytes already decoded"""
+        del self.buffer[:self.pos]
+        self.pos = 0
+
+    def read(self, nbytes):
+        """Returns exactly nbytes as a bytearray"""
+        if len(self.buffer) - self.pos < nbytes:
+            raise _IncompleteReply(self.pos + nbytes)
+        data = self.buffer[self.pos:self.pos + nbytes]
+        self.pos += nbytes
+        return data
+
+    def read_line(self):
+        """Returns the bytes up to the next LF (\\n), the LF is consumed but not returned"""
+        idx = self.buffer.find(b'\n', self.pos)
+        if idx < 0:
+            raise _IncompleteReply(len(self.buffer) + 1)
+        line = bytes(self.buffer[self.pos:idx])
+        self.pos = idx + 1
+        return line
+
+
+class _AsyncLink(Robolink):
+    """Robolink used by AsyncRobolink. It never starts RoboDK: it decodes the replies received by an asyncio connection, or it is connected with NewLink to execute blocking calls."""
+    def __init__(self, robodk_ip, port):
+        self._lock = threading.RLock()
+        self._CACHE = None
+        self.CACHE_HITS = 0
+        self.CACHE_MISSES = 0
+        self.IP = robodk_ip
+        self.PORT = port
+
+    def _check_connection(self):
+        pass
+
+
+class _AsyncConnection(object):
+    """Asyncio protocol of one connection to RoboDK. Calls are executed in the order they were submitted.
+    Each call is queued as (function, streamed, future): function(link) returns the request and the reply function of the call if streamed is True, otherwise it executes the call with a blocking link."""
+    def __init__(self, rdk, loop):
+        self.rdk = rdk
+        self.loop = loop
+        self.link = _AsyncLink(rdk.IP, rdk.PORT)
+        self.link._READER = _ReplyBuffer()
+        self.blocking = None
+        self.transport = None
+        self.queue = collections.deque()
+        self.replies = collections.deque()
+        self.need = 0
+        self.running = False
+        self.error = None
+
+    def pending(self):
+        """Number of calls queued or in progress"""
+        return len(self.queue) + len(self.replies) + self.running
+
+    def submit(self, function, streamed, future):
+        """Queue a call and set its result to future"""
+        if self.error is not None:
+            future.set_exception(self.error)
+            return
+        self.queue.append((function, streamed, future))
+        self._pump()
+
+    def _pump(self):
+        """Writes the requests of the queued calls. A blocking call waits for the replies of the previous calls and the following calls wait for it."""
+        while self.transport is not None and not self.running:
+            self._decode()
+            if not self.queue:
+                return
+            function, streamed, future = self.queue[0]
+            if not streamed:
+                if self.replies:
+                    return
+                self.queue.popleft()
+                if not future.cancelled():
+                    self._run_blocking(function, future)
+                continue
+
+            self.queue.popleft()
+            if future.cancelled():
+                continue
+            try:
+                data, reply = function(self.link)
+            except Exception as e:
+                # Nothing is sent for a call that failed before its request was complete
+                future.set_exception(e)
+                continue
+            if data:
+                self.transport.write(data)
+            self.replies.append((reply, future))
+
+    def _decode(self):
+        """Decodes the replies received so far, in order"""
+        buffer = self.link._READER
+        while self.replies:
+            reply, future = self.replies[0]
+            start = buffer.pos
+            try:
+                result = reply()
+            except _IncompleteReply as e:
+                # The reply is decoded again once enough data is received
+                buffer.pos = start
+                buffer.compact()
+                self.need = e.size - start
+                return
+            except Exception as e:
+                self.replies.popleft()
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.replies.popleft()
+            if not future.done():
+                future.set_result(self.rdk._wrap(result))
+        buffer.compact()
+        self.need = 0
+
+    def _run_blocking(self, function, future):
+        """Executes function(link) in the default executor with the blocking link of this connection"""
+        def run():
+            if self.blocking is None:
+                link = _AsyncLink(self.rdk.IP, self.rdk.PORT)
+                if not link.NewLink():
+                    raise Exception('Unable to connect')
+                self.blocking = link
+            return self.rdk._wrap(function(self.blocking))
+
+        def done(task):
+            self.running = False
+            error = Exception('Call cancelled') if task.cancelled() else task.exception()
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(task.result())
+            self._pump()
+
+        self.running = True
+        self.loop.run_in_executor(None, run).add_done_callback(done)
+
+    def _fail(self, error):
+        """Fails the calls in progress and all the queued calls (the connection can no longer be used)"""
+        self.error = error
+        futures = [reply[1] for reply in self.replies] + [call[2] for call in self.queue]
+        self.replies.clear()
+        self.queue.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    # asyncio protocol callbacks
+    def connection_made(self, transport):
+        self.transport = transport
+        self._pump()
+
+    def data_received(self, data):
+        buffer = self.link._READER
+        buffer.feed(data)
+        if len(buffer.buffer) - buffer.pos >= self.need:
+            self._pump()
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, error):
+        self.transport = None
+        self._fail(error if error is not None else Exception('Connection closed by RoboDK'))
+
+    def pause_writing(self):
+        pass
+
+    def resume_writing(self):
+        pass
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+        if self.blocking is not None:
+            self.blocking.Disconnect()
+            self.blocking = None
+        self._fail(Exception('Connection closed'))
+
+
+def _async_unwrap(value):
+    """Converts AsyncItem arguments (and lists of AsyncItem) to Item objects"""
+    if isinstance(value, AsyncItem):
+        return value._item
+    if isinstance(value, list):
+        return [_async_unwrap(v) for v in value]
+    return value
+
+
+class AsyncRobolink(object):
+    """Asyncio version of :class:`.Robolink`. Every Robolink function is available and returns an awaitable instead of the result.
+    Items are returned as :class:`.AsyncItem` objects, which provide the :class:`.Item` functions the same way.
+
+    Several connections can be opened to the same RoboDK instance: calls are sent to the least busy connection, so independent calls are processed concurrently.
+    The calls submitted through one connection are executed in order. RoboDK must be running (AsyncRobolink does not start RoboDK).
+
+    The functions that :class:`.RobolinkBatch` pipelines (Item, Name, Pose, setPose, Joints, setJoints, SolveFK, SolveIK, ...) are sent through the asyncio connection: their requests are written as soon as they are called
+    and their replies are decoded in the event loop. The other functions, and the functions given to :func:`call`, are executed in the default executor with a blocking link of the connection.
+
+    :param str robodk_ip: IP of the RoboDK API server (default='localhost')
+    :param int port: Port of the RoboDK API server (default=None, it will use the default value)
+    :param int connections: Number of connections to open (default=1)
+
+    .. code-block:: python
+
+        import asyncio
+        from robolink import *
+
+        async def main():
+            RDK = await AsyncRobolink(connections=4).Connect()
+            robot = await RDK.Item('', ITEM_TYPE_ROBOT)
+            joints = await robot.Joints()
+            poses = await asyncio.gather(*[robot.SolveFK(joints) for i in range(100)])
+            RDK.Disconnect()
+
+        asyncio.run(main())
+
+    .. seealso:: :class:`.AsyncItem`, :func:`~robolink.Robolink.batch`
+    """
+    def __init__(self, robodk_ip='localhost', port=None, connections=1):
+        if port is None:
+            port = int(os.environ.get("ROBODK_API_PORT", Robolink.PORT_START))
+        self.IP = robodk_ip
+        self.PORT = port
+        self.CONNECTIONS = connections
+        self._connections = []
+
+    def Connect(self):
+        """Opens the connections to RoboDK. Returns an awaitable that returns this object once all the connections are ready."""
+        import asyncio
+        import functools
+        import socket
+        loop = asyncio.get_event_loop()
+        done = loop.create_future()
+        waiting = [self.CONNECTIONS]
+
+        def fail(error):
+            if not done.done():
+                done.set_exception(error)
+
+        def on_ready(future):
+            if future.cancelled() or future.exception() is not None or not future.result():
+                fail(Exception('Unable to connect') if future.cancelled() or future.exception() is None else future.exception())
+                return
+            waiting[0] -= 1
+            if waiting[0] == 0 and not done.done():
+                done.set_result(self)
+
+        def on_open(connection, task):
+            if task.cancelled() or task.exception() is not None:
+                connection._fail(Exception('Unable to connect') if task.cancelled() else task.exception())
+                return
+            sock = connection.transport.get_extra_info('socket')
+            if Robolink.NODELAY and sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        for i in range(self.CONNECTIONS):
+            connection = _AsyncConnection(self, loop)
+            self._connections.append(connection)
+            # The handshake is the first call of the connection: it is sent once the connection is open
+            ready = loop.create_future()
+            ready.add_done_callback(on_ready)
+            connection.submit(lambda link: link._request_verify_connection(), True, ready)
+            task = asyncio.ensure_future(loop.create_connection(lambda connection=connection: connection, self.IP, self.PORT))
+            task.add_done_callback(functools.partial(on_open, connection))
+        return done
+
+    def Disconnect(self):
+        """Closes all the connections. Calls that did not complete raise an exception."""
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+
+    def Finish(self):
+        """Same as Disconnect"""
+        self.Disconnect()
+
+    def _wrap(self, value):
+        """Converts Item results (and lists of Item) to AsyncItem objects"""
+        if isinstance(value, Item):
+            return AsyncItem(self, value)
+        if isinstance(value, list) and value and isinstance(value[0], Item):
+            return [self._wrap(v) for v in value]
+        return value
+
+    def _submit(self, function, streamed):
+        """Queues function on the least busy connection and returns a future with its result. function(link) returns the request form of the call if streamed is True (see _AsyncConnection)."""
+        import asyncio
+        if not self._connections:
+            raise Exception('Not connected. Await Connect() first.')
+        future = asyncio.get_event_loop().create_future()
+        connection = min(self._connections, key=lambda c: c.pending())
+        connection.submit(function, streamed, future)
+        return future
+
+    def call(self, function, *args, **kwargs):
+        """Runs function(link, *args, **kwargs) on one of the connections, where link is a blocking :class:`.Robolink` (function is executed in the default executor). Returns an awaitable with the result of function.
+        Use it to run a sequence of calls that must be executed in order on the same connection."""
+        args = _async_unwrap(list(args))
+        kwargs = dict((key, _async_unwrap(value)) for key, value in kwargs.items())
+        return self._submit(lambda link: function(link, *args, **kwargs), False)
+
+    def __getattr__(self, name):
+        function = getattr(Robolink, name, None)
+        if name.startswith('_') or name in _ASYNC_EXCLUDED or not callable(function):
+            raise AttributeError(name)
+        streamed = hasattr(Robolink, '_request_' + name)
+        method = '_request_' + name if streamed else name
+
+        def call(*args, **kwargs):
+            args = _async_unwrap(list(args))
+            kwargs = dict((key, _async_unwrap(value)) for key, value in kwargs.items())
+            return self._submit(lambda link: getattr(link, method)(*args, **kwargs), streamed)
+
+        call.__doc__ = function.__doc__
+        return call
+
+
+class AsyncItem(object):
+    """Asyncio version of :class:`.Item`, returned by :class:`.AsyncRobolink`. Every Item function is available and returns an awaitable instead of the result.
+    Functions that poll RoboDK with a sleep (WaitFinished and ConnectSafe) raise an exception: poll with asyncio.sleep instead, such as ``while await robot.Busy(): await asyncio.sleep(0.05)``.
+
+    .. seealso:: :class:`.AsyncRobolink`
+    """
+    def __init__(self, rdk, item):
+        self._rdk = rdk
+        self._item = item
+        self.item = item.item
+        self.type = item.type
+
+    def __repr__(self):
+        return repr(self._item)
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        return self.item == other.item
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def RDK(self):
+        """Returns the :class:`.AsyncRobolink` link"""
+        return self._rdk
+
+    def __getattr__(self, name):
+        function = getattr(Item, name, None)
+        if name.startswith('_') or name in _ASYNC_EXCLUDED or not callable(function):
+            raise AttributeError(name)
+        ptr_item = self.item
+        itemtype = self.type
+        streamed = hasattr(Item, '_request_' + name)
+        method = '_request_' + name if streamed else name
+
+        def call(*args, **kwargs):
+            if name in _ASYNC_POLLING:
+                raise Exception(name + ' polls RoboDK with a sleep, it is not available with AsyncRobolink. Poll with asyncio.sleep instead.')
+            args = _async_unwrap(list(args))
+            kwargs = dict((key, _async_unwrap(value)) for key, value in kwargs.items())
+            return self._rdk._submit(lambda link: getattr(Item(link, ptr_item, itemtype), method)(*args, **kwargs), streamed)
+
+        call.__doc__ = function.__doc__
+        return call
+
+
+# Functions that only make sense on a blocking Robolink
+_ASYNC_EXCLUDED = ('batch', 'NewLink', 'Connect', 'Disconnect', 'RDK')
+
+# Functions that poll RoboDK with a sleep: they would hold a connection (or block the event loop) until they return
+_ASYNC_POLLING = ('WaitFinished', 'ConnectSafe')
+
 if __name__ == "__main__":
 
     def TestGenericITem():
@@ -0,0 +1,482 @@
+# Copyright 2015-2021 - RoboDK Inc. - https://robodk.com/
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# --------------------------------------------
+# --------------- DESCRIPTION ----------------
+# This file defines RoboDKMock(), a local stand-in for the RoboDK API server.
+# It speaks the same protocol as RoboDK for a subset of commands so that robolink can be tested and benchmarked without RoboDK.
+# Run this file to benchmark the robolink protocol (BenchmarkProtocol). Run from the repository folder: PYTHONPATH=. python tests/robodk_mock.py
+# --------------------------------------------
+
+import struct
+import threading
+import time
+
+import robodk
+from robolink import *
+from robolink import _pack_doubles, _cols_2_pose
+
+
+class _MockClient(object):
+    """Reads the requests of one client of RoboDKMock and collects the reply"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile('rb')
+        self.reply = []
+        self.invalid_item = False
+
+    def read(self, nbytes):
+        data = self.file.read(nbytes)
+        if len(data) < nbytes:
+            raise EOFError()
+        return data
+
+    def read_line(self):
+        line = self.file.readline()
+        if not line:
+            raise EOFError()
+        return line[:-1].decode('utf-8')
+
+    def read_int(self):
+        return struct.unpack('>i', self.read(4))[0]
+
+    def read_item(self):
+        return struct.unpack('>Q', self.read(8))[0]
+
+    def read_array(self):
+        nvalues = self.read_int()
+        return list(struct.unpack('>%id' % nvalues, self.read(8 * nvalues)))
+
+    def read_pose(self):
+        return _cols_2_pose(struct.unpack('>16d', self.read(128)))
+
+    def read_matrix(self):
+        """Returns the matrix as a list of columns"""
+        size1, size2 = struct.unpack('>ii', self.read(8))
+        values = struct.unpack('>%id' % max(size1 * size2, 0), self.read(8 * max(size1 * size2, 0)))
+        return [list(values[i * size1:(i + 1) * size1]) for i in range(max(size2, 0))]
+
+    def write(self, data):
+        self.reply.append(data)
+
+    def write_line(self, string):
+        self.reply.append(string.replace('\n', '<br>').encode('utf-8') + b'\n')
+
+    def write_int(self, num):
+        self.reply.append(struct.pack('>i', num))
+
+    def write_item(self, ptr_item, itemtype):
+        self.reply.append(struct.pack('>Qi', ptr_item, itemtype))
+
+    def write_array(self, values):
+        self.reply.append(struct.pack('>i', len(values)) + _pack_doubles(values))
+
+    def write_pose(self, pose):
+        cols = pose.Cols()
+        self.reply.append(struct.pack('>16d', *(cols[0] + cols[1] + cols[2] + cols[3])))
+
+    def write_matrix(self, cols):
+        size1 = len(cols[0]) if cols else 0
+        self.reply.append(struct.pack('>ii', size1, len(cols)) + _pack_doubles([value for col in cols for value in col]))
+
+    def flush(self):
+        self.sock.sendall(b''.join(self.reply))
+        self.reply = []
+
+
+class RoboDKMock(object):
+    """Local TCP server that behaves like the RoboDK API for a subset of commands. Use it to test or benchmark robolink without RoboDK:
+
+    .. code-block:: python
+
+        with RoboDKMock(latency=0.001) as mock:
+            RDK = Robolink(port=mock.PORT)
+            robot = RDK.Item('Robot')
+            pose = robot.SolveFK([10, 20, 30, 0, 90, 0])
+
+    The mock station has a robot ('Robot'), a reference frame ('Frame 1') and a program ('Prog'). Items can be added with AddItem.
+    The robot kinematics are not real: SolveFK returns xyzrpw_2_pose of the first 6 joints and SolveIK returns pose_2_xyzrpw (the remaining joints are 0).
+    The commands that only send data (G_Gen_Mat, CalibTCP3, Show_Seq and Show_SeqPoses) add the command and the data received to the requests list.
+    Besides the API commands listed in COMMANDS, the mock provides echo commands (MOCK_ECHO_*) that return what they receive, used by the protocol benchmark.
+
+    :param int port: port to listen to (default=0, a free port is used, see PORT)
+    :param float latency: delay added to every reply, in seconds
+    :param list commands: commands to support (default=None: all the COMMANDS). Other commands reply with an error and close the connection.
+    :param int ndof: number of axes of the mock robot
+    :param int joint_list_size: number of steps returned by InstructionListJoints (G_ProgJointList)
+    """
+    COMMANDS = ['RDK_API', 'G_Item', 'G_Item2', 'G_List_Items', 'G_List_Items_ptr', 'G_Name', 'S_Name', 'G_Item_Type', 'G_Parent', 'G_Childs', 'Add_FRAME',
+                'G_Hlocal', 'S_Hlocal', 'G_Hlocal_Abs', 'S_Hlocal_Abs', 'S_Hlocals', 'S_Hlocal_AbsS', 'G_Thetas', 'S_Thetas', 'S_ThetasList', 'G_FK', 'G_IK', 'G_IK_jnts', 'G_ProgJointList',
+                'G_Gen_Mat', 'CalibTCP3', 'Show_Seq', 'Show_SeqPoses',
+                'MOCK_ECHO_LINE', 'MOCK_ECHO_INT', 'MOCK_ECHO_ITEM', 'MOCK_ECHO_ARRAY', 'MOCK_ECHO_POSE', 'MOCK_ECHO_XYZ', 'MOCK_ECHO_MATRIX', 'MOCK_ECHO_BYTES']
+    BUILD = 20000
+
+    def __init__(self, port=0, latency=0.0, commands=None, ndof=6, joint_list_size=1000):
+        import socket
+        self.latency = latency
+        self.ndof = ndof
+        self.joint_list_size = joint_list_size
+        self.handlers = {}
+        for command in self.COMMANDS:
+            if commands is None or command in commands:
+                self.handlers[command] = getattr(self, '_cmd_' + command)
+
+        self.ncommands = 0
+        self.requests = []
+        self.items = {}
+        self._next_item = 1000
+        self._lock = threading.Lock()
+        station = self.AddItem('Station', ITEM_TYPE_STATION)
+        self.AddItem('Robot', ITEM_TYPE_ROBOT, station)
+        self.AddItem('Frame 1', ITEM_TYPE_FRAME, station)
+        self.AddItem('Prog', ITEM_TYPE_PROGRAM, station)
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', port))
+        self.server.listen(16)
+        self.PORT = self.server.getsockname()[1]
+        self._clients = []
+        thread = threading.Thread(target=self._serve)
+        thread.daemon = True
+        thread.start()
+
+    def AddItem(self, name, itemtype, parent=0):
+        """Adds an item to the mock station and returns its pointer"""
+        with self._lock:
+            self._next_item += 1
+            ptr_item = self._next_item
+            self.items[ptr_item] = {'name': name, 'type': itemtype, 'parent': parent, 'pose': robodk.eye(4), 'joints': [0.0] * self.ndof}
+        return ptr_item
+
+    def close(self):
+        """Stops the server and closes the connections"""
+        self.server.close()
+        for sock in self._clients:
+            try:
+                sock.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _serve(self):
+        import socket
+        while True:
+            try:
+                sock, address = self.server.accept()
+            except Exception:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.append(sock)
+            thread = threading.Thread(target=self._client, args=(sock,))
+            thread.daemon = True
+            thread.start()
+
+    def _client(self, sock):
+        import socket
+        client = _MockClient(sock)
+        try:
+            while True:
+                command = client.read_line()
+                handler = self.handlers.get(command)
+                if handler is None:
+                    # The rest of the request can not be parsed
+                    client.write_int(3)
+                    client.write_line('Command not supported by RoboDKMock: ' + command)
+                    client.flush()
+                    return
+                client.invalid_item = False
+                handler(client)
+                client.write_int(1 if client.invalid_item else 0)
+                self.ncommands += 1
+                if self.latency > 0:
+                    time.sleep(self.latency)
+                client.flush()
+        except (EOFError, socket.error, ValueError):
+            pass
+        finally:
+            sock.close()
+
+    def _item(self, client, ptr_item):
+        """Returns the item data. Invalid items return default values and the command fails with status 1, like RoboDK."""
+        item = self.items.get(ptr_item)
+        if item is None:
+            client.invalid_item = True
+            return {'name': '', 'type': -1, 'parent': 0, 'pose': robodk.eye(4), 'joints': [0.0] * self.ndof}
+        return item
+
+    def _pose_abs(self, ptr_item):
+        pose = robodk.eye(4)
+        while ptr_item in self.items:
+            pose = self.items[ptr_item]['pose'] * pose
+            ptr_item = self.items[ptr_item]['parent']
+        return pose
+
+    def _find(self, name, itemtype=None):
+        for ptr_item in sorted(self.items):
+            item = self.items[ptr_item]
+            if (not name or item['name'] == name) and (itemtype is None or item['type'] == itemtype):
+                return ptr_item, item['type']
+        return 0, -1
+
+    def _fk(self, joints):
+        xyzrpw = (list(joints) + [0.0] * 6)[:6]
+        return robodk.xyzrpw_2_pose(xyzrpw)
+
+    def _ik(self, pose):
+        joints = robodk.pose_2_xyzrpw(pose)
+        return joints[:self.ndof] + [0.0] * (self.ndof - 6)
+
+    # API commands
+    def _cmd_RDK_API(self, client):
+        client.read_array()
+        client.write_line('RDK_API')
+        client.write_int(1)
+        client.write_int(self.BUILD)
+
+    def _cmd_G_Item(self, client):
+        client.write_item(*self._find(client.read_line()))
+
+    def _cmd_G_Item2(self, client):
+        name = client.read_line()
+        client.write_item(*self._find(name, client.read_int()))
+
+    def _cmd_G_List_Items(self, client):
+        client.write_int(len(self.items))
+        for ptr_item in sorted(self.items):
+            client.write_line(self.items[ptr_item]['name'])
+
+    def _cmd_G_List_Items_ptr(self, client):
+        client.write_int(len(self.items))
+        for ptr_item in sorted(self.items):
+            client.write_item(ptr_item, self.items[ptr_item]['type'])
+
+    def _cmd_G_Name(self, client):
+        client.write_line(self._item(client, client.read_item())['name'])
+
+    def _cmd_S_Name(self, client):
+        item = self._item(client, client.read_item())
+        item['name'] = client.read_line()
+
+    def _cmd_Add_FRAME(self, client):
+        name = client.read_line()
+        ptr_parent = client.read_item()
+        client.write_item(self.AddItem(name, ITEM_TYPE_FRAME, ptr_parent or min(self.items)), ITEM_TYPE_FRAME)
+
+    def _cmd_G_Item_Type(self, client):
+        client.write_int(self._item(client, client.read_item())['type'])
+
+    def _cmd_G_Parent(self, client):
+        parent = self._item(client, client.read_item())['parent']
+        client.write_item(parent, self.items[parent]['type'] if parent in self.items else -1)
+
+    def _cmd_G_Childs(self, client):
+        ptr_parent = client.read_item()
+        self._item(client, ptr_parent)
+        childs = [ptr_item for ptr_item in sorted(self.items) if self.items[ptr_item]['parent'] == ptr_parent]
+        client.write_int(len(childs))
+        for ptr_item in childs:
+            client.write_item(ptr_item, self.items[ptr_item]['type'])
+
+    def _cmd_G_Hlocal(self, client):
+        client.write_pose(self._item(client, client.read_item())['pose'])
+
+    def _cmd_S_Hlocal(self, client):
+        item = self._item(client, client.read_item())
+        item['pose'] = client.read_pose()
+
+    def _cmd_G_Hlocal_Abs(self, client):
+        ptr_item = client.read_item()
+        self._item(client, ptr_item)
+        client.write_pose(self._pose_abs(ptr_item))
+
+    def _cmd_S_Hlocal_Abs(self, client):
+        item = self._item(client, client.read_item())
+        item['pose'] = robodk.invH(self._pose_abs(item['parent'])) * client.read_pose()
+
+    def _cmd_S_Hlocals(self, client):
+        for i in range(client.read_int()):
+            item = self._item(client, client.read_item())
+            item['pose'] = client.read_pose()
+
+    def _cmd_S_Hlocal_AbsS(self, client):
+        for i in range(client.read_int()):
+            item = self._item(client, client.read_item())
+            item['pose'] = robodk.invH(self._pose_abs(item['parent'])) * client.read_pose()
+
+    def _cmd_G_Thetas(self, client):
+        client.write_array(self._item(client, client.read_item())['joints'])
+
+    def _cmd_S_Thetas(self, client):
+        joints = client.read_array()
+        self._item(client, client.read_item())['joints'] = joints
+
+    def _cmd_S_ThetasList(self, client):
+        for i in range(client.read_int()):
+            item = self._item(client, client.read_item())
+            item['joints'] = client.read_array()
+
+    def _cmd_G_FK(self, client):
+        joints = client.read_array()
+        self._item(client, client.read_item())
+        client.write_pose(self._fk(joints))
+
+    def _cmd_G_IK(self, client):
+        pose = client.read_pose()
+        self._item(client, client.read_item())
+        client.write_array(self._ik(pose))
+
+    def _cmd_G_IK_jnts(self, client):
+        pose = client.read_pose()
+        client.read_array()
+        self._item(client, client.read_item())
+        client.write_array(self._ik(pose))
+
+    def _cmd_G_ProgJointList(self, client):
+        self._item(client, client.read_item())
+        mm_step, deg_step, collision_check, flags, time_step = client.read_array()[:5]
+        save_to_file = client.read_line()
+        ndof = self.ndof
+        ncols = ndof + [4, 8, ndof + 8, 2 * ndof + 8, 2 * ndof + 8][min(max(int(flags), 0), 4)]
+        nsteps = self.joint_list_size
+        # One column per step: the joints move linearly, the other values are the step index
+        cols = [[i * 0.01 * (j + 1) for j in range(ndof)] + [float(i)] * (ncols - ndof) for i in range(nsteps)]
+        if save_to_file:
+            with open(save_to_file, 'w') as fid:
+                for col in cols:
+                    fid.write(','.join(['%.6f' % value for value in col]) + '\n')
+        else:
+            client.write(struct.pack('>ii', ncols, nsteps))
+            client.write(_pack_doubles([value for col in cols for value in col]))
+        client.write_int(nsteps)
+        client.write_line('Success')
+
+    def _cmd_G_Gen_Mat(self, client):
+        client.read_item()
+        param = client.read_line()
+        cols = client.read_matrix()
+        self.requests.append(('G_Gen_Mat', param, cols))
+        # Reply with the same matrix
+        client.write_int(1)
+        client.write_matrix(cols)
+
+    def _cmd_CalibTCP3(self, client):
+        cols = client.read_matrix()
+        input_format = client.read_int()
+        client.read_array()
+        client.read_item()
+        client.read_item()
+        self.requests.append(('CalibTCP3', input_format, cols))
+        client.write_array([0.0, 0.0, 0.0])
+        client.write_array([0.0, 0.0, 0.0])
+        client.write_matrix([])
+
+    def _cmd_Show_Seq(self, client):
+        cols = client.read_matrix()
+        self._item(client, client.read_item())
+        self.requests.append(('Show_Seq', cols))
+
+    def _cmd_Show_SeqPoses(self, client):
+        self._item(client, client.read_item())
+        display_type, timeout = client.read_array()[:2]
+        if int(display_type) & 2048:
+            data = [client.read_array() for i in range(client.read_int())]
+        else:
+            data = [client.read_pose() for i in range(client.read_int())]
+        self.requests.append(('Show_SeqPoses', data))
+
+    # Echo commands for the protocol benchmark (see BenchmarkProtocol)
+    def _cmd_MOCK_ECHO_LINE(self, client):
+        client.write(client.file.readline())
+
+    def _cmd_MOCK_ECHO_INT(self, client):
+        client.write(client.read(4))
+
+    def _cmd_MOCK_ECHO_ITEM(self, client):
+        client.write(client.read(8) + struct.pack('>i', ITEM_TYPE_FRAME))
+
+    def _cmd_MOCK_ECHO_ARRAY(self, client):
+        header = client.read(4)
+        client.write(header + client.read(8 * struct.unpack('>i', header)[0]))
+
+    def _cmd_MOCK_ECHO_POSE(self, client):
+        client.write(client.read(128))
+
+    def _cmd_MOCK_ECHO_XYZ(self, client):
+        client.write(client.read(24))
+
+    def _cmd_MOCK_ECHO_MATRIX(self, client):
+        header = client.read(8)
+        size1, size2 = struct.unpack('>ii', header)
+        client.write(header + client.read(8 * max(size1 * size2, 0)))
+
+    def _cmd_MOCK_ECHO_BYTES(self, client):
+        header = client.read(4)
+        client.write(header + client.read(struct.unpack('>I', header)[0]))
+
+
+if __name__ == "__main__":
+
+    def BenchmarkProtocol(iterations=2000, latency=0.0, array_size=1000, matrix_shape=(14, 1000), bytes_size=1000000, nodelay=True):
+        """Measure the round trips per second and the throughput of each _send_* and _rec_* pair, and of some API calls, against a local RoboDKMock.
+        The mock runs in the same process: the results are useful to compare protocol changes, not as absolute RoboDK timings.
+        Without nodelay, most round trips are bound by the TCP delayed acknowledgement (about 40 ms) instead of the protocol."""
+        import random
+        array = [random.random() for i in range(array_size)]
+        matrix = robodk.Mat([[random.random() for j in range(matrix_shape[1])] for i in range(matrix_shape[0])])
+        payload = bytes(bytearray(random.getrandbits(8) for i in range(bytes_size)))
+        pose = robodk.xyzrpw_2_pose([100, 200, 300, 10, 20, 30])
+
+        with RoboDKMock(latency=latency, joint_list_size=matrix_shape[1]) as mock:
+            RDK = Robolink(port=mock.PORT, args=['-API_NODELAY'] if nodelay else [])
+            robot = RDK.Item('Robot')
+            program = RDK.Item('Prog')
+
+            def echo(command, send, rec, value):
+                RDK._send_line(command)
+                send(value)
+                rec()
+                RDK._check_status()
+
+            cases = []
+            cases.append(('line', lambda: echo('MOCK_ECHO_LINE', RDK._send_line, RDK._rec_line, 'RoboDK'), 7))
+            cases.append(('int', lambda: echo('MOCK_ECHO_INT', RDK._send_int, RDK._rec_int, 1), 4))
+            cases.append(('item', lambda: echo('MOCK_ECHO_ITEM', RDK._send_item, RDK._rec_item, robot), 12))
+            cases.append(('xyz', lambda: echo('MOCK_ECHO_XYZ', RDK._send_xyz, RDK._rec_xyz, [1, 2, 3]), 24))
+            cases.append(('pose', lambda: echo('MOCK_ECHO_POSE', RDK._send_pose, RDK._rec_pose, pose), 128))
+            cases.append(('array', lambda: echo('MOCK_ECHO_ARRAY', RDK._send_array, RDK._rec_array, array), 4 + 8 * array_size))
+            cases.append(('matrix', lambda: echo('MOCK_ECHO_MATRIX', RDK._send_matrix, RDK._rec_matrix, matrix), 8 + 8 * matrix_shape[0] * matrix_shape[1]))
+            cases.append(('bytes', lambda: echo('MOCK_ECHO_BYTES', RDK._send_bytes, RDK._rec_bytes, payload), 4 + bytes_size))
+            cases.append(('Item()', lambda: RDK.Item('Robot'), 0))
+            cases.append(('Pose()', lambda: robot.Pose(), 0))
+            cases.append(('SolveFK', lambda: robot.SolveFK([10, 20, 30, 40, 50, 60]), 0))
+            cases.append(('SolveIK', lambda: robot.SolveIK(pose), 0))
+            cases.append(('JointList', lambda: program.InstructionListJoints(), 0))
+
+            print("%-10s %12s %12s" % ('Path', 'Round trips/s', 'MB/s'))
+            for name, function, nbytes in cases:
+                n = iterations if nbytes < 10000 else max(1, iterations // 100)
+                t0 = time.perf_counter()
+                for i in range(n):
+                    function()
+                dt = time.perf_counter() - t0
+                mbps = ('%.1f' % (2 * nbytes * n / dt / 1e6)) if nbytes > 0 else '-'
+                print("%-10s %12.0f %12s" % (name, n / dt, mbps))
+
+            RDK.Disconnect()
+
+    BenchmarkProtocol()
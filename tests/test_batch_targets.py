@@ -0,0 +1,52 @@
+import pytest
+
+from robodk import *
+
+import Automata
+import CSV
+import Kinova
+import KUKA_KRC4_TG
+import xArm
+
+# Poses with values that are exactly 0 or 180 deg: the batch text must not show -0.000 or -180.000 when the single call does not
+FLOAT_EYE = Mat([[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+POSES = [eye(4), transl(1, 2, 3), rotx(pi), roty(pi), rotz(pi), roty(pi / 2), roty(-pi / 2), transl(10, -20, 30) * rotz(-pi) * rotx(pi), FLOAT_EYE]
+JOINTS = [[0, -90, 90, 0, 90, 180]] * len(POSES)
+
+HALF_TURNS = [rotx(pi), roty(pi), rotz(pi), rotz(pi) * rotx(pi), rotx(pi) * roty(pi), rotx(pi) * rotz(pi / 2), rotx(-pi) * roty(pi / 3) * rotz(pi)]
+
+
+@pytest.mark.parametrize('batch, scalar', [(Poses_2_KUKA, Pose_2_KUKA), (Poses_2_Fanuc, Pose_2_Fanuc), (Poses_2_Motoman, Pose_2_Motoman), (Poses_2_Nachi, Pose_2_Nachi),
+                                           (Poses_2_Staubli, Pose_2_Staubli), (Poses_2_Adept, Pose_2_Adept), (Poses_2_Comau, Pose_2_Comau), (Poses_2_UR, Pose_2_UR)])
+def test_half_turns_same_as_scalar(batch, scalar):
+    # Poses with integer zeros (as built by rotx, roty and rotz) and with float zeros
+    poses = HALF_TURNS + [Mat([[float(value) for value in row] for row in pose.Rows()]) for pose in HALF_TURNS]
+    for target, pose in zip(batch(poses), poses):
+        assert list(target) == pytest.approx(scalar(pose), abs=1e-9)
+
+
+@pytest.mark.parametrize('poses', [POSES, KUKA_2_Poses([Pose_2_KUKA(pose) for pose in POSES])])
+def test_kuka_batch_text(poses):
+    formatter = KUKA_KRC4_TG.TargetFormatter(KUKA_KRC4_TG.RobotPost.AXES_DATA)
+    single = [formatter.move_2_str('LIN', pose if isinstance(pose, Mat) else Mat(pose.tolist()), joints, None, ' C_DIS') for pose, joints in zip(poses, JOINTS)]
+    assert formatter.moves_2_str('LIN', poses, JOINTS, None, ' C_DIS') == single
+
+
+def test_csv_batch_text():
+    single = ['Move Linear,%s,%s' % (CSV.pose_2_str(pose), CSV.joints_2_str(joints)) for pose, joints in zip(POSES, JOINTS)]
+    assert CSV.moves_2_str('Move Linear', POSES, JOINTS) == single
+
+
+@pytest.mark.parametrize('post', [xArm, Kinova, Automata])
+@pytest.mark.parametrize('poses', [POSES, [None] * len(POSES)])
+def test_post_batch_same_as_single(post, poses):
+    batch = post.RobotPost(robotname='Robot')
+    batch.MoveJ_Batch(poses, JOINTS)
+    batch.MoveL_Batch(poses, JOINTS)
+    single = post.RobotPost(robotname='Robot')
+    for pose, joints in zip(poses, JOINTS):
+        single.MoveJ(pose, joints)
+    for pose, joints in zip(poses, JOINTS):
+        single.MoveL(pose, joints)
+    assert batch.PROG == single.PROG
+    assert str(batch.LOG) == str(single.LOG)
@@ -0,0 +1,58 @@
+import os
+import sys
+import types
+
+import pytest
+
+import robodk
+
+
+def test_star_import_keeps_the_tkinter_names():
+    names = {}
+    exec('from robodk import *', names)
+    for name in ['tkinter', 'filedialog', 'messagebox']:
+        assert names[name] is getattr(robodk, name)
+
+
+def test_tkinter_names_import_tkinter_on_first_use():
+    pytest.importorskip('tkinter')
+    import tkinter
+    from tkinter import messagebox
+    assert robodk.tkinter.Tk is tkinter.Tk
+    assert robodk.messagebox.showinfo is messagebox.showinfo
+
+
+def test_compiled_post_path_output(tmp_path, capsys):
+    version_str = str(sys.version_info[0]) + str(sys.version_info[1])
+    post_file = str(tmp_path / 'Post.py')
+    with pytest.raises(Exception):
+        robodk.CompiledPostPath(post_file)
+    path_file = os.path.dirname(post_file).replace(os.sep, '/')
+    expected = ['Using Python version: ' + str(sys.version_info),
+                'RoboDK Post Processor: ' + path_file,
+                'Invalid Python version or post processor not found. Make sure you are using a supported Python version: ' + path_file + '/v' + version_str,
+                'Select Tools-Options-Python and select a supported Python version']
+    assert capsys.readouterr().out.splitlines() == expected
+
+    (tmp_path / ('v' + version_str)).mkdir()
+    assert robodk.CompiledPostPath(post_file) == path_file + '/v' + version_str
+    assert capsys.readouterr().out.splitlines() == expected[:2]
+    # The output is shown once for each post processor file
+    robodk.CompiledPostPath(post_file)
+    assert capsys.readouterr().out == ''
+
+
+def test_load_compiled_post_output(tmp_path, capsys, monkeypatch):
+    version_str = str(sys.version_info[0]) + str(sys.version_info[1])
+    (tmp_path / ('v' + version_str)).mkdir()
+    module = types.ModuleType('v' + version_str + '.FakePost')
+    module.RobotPost = object
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    monkeypatch.setattr(robodk, 'POST_IMPORT_METRICS', {})
+    post_file = str(tmp_path / 'FakePost.py')
+    assert robodk.LoadCompiledPost(post_file, 'FakePost') is object
+    path_file = os.path.dirname(post_file).replace(os.sep, '/')
+    # Same output as the post processor stubs before LoadCompiledPost
+    assert capsys.readouterr().out.splitlines() == ['Using Python version: ' + str(sys.version_info), 'RoboDK Post Processor: ' + path_file]
+    assert 'FakePost' in robodk.POST_IMPORT_METRICS
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from robodk import *
+
+import CSV
+
+
+@pytest.mark.parametrize('prog_csv', [True, False])
+def test_progsave_reports_the_result(tmp_path, monkeypatch, prog_csv):
+    messages = []
+    monkeypatch.setattr(CSV, 'mbox', messages.append)
+    r = CSV.RobotPost(prog_csv=prog_csv, prog_columns=True)
+    r.ProgStart('Prog')
+    r.MoveL(transl(1, 2, 3), [0, -90, 90, 0, 90, 0])
+    r.LOG.add('Target out of reach')
+    r.ProgFinish('Prog')
+    r.ProgSave(str(tmp_path), 'Prog', False, ['true'])
+
+    saved = str(tmp_path) + '/Prog.' + (r.PROG_EXT if prog_csv else r.PROG_EXT_COLUMNS)
+    assert os.path.isfile(saved)
+    assert r.PROG_FILES == saved
+    assert os.path.isfile(str(tmp_path) + '/Prog.' + r.PROG_EXT) == prog_csv
+    assert messages == [r.LOG.Summary()]
+
+
+def test_log_lines_without_csv():
+    r = CSV.RobotPost(prog_csv=False, prog_columns=True)
+    r.ProgStart('Prog')
+    r.MoveJ(None, [0, -90, 90, 0, 90, 0])
+    r.MoveJ(None, [10, -90, 90, 0, 90, 0])
+    r.addlog('Target out of reach')
+    assert r.LOG.Records() == [(LOG_WARNING, 'Target out of reach', 1, [len(r.COLS)])]
+    assert len(r.COLS) > 0
+
+
+@pytest.mark.parametrize('ndarray', [False, True])
+def test_batch_columns_same_as_single(tmp_path, ndarray):
+    numpy = pytest.importorskip('numpy')
+    poses = [transl(10, -20, 30), roty(pi), rotz(pi) * rotx(pi), rotx(pi), roty(pi / 2), KUKA_2_Pose([1, 2, 3, 40, 50, 60])]
+    joints = [[i, -90, 90, 0, 90, 180] for i in range(len(poses))]
+    files = []
+    for batch in [False, True]:
+        r = CSV.RobotPost(prog_csv=True, prog_columns=True)
+        r.ProgStart('Prog')
+        if batch:
+            r.MoveL_Batch(numpy.array([pose.Rows() for pose in poses], dtype=float) if ndarray else poses, joints)
+        else:
+            for pose, jnts in zip(poses, joints):
+                r.MoveL(Mat([[float(value) for value in row] for row in pose.Rows()]) if ndarray else pose, jnts)
+        r.ProgFinish('Prog')
+        r.ProgSave(str(tmp_path), 'Prog%i' % len(files))
+        files.append((r.PROG, CSV.LoadProgColumns(str(tmp_path) + '/Prog%i.%s' % (len(files), r.PROG_EXT_COLUMNS))))
+
+    (single_text, single), (batch_text, batch) = files
+    assert batch_text == single_text
+    # Same values as the single conversion (the vectorized trigonometry can differ in the last bit)
+    assert numpy.allclose(batch.xyzrpw, single.xyzrpw, rtol=0, atol=1e-9, equal_nan=True)
+    assert numpy.array_equal(batch.joints, single.joints, equal_nan=True)
+    assert list(batch.kind) == list(single.kind)
@@ -0,0 +1,40 @@
+import pytest
+
+from robodk import *
+
+import KUKA_KRC4_TG
+import Kuka_TG_collision_free
+
+
+def program(post, batch, stream_prog, lines_x_prog):
+    """Returns the pages of a program with movements added one by one or as batches"""
+    robot = post.RobotPost('Kuka_custom', 'Generic Kuka', lines_x_prog=lines_x_prog, stream_prog=stream_prog)
+    # The page lists are class attributes: each program needs its own
+    robot.PROG_NAMES, robot.PROG_FILES, robot.PROG_LIST, robot.PROG_CALLS, robot.PROG_CALLS_LIST = [], [], [], [], []
+    poses = [transl(200 + i, 100 - i, 300 + i % 7) * rotx(pi) * rotz(i * 0.01) for i in range(1000)]
+    joints = [[i * 0.01, -90 + i * 0.02, 90, 0, 90 - i * 0.03, -i * 0.04] for i in range(1000)]
+    robot.ProgStart('Program')
+    robot.setFrame(transl(807.766544, -963.699898, 41.478944), 4, 'Frame 4')
+    robot.setTool(transl(62.5, -108.253175, 100), 2, 'Tool 2')
+    if batch:
+        robot.MoveJ_Batch(poses[:10], joints[:10])
+        robot.MoveL_Batch(poses, joints)
+    else:
+        for pose, jnts in zip(poses[:10], joints[:10]):
+            robot.MoveJ(pose, list(jnts))
+        for pose, jnts in zip(poses, joints):
+            robot.MoveL(pose, list(jnts))
+    robot.ProgFinish('Program')
+    return [list(page) for page in robot.PROG_LIST] + [list(robot.PROG)]
+
+
+@pytest.mark.parametrize('post', [KUKA_KRC4_TG, Kuka_TG_collision_free])
+@pytest.mark.parametrize('stream_prog', [False, True])
+@pytest.mark.parametrize('lines_x_prog', [400, 9, 100000])
+def test_batch_same_as_single_across_pages(post, stream_prog, lines_x_prog):
+    single = program(post, False, stream_prog, lines_x_prog)
+    assert program(post, True, stream_prog, lines_x_prog) == single
+    if lines_x_prog < 1000:
+        assert len(single) > 2
+        # Every new page starts with the tool definition
+        assert all(['$TOOL = TOOL_DATA[8]' in page for page in single[1:-1]])
@@ -0,0 +1,79 @@
+import random
+import time
+
+import pytest
+
+from robodk import *
+
+import KUKA_KRC4_TG
+import Kuka_TG_collision_free
+
+POSTS = [KUKA_KRC4_TG, Kuka_TG_collision_free]
+
+# Poses on the special cases of the Euler angles: 0, 180 deg about each axis and pitch +/-90 deg (singular)
+POSES = {
+    'identity': (eye(4), 'X 0.000,Y 0.000,Z 0.000,A 0.000,B 0.000,C 0.000'),
+    'translation': (transl(100, -200.5, 300.25), 'X 100.000,Y -200.500,Z 300.250,A 0.000,B 0.000,C 0.000'),
+    'rotx180': (rotx(pi), 'X 0.000,Y 0.000,Z 0.000,A 0.000,B 0.000,C 180.000'),
+    'roty180': (roty(pi), 'X 0.000,Y 0.000,Z 0.000,A 180.000,B 0.000,C 180.000'),
+    'rotz180': (rotz(pi), 'X 0.000,Y 0.000,Z 0.000,A 180.000,B 0.000,C 0.000'),
+    'pitch+90': (roty(pi / 2), 'X 0.000,Y 0.000,Z 0.000,A 0.000,B 90.000,C 0.000'),
+    'pitch-90': (roty(-pi / 2), 'X 0.000,Y 0.000,Z 0.000,A 0.000,B -90.000,C 0.000'),
+}
+
+
+def reference_pose_2_str(pose):
+    """Text of a pose target before the formatter was introduced"""
+    [x, y, z, r, p, w] = pose_2_xyzrpw(pose)
+    return 'X %.3f,Y %.3f,Z %.3f,A %.3f,B %.3f,C %.3f' % (x, y, z, w, p, r)
+
+
+@pytest.mark.parametrize('post', POSTS)
+@pytest.mark.parametrize('name', sorted(POSES))
+def test_pose_2_str(post, name):
+    pose, expected = POSES[name]
+    formatter = post.TargetFormatter(post.RobotPost.AXES_DATA)
+    assert formatter.pose_2_str(pose) == reference_pose_2_str(pose) == expected
+    joints = [10, -20, 30, -40, 50, -60]
+    line = "LIN {%s, S 'B010', T 'B101010'} C_DIS" % expected
+    assert formatter.move_2_str('LIN', pose, joints, None, ' C_DIS') == line
+    assert formatter.moves_2_str('LIN', [pose], [joints], None, ' C_DIS') == [line]
+
+
+@pytest.mark.parametrize('post', POSTS)
+def test_batch_same_as_single(post):
+    rng = random.Random(0)
+    targets = [[rng.uniform(-1000, 1000), rng.uniform(-1000, 1000), rng.uniform(0, 1500), rng.uniform(-180, 180), rng.uniform(-89, 89), rng.uniform(-180, 180)] for i in range(2000)]
+    joints = [[rng.uniform(-180, 180) for j in range(7)] for i in range(len(targets))]
+    confs = [[rng.randint(0, 1) for j in range(3)] for i in range(len(targets))]
+    poses = [KUKA_2_Pose(target) for target in targets]
+    formatter = post.TargetFormatter(post.RobotPost.AXES_DATA)
+    single = [formatter.move_2_str('LIN', pose, jnts, conf, ' C_DIS') for pose, jnts, conf in zip(poses, joints, confs)]
+    assert formatter.moves_2_str('LIN', poses, joints, confs, ' C_DIS') == single
+    assert formatter.moves_2_str('LIN', KUKA_2_Poses(targets), joints, confs, ' C_DIS') == [formatter.move_2_str('LIN', Mat(pose.tolist()), jnts, conf, ' C_DIS') for pose, jnts, conf in zip(KUKA_2_Poses(targets), joints, confs)]
+
+
+def benchmark_formatter(n=1000000, n_single=100000):
+    """Format n KRL LIN lines as a batch and n_single lines one by one. Run from the repository folder: PYTHONPATH=. python tests/test_kuka_formatter.py"""
+    rng = random.Random(0)
+    targets = [[rng.uniform(-1000, 1000), rng.uniform(-1000, 1000), rng.uniform(0, 1500), rng.uniform(-180, 180), rng.uniform(-89, 89), rng.uniform(-180, 180)] for i in range(n)]
+    joints = [[rng.uniform(-180, 180) for j in range(6)] for i in range(n)]
+    poses = KUKA_2_Poses(targets)
+    formatter = KUKA_KRC4_TG.TargetFormatter(KUKA_KRC4_TG.RobotPost.AXES_DATA)
+
+    t0 = time.time()
+    lines = formatter.moves_2_str('LIN', poses, joints, None, ' C_DIS')
+    t_batch = time.time() - t0
+    print('Batch:  %i lines in %.3f s (%.0f lines/s)' % (n, t_batch, n / t_batch))
+
+    n_single = min(n, n_single)
+    single_poses = [Mat(poses[i].tolist()) for i in range(n_single)]
+    t0 = time.time()
+    single = [formatter.move_2_str('LIN', single_poses[i], joints[i], None, ' C_DIS') for i in range(n_single)]
+    t_single = time.time() - t0
+    print('Single: %i lines in %.3f s (%.0f lines/s)' % (n_single, t_single, n_single / t_single))
+    assert single == lines[:n_single], 'Batch and single formatting are different'
+
+
+if __name__ == "__main__":
+    benchmark_formatter()
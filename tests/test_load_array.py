@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from robodk import *
+
+np = pytest.importorskip('numpy')
+
+
+def generic(strfile, separator=',', skip_rows=0):
+    chunks = list(IterArrays(strfile, separator, chunk_rows=7, skip_rows=skip_rows))
+    return np.concatenate(chunks) if chunks else np.zeros((0, 0))
+
+
+TEXTS = {
+    'numbers': ''.join(['%.6f,%.6f,%.6f,\n' % (i, -i * 0.5, i * 1e-3) for i in range(1000)]),
+    'blank lines': '1,2,3\n\n4,5,6\r\n\n7,8,9',
+    'short rows': '1,2,3\n4,5\n6,7,8\n',
+    'empty cells': '1,,3\n4,5,6\n',
+    'text': 'a,b,c\n1,2,3\n4,x,6\n',
+    'empty': '\n\n',
+}
+
+
+@pytest.mark.parametrize('name', sorted(TEXTS))
+@pytest.mark.parametrize('block_size', [1, 40, 4194304])
+def test_same_as_iterarrays(tmp_path, name, block_size):
+    strfile = str(tmp_path / 'data.csv')
+    with open(strfile, 'w') as fid:
+        fid.write(TEXTS[name])
+    for skip_rows in [0, 1]:
+        try:
+            expected = generic(strfile, skip_rows=skip_rows)
+        except Exception:
+            # Rows longer than the first row are an error
+            with pytest.raises(Exception):
+                LoadArray(strfile, skip_rows=skip_rows, block_size=block_size)
+            continue
+        result = LoadArray(strfile, skip_rows=skip_rows, block_size=block_size)
+        assert result.shape == expected.shape
+        assert np.array_equal(result, expected, equal_nan=True)
+
+
+def test_saved_list(tmp_path):
+    rng = random.Random(0)
+    rows = [[rng.uniform(-1000, 1000) for j in range(7)] for i in range(5000)]
+    strfile = str(tmp_path / 'data.csv')
+    SaveList(rows, strfile)
+    result = LoadArray(strfile, block_size=1000)
+    assert result.shape == (5000, 7) and result.flags['OWNDATA']
+    assert np.allclose(result, rows, atol=1e-6)
@@ -0,0 +1,79 @@
+import copy
+import pickle
+
+import pytest
+
+from robodk import *
+
+
+def test_rows_assignment_updates_pose():
+    pose = transl(1, 2, 3)
+    pose.rows[0][3] = 10
+    pose.Rows()[1][3] = 20
+    pose.rows[2] = [0, 0, 1, 30]
+    assert isinstance(pose, Pose4)
+    assert pose.Pos() == [10, 20, 30]
+    assert pose.rows == [[1, 0, 0, 10], [0, 1, 0, 20], [0, 0, 1, 30], [0, 0, 0, 1]]
+
+
+def test_rows_assignment_on_converted_pose():
+    pose = KUKA_2_Pose([1, 2, 3, 4, 5, 6])
+    pose.rows[0][3] += 100
+    assert Pose_2_KUKA(pose)[0] == pytest.approx(101)
+    pose.rows[0][0:3] = [1, 0, 0]
+    assert pose[0, 0] == 1 and pose[0, 1] == 0
+
+
+def test_last_row_and_size_are_checked():
+    pose = rotx(0.5)
+    with pytest.raises(Exception):
+        pose.rows[3][0] = 5
+    with pytest.raises(Exception):
+        pose.rows[0].append(5)
+    with pytest.raises(Exception):
+        pose.rows.append([0, 0, 0, 1])
+    pose.rows[3][3] = 1
+    assert pose.isHomogeneous()
+
+
+def test_copies_are_independent():
+    pose = transl(1, 2, 3)
+    rows = copy.deepcopy(pose.rows)
+    rows[0][3] = 50
+    assert pose.Pos() == [1, 2, 3]
+    assert type(rows[0]) is list
+    assert pickle.loads(pickle.dumps(pose)).Pos() == [1, 2, 3]
+    mat = Mat(pose)
+    mat.rows[0][3] = 50
+    assert pose.Pos() == [1, 2, 3]
+
+
+def test_text_and_memory():
+    assert str(transl(1, 2, 3)) == 'Pose(1.000, 2.000, 3.000,  0.000, 0.000, 0.000):\n[[ 1, 0, 0, 1 ],\n [ 0, 1, 0, 2 ],\n [ 0, 0, 1, 3 ],\n [ 0, 0, 0, 1 ]]\n'
+    assert transl(1, 2, 3).Cols()[3] == [1, 2, 3, 1]
+    assert not hasattr(transl(1, 2, 3), '__dict__')
+    assert not hasattr(Mat(2, 2), '__dict__')
+    assert pickle.loads(pickle.dumps(Mat([[1, 2], [3, 4]]), 0)).rows == [[1, 2], [3, 4]]
+
+
+def test_robolink_sends_poses_as_poses():
+    import robolink
+    from robodk_mock import RoboDKMock
+    poses = [transl(1, 2, 3), transl(4, 5, 6) * rotz(0.5)]
+    with RoboDKMock() as mock:
+        RDK = robolink.Robolink(port=mock.PORT)
+        robot = RDK.Item('Robot')
+
+        mats = RDK.Command('Matrix', transl(1, 2, 3))
+        assert mock.requests[-1][:2] == ('G_Gen_Mat', 'Matrix')
+        assert mats[0].Pos() == [1, 2, 3]
+
+        RDK.CalibrateTool(poses)
+        command, input_format, cols = mock.requests[-1]
+        assert input_format == robolink.EULER_RX_RYp_RZpp
+        assert cols == [Pose_2_Staubli(pose) for pose in poses]
+
+        robot.ShowSequence(poses, display_type=0)
+        command, sent = mock.requests[-1]
+        assert command == 'Show_SeqPoses'
+        assert [pose.rows for pose in sent] == [pose.rows for pose in poses]
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from robodk import *
+
+
+def test_insert_and_read_like_a_list():
+    rng = random.Random(3)
+    stream = ProgStream(head_lines=4, buffer_size=64)
+    lines = []
+    for i in range(200):
+        line = 'LINE %i' % i
+        if i % 3 == 0:
+            index = rng.randint(-len(lines) - 5, len(lines) + 5)
+            stream.insert(index, line)
+            lines.insert(index, line)
+        else:
+            stream.append(line)
+            lines.append(line)
+    assert len(stream) == len(lines)
+    assert list(stream) == lines
+    assert [stream[i] for i in range(-len(lines), len(lines))] == lines + lines
+    with pytest.raises(IndexError):
+        stream[len(lines)]
+    stream.close()
+
+
+def test_insert_in_empty_and_short_programs():
+    stream = ProgStream(head_lines=0)
+    lines = []
+    for target in (stream, lines):
+        target.insert(5, 'B')
+        target.insert(-10, 'A')
+        target.insert(1, 'C')
+        target.append('D')
+        target.insert(-1, 'E')
+    assert list(stream) == lines == ['A', 'C', 'B', 'E', 'D']
+    stream.close()
+
+
+def test_temporary_file_is_closed():
+    with ProgStream(head_lines=1) as stream:
+        stream.extend(['A', 'B', 'C', 'D'])
+        temp = stream._file
+        assert not temp.closed
+    assert temp.closed and len(stream) == 0
+
+    stream = ProgStream(head_lines=1)
+    stream.extend(['A', 'B', 'C', 'D'])
+    temp = stream._file
+    del stream
+    assert temp.closed
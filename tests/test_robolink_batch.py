@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from robolink import *
+from robodk_mock import RoboDKMock
+
+
+@pytest.fixture
+def mock():
+    with RoboDKMock(joint_list_size=20000) as server:
+        yield server
+
+
+def counted(calls, function):
+    """Returns function wrapped to count how many times it is executed"""
+    def call(*args):
+        calls.append(args)
+        return function(*args)
+    return call
+
+
+def test_batch_executes_each_call_once(mock):
+    RDK = Robolink(port=mock.PORT)
+    robot = RDK.Item('Robot')
+    calls = []
+    solve = counted(calls, robot.SolveFK)
+    with RDK.batch() as batch:
+        futures = [batch.add(solve, [i, 2, 3, 4, 5, 6]) for i in range(RobolinkBatch.WINDOW + 10)]
+        name = batch.add(robot.Name)
+
+    assert len(calls) == len(futures)
+    assert [future.result().Pos() for future in futures] == [[i, 2, 3] for i in range(len(futures))]
+    assert name.result() == 'Robot'
+    # The link is usable after the batch
+    assert robot.SolveFK([7, 2, 3, 4, 5, 6]).Pos() == [7, 2, 3]
+
+
+def test_batch_error_does_not_stop_the_batch(mock):
+    RDK = Robolink(port=mock.PORT)
+    robot = RDK.Item('Robot')
+
+    def fails():
+        raise ValueError('invalid call')
+
+    with RDK.batch() as batch:
+        first = batch.add(robot.SolveFK, [1, 2, 3, 4, 5, 6])
+        error = batch.add(fails)
+        last = batch.add(robot.Joints)
+
+    assert first.result().Pos() == [1, 2, 3]
+    assert isinstance(error.exception(), ValueError)
+    with pytest.raises(ValueError):
+        error.result()
+    assert last.result().list() == [0] * 6
+
+
+def test_async_call_runs_once(mock):
+    RDK = Robolink(port=mock.PORT)
+    expected = RDK.Item('Prog').InstructionListJoints()[1]
+    calls = []
+
+    async def main():
+        link = await AsyncRobolink(port=mock.PORT).Connect()
+        try:
+            joints = await link.call(counted(calls, lambda rdk: rdk.Item('Prog').InstructionListJoints()[1]))
+            poses = await asyncio.gather(*[link.call(counted(calls, lambda rdk, i=i: rdk.Item('Robot').SolveFK([i, 0, 0, 0, 0, 0]))) for i in range(20)])
+        finally:
+            link.Disconnect()
+        return joints, poses
+
+    joints, poses = asyncio.run(main())
+    assert len(calls) == 21
+    assert joints.tr().rows == expected.tr().rows
+    assert [pose.Pos()[0] for pose in poses] == list(range(20))
+
+
+class CountingSocket(object):
+    """Socket wrapper that counts the sends"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.sends = 0
+
+    def send(self, data):
+        self.sends += 1
+        return self.sock.send(data)
+
+    def sendall(self, data):
+        self.sends += 1
+        return self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+def test_batch_sends_the_requests_together(mock):
+    RDK = Robolink(port=mock.PORT)
+    robot = RDK.Item('Robot')
+    RDK.COM = CountingSocket(RDK.COM)
+    ncalls = RobolinkBatch.WINDOW + 10
+    with RDK.batch() as batch:
+        futures = [batch.add(robot.SolveFK, [i, 2, 3, 4, 5, 6]) for i in range(ncalls)]
+        invalid = batch.add(robot.SolveFK, None)
+        joints = batch.add(robot.Joints)
+
+    # One send per window of requests
+    assert RDK.COM.sends == 2
+    assert [future.result().Pos() for future in futures] == [[i, 2, 3] for i in range(ncalls)]
+    assert invalid.exception() is not None
+    assert joints.result().list() == [0] * 6
+
+
+def test_async_streamed_calls(mock):
+    async def main():
+        link = await AsyncRobolink(port=mock.PORT).Connect()
+        try:
+            robot = await link.Item('Robot')
+            name, poses = await asyncio.gather(robot.Name(), asyncio.gather(*[robot.SolveFK([i, 0, 0, 0, 0, 0]) for i in range(50)]))
+            # Only the blocking calls use a blocking link
+            streamed_only = all(connection.blocking is None for connection in link._connections)
+            await robot.setJoints([1, 2, 3, 4, 5, 6])
+            joints, after = await asyncio.gather(link.call(lambda rdk: Item(rdk, robot.item, robot.type).Joints()), robot.setJoints([0] * 6))
+            with pytest.raises(Exception):
+                robot.WaitFinished()
+        finally:
+            link.Disconnect()
+        return robot, name, poses, streamed_only, joints
+
+    robot, name, poses, streamed_only, joints = asyncio.run(main())
+    assert isinstance(robot, AsyncItem)
+    assert name == 'Robot'
+    assert [pose.Pos()[0] for pose in poses] == list(range(50))
+    assert streamed_only
+    # Calls are executed in order on a connection
+    assert joints.list() == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,34 @@
+import pytest
+
+from robolink import *
+from robodk_mock import RoboDKMock
+
+
+@pytest.fixture
+def mock():
+    with RoboDKMock() as server:
+        yield server
+
+
+def test_counters_belong_to_each_link(mock):
+    RDK1 = Robolink(port=mock.PORT)
+    RDK2 = Robolink(port=mock.PORT)
+    RDK1.setCache(True)
+    RDK1.Item('Robot')
+    RDK1.Item('Robot')
+    assert RDK1.CacheStats() == {'hits': 1, 'misses': 1}
+    assert RDK2.CacheStats() == {'hits': 0, 'misses': 0}
+    assert Robolink.CACHE_HITS == 0 and Robolink.CACHE_MISSES == 0
+
+
+def test_adding_items_forgets_the_handles_found_by_name(mock):
+    RDK = Robolink(port=mock.PORT)
+    RDK.setCache(True)
+    frame = RDK.Item('Frame 1')
+    assert frame.Name() == 'Frame 1'
+    RDK.AddFrame('Frame 2', frame)
+    assert RDK.Item('Frame 1') == frame
+    assert RDK.CacheStats() == {'hits': 0, 'misses': 3}
+    # The metadata of the items is kept
+    assert frame.Name() == 'Frame 1'
+    assert RDK.CacheStats()['hits'] == 1
@@ -443,7 +443,7 @@ def UpdateStatus(set_status=None):
 
 # ----------------------------------------------------
 # Object class that handles the robot instructions/syntax
-class RobotPost(object):
+class RobotPost(RobotPostBatch):
 
     #Code generation mode
     # 1 = simulate
@@ -473,6 +473,7 @@ class RobotPost(object):
     PROG_FILES = []
 
     PROG = []
+    STREAM_PROG = False # Keep the program lines in a temporary file instead of memory (see ProgStream)
     LOG = ''
     nAxes = 6
     REF_FRAME = eye(4)
@@ -483,8 +484,9 @@ class RobotPost(object):
         #robotName = FilterName(robotname).replace('.', '')
         robotName = "robot"
         self.ROBOT_NAME = robotName
-        self.PROG = []
-        self.LOG = ''
+        self.STREAM_PROG = kwargs.get('stream_prog', self.STREAM_PROG)
+        self.PROG = ProgStream() if self.STREAM_PROG else []
+        self.LOG = ProgLog()
         self.nAxes = robot_axes
 
         self.addline('# Program automatically generated by RoboDK using the post processor for uFactory uArm robots')
@@ -590,7 +592,7 @@ class RobotPost(object):
                 os.startfile(filesave)
 
             if len(self.LOG) > 0:
-                mbox('Program generation LOG:\n\n' + self.LOG)
+                mbox(self.LOG.Summary())
 
     def ProgSendRobot(self, robot_ip, remote_path, ftp_user, ftp_pass):
         """Send a program to the robot using the provided parameters. This method is executed right after ProgSave if we selected the option "Send Program to Robot".
@@ -623,6 +625,14 @@ class RobotPost(object):
         pose_abs = self.REF_FRAME * pose
         self.addline('    %s.MoveL([%s])' % (FilterName(self.ROBOT_NAME).replace('.', ''), joints_2_str(joints) + ',' + mat_2_str(pose)))
 
+    def MoveJ_Batch(self, poses, joints, confs=None):
+        """Add a batch of joint movements (same as calling MoveJ for each target)"""
+        self.addlines_batch(self.MoveJ, '    %s.MoveJ([%%(joints)s])' % FilterName(self.ROBOT_NAME).replace('.', ''), poses, joints, confs)
+
+    def MoveL_Batch(self, poses, joints, confs=None):
+        """Add a batch of linear movements (same as calling MoveL for each target)"""
+        self.addlines_batch(self.MoveL, '    %s.MoveL([%%(joints)s,%%(pose)s])' % FilterName(self.ROBOT_NAME).replace('.', ''), poses, joints, confs)
+
     def MoveC(self, pose1, joints1, pose2, joints2, conf_RLF_1=None, conf_RLF_2=None):
         """Add a circular movement"""
         if pose1 is None or pose2 is None:
@@ -718,9 +728,9 @@ class RobotPost(object):
         """Add a program line"""
         self.PROG.append(newline)
 
-    def addlog(self, newline):
+    def addlog(self, newline, severity=LOG_WARNING):
         """Add a log message"""
-        self.LOG = self.LOG + newline + '\n'
+        self.LOG.add(newline, severity, len(self.PROG))
 
 
 # -------------------------------------------------
@@ -783,14 +793,14 @@ def test_post():
     for line in robot.PROG:
         print(line)
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
     #input("Press Enter to close...")
     #return
     robot.ProgSave(".", "Program", True)
     for line in robot.PROG:
         print(line)
     if len(robot.LOG) > 0:
-        mbox('Program generation LOG:\n\n' + robot.LOG)
+        mbox(robot.LOG.Summary())
 
     input("Press Enter to close...")
 